@@ -0,0 +1,47 @@
+# benchmarks/bench_envelope.py
+"""
+Mapa de operação (pc x pa) 500x500: PreparedFlow.envelope contra uma
+evaluate_many por pressão de câmara (mesmo critério).
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_envelope
+"""
+import time
+
+import numpy as np
+
+from src.core.geometry import SAMPLING_FLOW
+from src.core.solvers.bell_nozzle import BellNozzleSolver
+from src.simulation.separation import FlowSimulation, SimulationInput
+
+N_POINTS = 500
+REPEATS = 5
+
+
+def main():
+    res = BellNozzleSolver().compute(13.5, 1.2, 4.0, 1.0, 15.0, -135.0, 0.8, 1.5)
+    prepared = FlowSimulation(res, SimulationInput(4e6, 101325.0, 1.2), sampling=SAMPLING_FLOW).prepare()
+    pcs = np.linspace(0.2e6, 5e6, N_POINTS)
+    pas = np.linspace(0.0, 1.3e5, N_POINTS)
+
+    times = []
+    for _ in range(REPEATS):
+        t0 = time.perf_counter()
+        env = prepared.envelope(pcs, pas)
+        times.append(time.perf_counter() - t0)
+    print(f"envelope {N_POINTS}x{N_POINTS} ({len(prepared.axis_x)} pontos na parede): "
+          f"{min(times) * 1e3:.1f} ms (melhor de {REPEATS})")
+
+    # Referência: uma preparação + evaluate_many por linha de pc
+    t0 = time.perf_counter()
+    mismatches = 0
+    for i, pc in enumerate(pcs):
+        row = FlowSimulation(res, SimulationInput(pc, 101325.0, 1.2), sampling=SAMPLING_FLOW).prepare()
+        sweep = row.evaluate_many(pas)
+        mismatches += int(np.sum(sweep.has_separation != env.has_separation[i]))
+    t_ref = time.perf_counter() - t0
+    print(f"referência por linha: {t_ref:.2f} s | células divergentes: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# benchmarks/bench_moc.py
+"""
+Solver MOC: tempo de um projeto com 60 a 500 características (tabelas de θmax
+já em cache e na primeira chamada), vazão de compute_batch, e conferência de
+ε contra _calculate_epsilon (pedido: diferença relativa abaixo de 1e-3).
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_moc
+"""
+import time
+
+import numpy as np
+
+from src.core.solvers.moc_solver import MOCSolver
+
+PARAMS = dict(tr=13.5, k=1.2, pc=4.0, pe=1.0, ang_div=15.0, ang_cov=-135.0, length_pct=0.8,
+              rounding_factor=1.5)
+N_BATCH = 4096
+EPS_TOL = 1e-3
+
+
+def main():
+    print("--- PROJETO ÚNICO ---")
+    for n in (60, 100, 200, 500):
+        solver = MOCSolver(n)
+        t0 = time.perf_counter()
+        res = solver.compute(**PARAMS)
+        first = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        solver.compute(**PARAMS)
+        warm = time.perf_counter() - t0
+        ref = solver._calculate_epsilon(PARAMS['pc'], PARAMS['pe'], PARAMS['k'])
+        print(f"n = {n:3d}: {warm * 1e3:7.1f} ms (primeira chamada {first * 1e3:7.1f} ms), "
+              f"ε = {res.epsilon:.5f} (projeto {ref:.5f})")
+
+    rng = np.random.default_rng(0)
+    sweep = dict(PARAMS, tr=rng.uniform(5, 30, N_BATCH), pc=rng.uniform(2, 8, N_BATCH),
+                 pe=rng.uniform(0.5, 2, N_BATCH), rounding_factor=rng.uniform(0.3, 2, N_BATCH))
+    print(f"--- LOTE ({N_BATCH} projetos, n = 60) ---")
+    solver = MOCSolver(60)
+    worst = 0.0
+    for label, k in (("k fixo", PARAMS['k']), ("k variável", rng.uniform(1.1, 1.4, N_BATCH))):
+        batch_in = dict(sweep, k=k)
+        solver.compute_batch(**batch_in)  # aquece as tabelas de θmax
+        t0 = time.perf_counter()
+        batch = solver.compute_batch(**batch_in)
+        elapsed = time.perf_counter() - t0
+        ref = solver._calculate_epsilon_array(batch_in['pc'], batch_in['pe'], np.broadcast_to(k, (N_BATCH,)))
+        worst = max(worst, float(np.nanmax(np.abs(batch.epsilon / ref - 1))))
+        print(f"{label}: {N_BATCH / elapsed:8.0f} projetos/s, válidos {int(batch.valid.sum())}")
+
+    print(f"maior erro relativo de ε: {worst:.2e} ({'ok' if worst < EPS_TOL else 'FALHOU'}, limite {EPS_TOL:.0e})")
+
+
+if __name__ == "__main__":
+    main()
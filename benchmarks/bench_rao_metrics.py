@@ -0,0 +1,49 @@
+# benchmarks/bench_rao_metrics.py
+"""
+Benchmark do caminho rápido (compute_metrics) contra o compute completo do solver Rao.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_rao_metrics
+"""
+import timeit
+
+import numpy as np
+
+from src.core.solvers.bell_nozzle import BellNozzleSolver
+
+PARAMS = {
+    'tr': 13.5, 'k': 1.135, 'pc': 5.0, 'pe': 1.5,
+    'ang_div': 15.0, 'ang_cov': -135.0, 'length_pct': 0.8, 'rounding_factor': 2.0
+}
+
+
+def _best_of(stmt, number: int, repeat: int = 5) -> float:
+    """Menor tempo por chamada (em segundos) entre `repeat` rodadas."""
+    return min(timeit.repeat(stmt, number=number, repeat=repeat)) / number
+
+
+def main():
+    solver = BellNozzleSolver()
+    n_calls = 2000
+    n_batch = 100_000
+
+    t_full = _best_of(lambda: solver.compute(**PARAMS), n_calls)
+    t_metrics = _best_of(lambda: solver.compute_metrics(**PARAMS), n_calls)
+
+    print("--- ESCALAR (por chamada) ---")
+    print(f"compute():          {t_full * 1e6:8.1f} µs")
+    print(f"compute_metrics():  {t_metrics * 1e6:8.1f} µs   ({t_full / t_metrics:.2f}x)")
+
+    sweep = dict(PARAMS, length_pct=np.linspace(0.6, 1.0, n_batch))
+    t_batch_full = _best_of(lambda: solver.compute_batch(**sweep), 1, repeat=3)
+    t_batch_metrics = _best_of(lambda: solver.compute_batch(**sweep, with_contour=False), 1, repeat=3)
+
+    print(f"\n--- LOTE ({n_batch} projetos) ---")
+    print(f"compute_batch():                    {t_batch_full * 1e3:8.1f} ms")
+    print(f"compute_batch(with_contour=False):  {t_batch_metrics * 1e3:8.1f} ms   "
+          f"({t_batch_full / t_batch_metrics:.2f}x)")
+    print(f"Loop de compute() (estimado):       {t_full * n_batch * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# benchmarks/bench_sobol.py
+"""
+Amostragem do explorer: a sequência de Sobol gerada em lotes (como o explore e
+a retomada a geram) tem de ser idêntica à gerada de uma vez, sem pontos
+repetidos; e o tempo de geração de 10^6 pontos em 9 dimensões.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_sobol
+"""
+import time
+
+import numpy as np
+
+from src.simulation.explorer import DesignSpace, Range, sobol_points
+
+N_POINTS = 4096
+DIMS = 9
+CHUNKS = (64, 100, 1000)
+
+
+def main():
+    full = sobol_points(0, N_POINTS, DIMS)
+    failed = 0
+    for chunk in CHUNKS:
+        parts = np.vstack([sobol_points(a, min(a + chunk, N_POINTS), DIMS) for a in range(0, N_POINTS, chunk)])
+        same = np.array_equal(parts, full)
+        distinct = len(np.unique(parts, axis=0))
+        failed += not same or distinct != N_POINTS
+        print(f"lotes de {chunk:4d}: {'igual' if same else 'DIFERENTE'} à geração única, "
+              f"{distinct} pontos distintos de {N_POINTS}")
+    shift = np.random.default_rng(0).integers(0, 1 << 32, DIMS, dtype=np.uint64)
+    same = np.array_equal(sobol_points(500, 520, DIMS, shift), sobol_points(0, 1024, DIMS, shift)[500:520])
+    failed += not same
+    print(f"[500, 520) com deslocamento: {'igual' if same else 'DIFERENTE'}")
+
+    # Nada variando: sem dimensões, sem IndexError
+    space = DesignSpace({'tr': 13.5, 'k': 1.2, 'pc': 4.0, 'pe': 1.0, 'ang_div': 15.0, 'ang_cov': -135.0,
+                         'length_pct': 0.8, 'rounding_factor': 1.5}, 'sobol', 10)
+    print(f"espaço sem faixas: {len(space.points(0, 10)['tr'])} pontos")
+
+    t0 = time.perf_counter()
+    sobol_points(0, 1_000_000, DIMS)
+    print(f"10^6 pontos em {DIMS} dimensões: {time.perf_counter() - t0:.2f} s")
+    space = DesignSpace({'tr': Range(5, 30), 'k': 1.2, 'pc': Range(2, 8), 'pe': Range(0.5, 2), 'ang_div': 15.0,
+                         'ang_cov': -135.0, 'length_pct': 0.8, 'rounding_factor': Range(0.3, 2)},
+                        'sobol', N_POINTS)
+    pts = np.column_stack([np.concatenate([space.points(a, a + 64)[k] for a in range(0, N_POINTS, 64)])
+                           for k in space.varying])
+    print(f"DesignSpace sobol em lotes de 64: {len(np.unique(pts, axis=0))} projetos distintos de {N_POINTS}")
+    print("ok" if failed == 0 else f"FALHOU ({failed} verificações)")
+
+
+if __name__ == "__main__":
+    main()
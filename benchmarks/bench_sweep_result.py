@@ -0,0 +1,58 @@
+# benchmarks/bench_sweep_result.py
+"""
+Memória e tempo de filtro/ordenação do SweepResult com 10^6 projetos Rao.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_sweep_result
+"""
+import time
+
+import numpy as np
+
+from src.core.models import SweepResult
+from src.core.solvers.bell_nozzle import BellNozzleSolver
+
+N_DESIGNS = 1_000_000
+CHUNK = 100_000
+
+
+def _sweep(solver: BellNozzleSolver, rng: np.random.Generator, dtype) -> SweepResult:
+    parts = []
+    for _ in range(N_DESIGNS // CHUNK):
+        inputs = {
+            'tr': 13.5, 'k': rng.uniform(1.1, 1.3, CHUNK), 'pc': rng.uniform(2.0, 8.0, CHUNK), 'pe': 1.0,
+            'ang_div': 15.0, 'ang_cov': -135.0, 'length_pct': rng.uniform(0.6, 1.0, CHUNK),
+            'rounding_factor': 2.0,
+        }
+        batch = solver.compute_batch(**inputs, with_contour=False)
+        parts.append(SweepResult.from_batch(batch, inputs=inputs, dtype=dtype))
+    return SweepResult.concat(parts)
+
+
+def main():
+    solver = BellNozzleSolver()
+
+    for dtype in (np.float64, np.float32):
+        rng = np.random.default_rng(0)
+        t0 = time.perf_counter()
+        sweep = _sweep(solver, rng, dtype)
+        t_build = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        best = sweep.filter(sweep.is_converged() & (sweep.cf_est > 1.6))
+        t_filter = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        best = best.sort('cf_est', descending=True)
+        t_sort = time.perf_counter() - t0
+
+        print(f"--- {np.dtype(dtype).name} ---")
+        print(f"{len(sweep)} projetos: {sweep.nbytes / 1024 ** 2:7.1f} MB ({sweep.nbytes / len(sweep):.0f} B/projeto)")
+        print(f"Cálculo + montagem:  {t_build * 1e3:8.1f} ms")
+        print(f"Filtro:              {t_filter * 1e3:8.1f} ms  ({len(best)} linhas)")
+        print(f"Ordenação:           {t_sort * 1e3:8.1f} ms")
+        print(f"Melhor: {best[0]}  entradas={best[0].inputs}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# benchmarks/bench_tolerance.py
+"""
+Monte Carlo de tolerâncias com 10^5 amostras perto do limite de descolamento:
+tempo com 1 processo e com o pool, resultados idênticos entre os dois, e
+comparação de uma sub-amostra com FlowSimulation.run (contorno denso).
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_tolerance
+"""
+import os
+import time
+
+import numpy as np
+
+from src.core.solvers.bell_nozzle import BellNozzleSolver
+from src.simulation.separation import FlowSimulation, SimulationInput
+from src.simulation.tolerance import Tolerance, ToleranceSpace, run_tolerance
+
+N_SAMPLES = 100_000
+N_REFERENCE = 200
+NOMINAL = dict(tr=13.5, k=1.2, pc=4.0, pe=1.0, ang_div=15.0, ang_cov=-135.0, length_pct=0.8,
+               rounding_factor=1.5, pa=262000.0)
+TOLERANCES = {'tr': Tolerance('normal', 0.02), 'rounding_factor': Tolerance('uniform', 0.1),
+              're': Tolerance('normal', 0.05)}
+
+
+def main():
+    space = ToleranceSpace(NOMINAL, TOLERANCES, N_SAMPLES, seed=7)
+    runs = {}
+    for workers in sorted({1, max(2, os.cpu_count() or 1)}):
+        t0 = time.perf_counter()
+        runs[workers] = run_tolerance(space, workers=workers)
+        print(f"{N_SAMPLES} amostras, {workers} processo(s): {time.perf_counter() - t0:.2f} s")
+    report, sweep = runs[1]
+    print(report.report())
+
+    other = runs[max(runs)][1]
+    same = all(np.array_equal(sweep.column(k), other.column(k), equal_nan=True)
+               for k in ('epsilon', 'length', 'safety_margin', 'has_separation'))
+    print(f"1 processo x pool: {'idênticos' if same else 'DIFERENTES'}")
+
+    # Referência: FlowSimulation.run por amostra (tabela Mach x A/A*, contorno denso)
+    rows = np.random.default_rng(0).choice(N_SAMPLES, N_REFERENCE, replace=False)
+    solver = BellNozzleSolver()
+    mismatches, worst = 0, 0.0
+    for i in rows:
+        inputs = {k: float(sweep.inputs[k][i]) for k in ('tr', 'k', 'pc', 'pe', 'ang_div', 'ang_cov',
+                                                          'length_pct', 'rounding_factor')}
+        res = solver.compute(**inputs)
+        ref = FlowSimulation(res, SimulationInput(inputs['pc'] * 1e6, NOMINAL['pa'], inputs['k']),
+                             sampling=None).run()
+        mismatches += int(ref.has_separation != sweep.checks['has_separation'][i])
+        worst = max(worst, abs(ref.safety_margin - sweep.checks['safety_margin'][i]))
+    print(f"referência por amostra ({N_REFERENCE}): descolamentos divergentes {mismatches}, "
+          f"maior diferença de margem {worst:.2e}")
+
+
+if __name__ == "__main__":
+    main()
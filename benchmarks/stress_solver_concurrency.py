@@ -0,0 +1,74 @@
+# benchmarks/stress_solver_concurrency.py
+"""
+Teste de estresse da garantia de concorrência dos solvers: a MESMA instância
+é chamada simultaneamente por várias threads (com gammas diferentes
+intercalados) e enviada por pickle para workers de processo. Todos os
+resultados devem ser idênticos bit a bit aos de uma execução serial.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.stress_solver_concurrency
+"""
+import pickle
+import sys
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+import numpy as np
+
+from src.core.solvers.bell_nozzle import BellNozzleSolver
+from src.core.solvers.moc_solver import MOCSolver
+
+BASE = {'tr': 13.5, 'pc': 5.0, 'pe': 1.5, 'ang_div': 15.0, 'ang_cov': -135.0, 'rounding_factor': 2.0}
+
+
+def _cases(n: int):
+    """Projetos com gammas e comprimentos alternados, para expor estado compartilhado."""
+    gammas = (1.135, 1.2, 1.3, 1.4)
+    return [dict(BASE, k=gammas[i % len(gammas)], length_pct=0.6 + 0.4 * (i % 9) / 8) for i in range(n)]
+
+
+def _signature(res):
+    """Valores que precisam bater exatamente entre execuções."""
+    return (res.length, res.epsilon, res.exhaust_radius, res.cf_est,
+            tuple(res.control_points['Q']), res.contour_x.tobytes(), res.contour_y.tobytes())
+
+
+def _run(solver, params):
+    return _signature(solver.compute(**params))
+
+
+def _check(name: str, solver, cases, workers: int) -> bool:
+    serial = [_run(solver, p) for p in cases]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        threaded = list(pool.map(_run, [solver] * len(cases), cases))
+
+    clone = pickle.loads(pickle.dumps(solver))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        processed = list(pool.map(_run, [clone] * len(cases), cases, chunksize=4))
+
+    ok_threads = threaded == serial
+    ok_procs = processed == serial
+    print(f"{name:<18} threads: {'OK' if ok_threads else 'FALHOU'}   processos: {'OK' if ok_procs else 'FALHOU'}"
+          f"   ({len(cases)} projetos, {workers} workers)")
+    return ok_threads and ok_procs
+
+
+def main():
+    ok = _check("BellNozzleSolver", BellNozzleSolver(), _cases(400), workers=8)
+    ok &= _check("MOCSolver", MOCSolver(n_characteristics=30), _cases(48), workers=8)
+
+    # Lote vetorizado: mesma resposta em thread e em processo
+    solver = BellNozzleSolver()
+    sweep = dict(BASE, k=1.2, length_pct=np.linspace(0.6, 1.0, 1000))
+    ref = solver.compute_batch(**sweep).contour_y
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        same = all(np.array_equal(ref, b.contour_y, equal_nan=True)
+                   for b in pool.map(lambda _: solver.compute_batch(**sweep), range(8)))
+    print(f"{'compute_batch':<18} threads: {'OK' if same else 'FALHOU'}")
+    ok &= same
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 # main.py
 import sys
 import os
+import multiprocessing
 
 # Adiciona o diretório atual ao path para garantir que imports 'src' funcionem
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -8,5 +9,7 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from src.ui.app import App
 
 if __name__ == "__main__":
+    # Executável congelado (PyInstaller): os processos do pool (explorer/tolerâncias) reentram por aqui
+    multiprocessing.freeze_support()
     app = App()
     app.mainloop()
\ No newline at end of file
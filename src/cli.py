@@ -0,0 +1,343 @@
+# src/cli.py
+"""
+Execução em lote sem interface gráfica (servidores Linux sem display).
+
+Lê projetos de CSV, JSON ou arquivos de projeto .nzl, roda o solver e a
+análise de descolamento (FlowSimulation) num pool de processos e grava os
+resultados em CSV ou NPZ à medida que os lotes terminam.
+
+Uso (a partir da raiz do projeto):
+    python -m src.cli projetos.csv -o resultados.csv
+    python -m src.cli motor_a.nzl motor_b.nzl -o resultados.npz --solver moc --workers 4
+
+Colunas/chaves de entrada (unidades base do solver): tr [mm], k, pc [MPa],
+pe [atm], ang_div [graus], ang_cov [graus], length_pct [0-1], rounding_factor;
+opcionais: pa [Pa], solver ('rao' ou 'moc') e name. Os .nzl são convertidos
+a partir das unidades salvas no projeto.
+
+Não importa nada de Tk nem de matplotlib.
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.config import CURRENT_VERSION
+from src.core.designs import ALIASES, DEFAULT_PA, DESIGN_KEYS, SOLVER_NAMES, parse_defaults, solver_for
+from src.core.geometry import SAMPLING_FLOW
+from src.core.units import UnitManager
+from src.simulation.separation import FlowSimulation, SimulationInput
+
+# Colunas de saída: numéricas (CSV e NPZ) e texto (só CSV)
+RESULT_COLUMNS = ('valid', 'converged', 'length', 'epsilon', 'exhaust_radius', 'lambda_eff',
+                  'cf_ideal', 'cf_est', 'theta_n', 'theta_e', 'has_separation', 'separation_x',
+                  'safety_margin')
+TEXT_COLUMNS = ('warnings', 'error')
+
+
+# --- Leitura das entradas ----------------------------------------------------
+
+def _design_from_project(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Projeto salvo pela UI (valores de tela) -> projeto em unidades base."""
+    if data.get("file_type", "nozzle_calc_project") != "nozzle_calc_project":
+        raise ValueError("This file is not a valid NozzleCalc project.")
+    prefs = data.get("unit_prefs", {})
+    categories = {'tr': 'length_to_mm', 'pc': 'pressure_to_mpa', 'pe': 'pressure_to_atm'}
+    design = {}
+    for key, value in data.items():
+        key = ALIASES.get(key, key)
+        if key in DESIGN_KEYS:
+            value = float(value)
+            if key in categories:
+                value = UnitManager.convert(value, prefs.get(key), categories[key])
+            design[key] = value
+    solver = {v: k for k, v in SOLVER_NAMES.items()}.get(data.get("solver"))
+    if solver:
+        design['solver'] = solver
+    return design
+
+
+def _normalize(row: Dict[str, Any]) -> Dict[str, Any]:
+    design: Dict[str, Any] = {}
+    for key, value in row.items():
+        if key is None or value is None or value == '':
+            continue
+        key = ALIASES.get(key.strip(), key.strip())
+        if key in DESIGN_KEYS or key == 'pa':
+            design[key] = float(value)
+        elif key == 'solver':
+            design[key] = str(value).strip().lower()
+        elif key == 'name':
+            design[key] = str(value)
+    return design
+
+
+def read_designs(paths: Sequence[str], defaults: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """Lê todos os arquivos de entrada, na ordem, e completa cada projeto com `defaults`."""
+    designs: List[Dict[str, Any]] = []
+    for path in paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        if path.lower().endswith('.csv'):
+            with open(path, newline='', encoding='utf-8') as f:
+                rows = [_normalize(r) for r in csv.DictReader(f)]
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, dict) and 'designs' in data:
+                data = data['designs']
+            items = data if isinstance(data, list) else [data]
+            rows = []
+            for item in items:
+                if 'file_type' in item or 'unit_prefs' in item:
+                    rows.append(dict(_design_from_project(item), name=item.get('name', stem)))
+                else:
+                    rows.append(_normalize(item))
+        for i, row in enumerate(rows):
+            row.setdefault('name', f"{stem}:{i + 1}" if len(rows) > 1 else stem)
+        designs.extend(rows)
+
+    for i, design in enumerate(designs):
+        for key, value in (defaults or {}).items():
+            design.setdefault(key, value)
+        missing = [k for k in DESIGN_KEYS if k not in design]
+        if missing:
+            raise ValueError(f"Projeto {i + 1} ({design.get('name')}): faltam {', '.join(missing)}.")
+        if design.get('solver', 'rao') not in SOLVER_NAMES:
+            raise ValueError(f"Projeto {i + 1}: solver desconhecido '{design['solver']}' (use rao ou moc).")
+    return designs
+
+
+# --- Cálculo (roda nos processos do pool) -----------------------------------
+
+def run_chunk(designs: List[Dict[str, Any]], options: Dict[str, Any]) -> Dict[str, Any]:
+    """Resolve um lote de projetos; devolve colunas de resultado (uma entrada por projeto)."""
+    n = len(designs)
+    out: Dict[str, Any] = {c: np.full(n, np.nan) for c in RESULT_COLUMNS}
+    for c in ('valid', 'converged', 'has_separation'):
+        out[c] = np.zeros(n, dtype=bool)
+    out['warnings'] = [''] * n
+    out['error'] = [''] * n
+
+    for solver_name in SOLVER_NAMES:
+        idx = [i for i, d in enumerate(designs) if d.get('solver', options['solver']) == solver_name]
+        if not idx:
+            continue
+        solver = solver_for(solver_name, options['moc_n'])
+        args = {k: np.array([designs[i][k] for i in idx]) for k in DESIGN_KEYS}
+        # O Rao reconstrói o contorno analítico por linha; o MOC precisa do contorno denso do lote
+        batch = solver.compute_batch(**args, with_contour=solver_name == 'moc')
+        converged = batch.is_converged()
+
+        for j, i in enumerate(idx):
+            out['valid'][i] = batch.valid[j]
+            out['converged'][i] = converged[j]
+            for c in ('length', 'epsilon', 'exhaust_radius', 'lambda_eff', 'cf_ideal', 'cf_est'):
+                out[c][i] = getattr(batch, c)[j]
+            out['theta_n'][i] = batch.angles['theta_n'][j]
+            out['theta_e'][i] = batch.angles['theta_e'][j]
+            if not batch.valid[j]:
+                out['error'][i] = "Invalid design (no supersonic expansion)."
+                continue
+            if not options['flow']:
+                continue
+            d = designs[i]
+            try:
+                sim_input = SimulationInput(chamber_pressure=d['pc'] * 1e6,
+                                            ambient_pressure=d.get('pa', options['pa']), gamma=d['k'])
+                result = FlowSimulation(batch.row(j), sim_input, sampling=SAMPLING_FLOW).run()
+            except Exception as e:
+                out['error'][i] = f"FlowSimulation: {e}"
+                continue
+            out['has_separation'][i] = result.has_separation
+            out['separation_x'][i] = math.nan if result.separation_x is None else result.separation_x
+            out['safety_margin'][i] = result.safety_margin
+            out['warnings'][i] = " | ".join(result.geometric_warnings)
+    return out
+
+
+# --- Saída -------------------------------------------------------------------
+
+def _input_columns(designs: List[Dict[str, Any]], options: Dict[str, Any]) -> Dict[str, Any]:
+    cols: Dict[str, Any] = {'name': [d['name'] for d in designs],
+                            'solver': [d.get('solver', options['solver']) for d in designs]}
+    for key in DESIGN_KEYS:
+        cols[key] = np.array([d[key] for d in designs], dtype=float)
+    cols['pa'] = np.array([d.get('pa', options['pa']) for d in designs], dtype=float)
+    return cols
+
+
+class CsvWriter:
+    def __init__(self, path: str):
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._header: Optional[List[str]] = None
+
+    def write(self, columns: Dict[str, Any]) -> None:
+        if self._header is None:
+            self._header = list(columns)
+            self._writer.writerow(self._header)
+        data = [columns[c] for c in self._header]
+        for row in zip(*data):
+            self._writer.writerow([int(v) if isinstance(v, np.bool_) else v for v in row])
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class NpzWriter:
+    """
+    Grava um .npz (np.load compatível) sem manter tudo em memória: cada coluna
+    é acumulada num arquivo temporário e vira um membro .npy no fechamento.
+    Colunas de texto (dtype str) ficam com a largura do maior valor visto:
+    cada lote é gravado com a própria largura e o fechamento alarga os
+    lotes mais estreitos, sem truncar nada.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._tmp = tempfile.mkdtemp(prefix="nozzlecalc-npz-")
+        self._dtypes: Dict[str, np.dtype] = {}
+        self._text_chunks: Dict[str, List[Tuple[int, np.dtype]]] = {}
+        self._rows = 0
+
+    def write(self, columns: Dict[str, Any]) -> None:
+        for name, values in columns.items():
+            arr = np.asarray(values)
+            if arr.dtype.kind == 'U':
+                self._text_chunks.setdefault(name, []).append((len(arr), arr.dtype))
+                widest = self._dtypes.get(name, arr.dtype)
+                self._dtypes[name] = arr.dtype if arr.dtype.itemsize > widest.itemsize else widest
+            elif self._dtypes.setdefault(name, arr.dtype) != arr.dtype:
+                arr = arr.astype(self._dtypes[name])
+            with open(os.path.join(self._tmp, name), 'ab') as f:
+                f.write(np.ascontiguousarray(arr).tobytes())
+        self._rows += len(next(iter(columns.values())))
+
+    def close(self) -> None:
+        try:
+            with zipfile.ZipFile(self.path, 'w', compression=zipfile.ZIP_DEFLATED, allowZip64=True) as zf:
+                for name, dtype in self._dtypes.items():
+                    with zf.open(name + ".npy", 'w', force_zip64=True) as member:
+                        header = {'descr': np.lib.format.dtype_to_descr(dtype),
+                                  'fortran_order': False, 'shape': (self._rows,)}
+                        np.lib.format.write_array_header_2_0(member, header)
+                        with open(os.path.join(self._tmp, name), 'rb') as f:
+                            if name not in self._text_chunks:
+                                shutil.copyfileobj(f, member)
+                                continue
+                            for rows, chunk_dtype in self._text_chunks[name]:
+                                chunk = np.frombuffer(f.read(rows * chunk_dtype.itemsize), dtype=chunk_dtype)
+                                member.write(chunk.astype(dtype).tobytes())
+        finally:
+            shutil.rmtree(self._tmp, ignore_errors=True)
+
+
+def open_writer(path: str):
+    """NpzWriter para .npz, CsvWriter para o resto."""
+    return NpzWriter(path) if path.lower().endswith('.npz') else CsvWriter(path)
+
+
+class Progress:
+    """Progresso e vazão (projetos/s) no stderr, no máximo uma linha por `interval` segundos."""
+
+    def __init__(self, total: int, interval: float = 1.0, stream=sys.stderr):
+        self.total = total
+        self.done = 0
+        self.interval = interval
+        self.stream = stream
+        self.start = self._last = time.perf_counter()
+
+    def update(self, n: int) -> None:
+        self.done += n
+        now = time.perf_counter()
+        if now - self._last >= self.interval or self.done == self.total:
+            self._last = now
+            rate = self.done / max(now - self.start, 1e-9)
+            eta = (self.total - self.done) / rate if rate > 0 else math.inf
+            print(f"[{100.0 * self.done / self.total:5.1f}%] {self.done}/{self.total} projetos | "
+                  f"{rate:8.1f} projetos/s | ETA {eta:6.1f} s", file=self.stream, flush=True)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+
+def _chunks(items: List[Any], size: int) -> Iterator[List[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def run(designs: List[Dict[str, Any]], output: str, options: Dict[str, Any],
+        workers: int = 1, chunk: int = 64, progress: Optional[Progress] = None) -> float:
+    """Resolve todos os projetos e grava `output` (.csv ou .npz). Devolve o tempo total."""
+    writer = open_writer(output)
+    progress = progress or Progress(len(designs))
+    chunks = list(_chunks(designs, chunk))
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        if executor is None:
+            results = (run_chunk(c, options) for c in chunks)
+        else:
+            # map() devolve na ordem de entrada: a saída sai na mesma ordem dos arquivos
+            results = executor.map(run_chunk, chunks, [options] * len(chunks))
+        for part, result in zip(chunks, results):
+            columns = _input_columns(part, options)
+            columns.update(result)
+            writer.write(columns)
+            progress.update(len(part))
+    finally:
+        writer.close()
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+    return progress.elapsed
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.cli",
+                                     description=f"NozzleCalc {CURRENT_VERSION} - execução em lote sem interface.")
+    parser.add_argument("inputs", nargs='+', help="Arquivos .csv, .json ou .nzl")
+    parser.add_argument("-o", "--output", required=True, help="Arquivo de saída (.csv ou .npz)")
+    parser.add_argument("--solver", choices=sorted(SOLVER_NAMES), default='rao',
+                        help="Solver padrão (a coluna 'solver' ou o .nzl têm prioridade)")
+    parser.add_argument("--pa", type=float, default=DEFAULT_PA, help="Pressão ambiente padrão [Pa]")
+    parser.add_argument("--set", action='append', default=[], metavar="CHAVE=VALOR",
+                        help="Valor padrão para uma entrada ausente (ex.: --set pe=1.0)")
+    parser.add_argument("--no-flow", action='store_true', help="Não roda a análise de descolamento")
+    parser.add_argument("--moc-n", type=int, default=60, help="Número de características do MOC")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Processos do pool (1 = sem pool)")
+    parser.add_argument("--chunk", type=int, default=64, help="Projetos por tarefa enviada ao pool")
+    args = parser.parse_args(argv)
+
+    try:
+        designs = read_designs(args.inputs, parse_defaults(args.set))
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"Erro ao ler as entradas: {e}", file=sys.stderr)
+        return 2
+    if not designs:
+        print("Nenhum projeto nas entradas.", file=sys.stderr)
+        return 2
+
+    options = {'solver': args.solver, 'pa': args.pa, 'flow': not args.no_flow, 'moc_n': args.moc_n}
+    workers = max(1, min(args.workers, math.ceil(len(designs) / max(1, args.chunk))))
+    print(f"{len(designs)} projetos | {workers} processo(s) | lotes de {args.chunk}", file=sys.stderr)
+
+    elapsed = run(designs, args.output, options, workers=workers, chunk=max(1, args.chunk))
+    print(f"Concluído: {len(designs)} projetos em {elapsed:.2f} s "
+          f"({len(designs) / max(elapsed, 1e-9):.1f} projetos/s) -> {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+# src/core/cache.py
+"""
+Cache em memória para resultados dos solvers.
+
+Os solvers são funções puras das entradas (ver garantia em cada classe), então
+um resultado pode ser reaproveitado sempre que o mesmo solver, com a mesma
+configuração, recebe as mesmas entradas. As entradas são quantizadas
+(algarismos significativos) para que ruído de conversão de unidades
+(ex.: 13.5 mm -> in -> mm) não gere chaves diferentes.
+"""
+import math
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, NamedTuple, Optional
+
+import numpy as np
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    bytes: int
+
+
+def quantize(value: float, digits: int) -> float:
+    """Arredonda para `digits` algarismos significativos (0.0, NaN e inf passam direto)."""
+    value = float(value)
+    if value == 0.0 or not math.isfinite(value):
+        return value
+    return round(value, digits - 1 - math.floor(math.log10(abs(value))))
+
+
+def quantize_array(values: np.ndarray, digits: int) -> np.ndarray:
+    """Versão vetorizada de quantize (determinística, mas pode diferir no último bit)."""
+    values = np.asarray(values, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        mag = np.floor(np.log10(np.abs(values)))
+        scale = 10.0 ** (digits - 1 - np.where(np.isfinite(mag), mag, 0.0))
+        out = np.round(values * scale) / scale
+    return np.where(np.isfinite(out), out, values)
+
+
+def estimate_nbytes(obj: Any, _depth: int = 0) -> int:
+    """Tamanho aproximado de um resultado: arrays NumPy dominam, o resto é um custo fixo."""
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if _depth > 3:
+        return 0
+    if isinstance(obj, dict):
+        return 64 + sum(estimate_nbytes(v, _depth + 1) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return 64 + sum(estimate_nbytes(v, _depth + 1) for v in obj)
+    if hasattr(obj, '__dict__'):
+        return 512 + sum(estimate_nbytes(v, _depth + 1) for v in vars(obj).values())
+    return 32
+
+
+class ResultCache:
+    """
+    Cache LRU limitado por número de entradas e/ou bytes, seguro para threads.
+    Os objetos guardados são compartilhados entre as chamadas: trate-os como
+    somente leitura.
+    """
+
+    def __init__(self, max_entries: Optional[int] = 512, max_bytes: Optional[int] = 64 * 1024 ** 2):
+        if max_entries is not None and max_entries < 1:
+            raise ValueError("max_entries deve ser >= 1.")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._hits = self._misses = self._evictions = 0
+        self._lock = threading.RLock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Consulta sem calcular (conta como acerto/falta como get_or_compute)."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self._misses += 1
+                return default
+            self._data.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+                self._hits += 1
+                return entry[0]
+            self._misses += 1
+
+        # Calcula fora do lock: outras threads continuam consultando o cache
+        value = compute()
+        size = estimate_nbytes(value)
+
+        with self._lock:
+            if key not in self._data:
+                self._data[key] = (value, size)
+                self._bytes += size
+                self._evict()
+        return value
+
+    def _evict(self) -> None:
+        while self._data and (
+                (self.max_entries is not None and len(self._data) > self.max_entries) or
+                (self.max_bytes is not None and self._bytes > self.max_bytes and len(self._data) > 1)):
+            _, (_, size) = self._data.popitem(last=False)
+            self._bytes -= size
+            self._evictions += 1
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._evictions, len(self._data), self._bytes)
+
+    def clear(self) -> None:
+        """Esvazia o cache (os contadores são mantidos)."""
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __getstate__(self):
+        # Serializa só a configuração: o worker que recebe começa com cache vazio
+        return {'max_entries': self.max_entries, 'max_bytes': self.max_bytes}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+
+class CachedSolver:
+    """
+    Envolve um solver com um ResultCache (e, opcionalmente, um DiskCache como
+    segundo nível). compute, compute_metrics e compute_batch passam pelo
+    cache; qualquer outro atributo é repassado ao solver original. A chave inclui a classe do solver, a sua configuração
+    (ex.: n_characteristics do MOC), o método e as entradas quantizadas.
+    """
+
+    def __init__(self, solver: Any, cache: Optional[ResultCache] = None, digits: int = 10, disk=None):
+        self.solver = solver
+        self.cache = cache if cache is not None else ResultCache()
+        self.digits = digits
+        # Segundo nível opcional (src.core.disk_cache.DiskCache), consultado nas faltas da memória
+        self.disk = disk
+        self._solver_key = (type(solver).__module__, type(solver).__qualname__,
+                            tuple(sorted((k, repr(v)) for k, v in vars(solver).items())))
+
+    def _key(self, method: str, args: tuple, kwargs: dict) -> Hashable:
+        parts = []
+        for name, value in [(None, a) for a in args] + sorted(kwargs.items()):
+            if type(value) is float:
+                parts.append((name, quantize(value, self.digits)))
+            elif isinstance(value, (np.ndarray, list, tuple)):
+                arr = quantize_array(value, self.digits)
+                parts.append((name, 'array', arr.shape, arr.tobytes()))
+            elif isinstance(value, bool) or not isinstance(value, (int, float, np.number)):
+                parts.append((name, value))
+            else:
+                parts.append((name, quantize(value, self.digits)))
+        return (self._solver_key, method, tuple(parts))
+
+    def _cached(self, method: str, *args, **kwargs):
+        func = getattr(self.solver, method)
+        compute = lambda: func(*args, **kwargs)
+        if self.disk is not None:
+            namespace = f"{type(self.solver).__module__}.{type(self.solver).__qualname__}.{method}"
+            inputs = {'config': vars(self.solver), 'args': list(args), 'kwargs': kwargs}
+            compute_memory = compute
+            compute = lambda: self.disk.get_or_compute(namespace, inputs, compute_memory)
+        return self.cache.get_or_compute(self._key(method, args, kwargs), compute)
+
+    def compute(self, *args, **kwargs):
+        return self._cached('compute', *args, **kwargs)
+
+    def compute_metrics(self, *args, **kwargs):
+        return self._cached('compute_metrics', *args, **kwargs)
+
+    def compute_batch(self, *args, **kwargs):
+        return self._cached('compute_batch', *args, **kwargs)
+
+    def __getattr__(self, name: str):
+        # Só chamado para atributos que não existem no wrapper
+        if name.startswith('__') or name == 'solver':
+            raise AttributeError(name)
+        return getattr(self.solver, name)
@@ -0,0 +1,48 @@
+# src/core/designs.py
+"""
+Definições de projeto compartilhadas pelas ferramentas sem interface (src.cli,
+explorer, trajetória, teste estático, tolerâncias) e pela UI: chaves de
+entrada, apelidos dos arquivos de projeto, nomes dos solvers e a instância de
+solver por processo.
+
+Não importa nada de Tk nem de matplotlib.
+"""
+from typing import Any, Dict, Sequence
+
+from src.core.solvers.bell_nozzle import BellNozzleSolver
+from src.core.solvers.moc_solver import MOCSolver
+
+DESIGN_KEYS = ('tr', 'k', 'pc', 'pe', 'ang_div', 'ang_cov', 'length_pct', 'rounding_factor')
+# Nomes usados nos arquivos de projeto (.nzl) e na UI
+ALIASES = {'len_pct': 'length_pct', 'rounding': 'rounding_factor'}
+SOLVER_NAMES = {
+    'rao': 'Adapted Rao Method Solver (Rao)',
+    'moc': 'Method of Characteristics Solver (MOC)',
+}
+# Solvers que estimam Cf (o MOC devolve cf_ideal = cf_est = 0)
+CF_SOLVERS = ('rao',)
+DEFAULT_PA = 101325.0
+
+_SOLVERS: Dict[tuple, Any] = {}
+
+
+def solver_for(name: str, moc_n: int = 60):
+    """Instância do solver `name` ('rao' ou 'moc'), uma por configuração em cada processo."""
+    if name not in SOLVER_NAMES:
+        raise ValueError(f"Solver desconhecido '{name}' (use rao ou moc).")
+    key = (name, moc_n)
+    if key not in _SOLVERS:
+        _SOLVERS[key] = BellNozzleSolver() if name == 'rao' else MOCSolver(n_characteristics=moc_n)
+    return _SOLVERS[key]
+
+
+def parse_defaults(items: Sequence[str]) -> Dict[str, Any]:
+    """Itens 'chave=valor' (opção --set) -> valores padrão de projeto em unidades base."""
+    defaults = {}
+    for item in items:
+        key, sep, value = item.partition('=')
+        key = ALIASES.get(key.strip(), key.strip())
+        if not sep or (key not in DESIGN_KEYS and key != 'pa'):
+            raise ValueError(f"--set espera chave=valor com uma chave de projeto, recebeu '{item}'.")
+        defaults[key] = float(value)
+    return defaults
@@ -0,0 +1,270 @@
+# src/core/disk_cache.py
+"""
+Cache persistente em disco, endereçado por conteúdo.
+
+Chave = SHA-256 de (namespace, CURRENT_VERSION, entradas normalizadas). Como a
+versão do programa faz parte da chave, uma atualização invalida sozinha os
+resultados antigos (que acabam removidos pela política de tamanho).
+
+Cada entrada é um .npz sem pickle: os arrays vão em binário nativo e o resto
+do objeto (campos escalares, dicts, dataclasses aninhadas) vira um cabeçalho
+JSON. Só tipos da lista branca (_TYPES) são reconstruídos na leitura.
+"""
+import dataclasses
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+import numpy as np
+
+from src.config import CURRENT_VERSION
+from src.core.cache import quantize, quantize_array
+from src.core.geometry import ArcSegment, QuadraticBezierSegment, PolylineSegment, NozzleContour
+from src.core.models import NozzleResult, NozzleBatchResult, CharacteristicNet
+
+DEFAULT_CACHE_DIR = os.environ.get("NOZZLECALC_CACHE_DIR",
+                                   os.path.join(os.path.expanduser("~"), ".nozzlecalc", "cache"))
+
+# Tipos que podem ser gravados/lidos. Classes que não são dataclass informam
+# como virar dict (encode) e como voltar (decode).
+_TYPES: Dict[str, type] = {}
+_CODECS: Dict[type, tuple] = {
+    PolylineSegment: (lambda s: {'x': s.x, 'y': s.y}, lambda d: PolylineSegment(d['x'], d['y'])),
+    NozzleContour: (lambda c: {'segments': list(c.segments), 'default_counts': list(c.default_counts)},
+                    lambda d: NozzleContour(d['segments'], d['default_counts'])),
+}
+
+
+def register_type(cls: type) -> type:
+    """Libera uma dataclass (ou classe com codec) para gravação no cache de disco."""
+    _TYPES[cls.__qualname__] = cls
+    return cls
+
+
+for _cls in (ArcSegment, QuadraticBezierSegment, PolylineSegment, NozzleContour,
+             NozzleResult, NozzleBatchResult, CharacteristicNet):
+    register_type(_cls)
+
+
+class DiskCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    bytes: int
+
+
+def _normalize(value: Any, digits: int) -> Any:
+    """Forma canônica (JSON) das entradas: floats quantizados, arrays por hash."""
+    if isinstance(value, (bool, str)) or value is None:
+        return value
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        return repr(quantize(value, digits))
+    if isinstance(value, (np.ndarray, list, tuple)):
+        try:
+            arr = quantize_array(value, digits)
+        except (TypeError, ValueError):
+            return [_normalize(v, digits) for v in value]  # lista de objetos (ex.: trechos do contorno)
+        return {'shape': list(arr.shape), 'sha256': hashlib.sha256(arr.tobytes()).hexdigest()}
+    if isinstance(value, dict):
+        return {str(k): _normalize(v, digits) for k, v in value.items()}
+    if type(value) in _CODECS:
+        return {type(value).__qualname__: _normalize(_CODECS[type(value)][0](value), digits)}
+    if dataclasses.is_dataclass(value):
+        return {type(value).__qualname__: {f.name: _normalize(getattr(value, f.name), digits)
+                                           for f in dataclasses.fields(value)}}
+    # repr() de objetos arbitrários pode conter endereços de memória: chave instável
+    raise TypeError(f"Entrada não normalizável para o cache de disco: {type(value).__qualname__}")
+
+
+def make_key(namespace: str, inputs: Dict[str, Any], digits: int = 10, version: str = CURRENT_VERSION) -> str:
+    payload = json.dumps({'ns': namespace, 'version': version, 'inputs': _normalize(inputs, digits)},
+                         sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _encode(obj: Any, arrays: Dict[str, np.ndarray]) -> Any:
+    if isinstance(obj, np.ndarray):
+        name = f"a{len(arrays)}"
+        arrays[name] = obj
+        return {'__array__': name}
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, float) and obj != obj:
+        return {'__float__': 'nan'}
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        return obj
+    if isinstance(obj, tuple):
+        return {'__tuple__': [_encode(v, arrays) for v in obj]}
+    if isinstance(obj, list):
+        return [_encode(v, arrays) for v in obj]
+    if isinstance(obj, dict):
+        return {'__dict__': [[_encode(k, arrays), _encode(v, arrays)] for k, v in obj.items()]}
+
+    cls = type(obj)
+    if _TYPES.get(cls.__qualname__) is not cls:
+        raise TypeError(f"Tipo não suportado pelo cache de disco: {cls.__qualname__}")
+    if cls in _CODECS:
+        fields = _CODECS[cls][0](obj)
+    else:
+        fields = {f.name: getattr(obj, f.name) for f in dataclasses.fields(obj)}
+    return {'__type__': cls.__qualname__, 'fields': {k: _encode(v, arrays) for k, v in fields.items()}}
+
+
+def _decode(node: Any, arrays) -> Any:
+    if isinstance(node, list):
+        return [_decode(v, arrays) for v in node]
+    if not isinstance(node, dict):
+        return node
+    if '__array__' in node:
+        return arrays[node['__array__']]
+    if '__float__' in node:
+        return float(node['__float__'])
+    if '__tuple__' in node:
+        return tuple(_decode(v, arrays) for v in node['__tuple__'])
+    if '__dict__' in node:
+        return {_decode(k, arrays): _decode(v, arrays) for k, v in node['__dict__']}
+
+    cls = _TYPES[node['__type__']]  # KeyError -> entrada inválida
+    fields = {k: _decode(v, arrays) for k, v in node['fields'].items()}
+    if cls in _CODECS:
+        return _CODECS[cls][1](fields)
+    return cls(**fields)
+
+
+def dumps(obj: Any) -> bytes:
+    """Serializa um resultado para o formato binário do cache (.npz)."""
+    arrays: Dict[str, np.ndarray] = {}
+    header = json.dumps(_encode(obj, arrays), separators=(',', ':')).encode('utf-8')
+    buf = io.BytesIO()
+    np.savez(buf, __header__=np.frombuffer(header, dtype=np.uint8), **arrays)
+    return buf.getvalue()
+
+
+def loads(data: bytes) -> Any:
+    with np.load(io.BytesIO(data), allow_pickle=False) as npz:
+        arrays = {name: npz[name] for name in npz.files if name != '__header__'}
+        header = json.loads(npz['__header__'].tobytes().decode('utf-8'))
+    return _decode(header, arrays)
+
+
+class DiskCache:
+    """
+    Diretório de entradas <hash[:2]>/<hash>.npz com limite total de tamanho.
+    Leituras atualizam o mtime e a remoção começa pelas entradas usadas há
+    mais tempo (LRU aproximado pelo sistema de arquivos). Escritas são
+    atômicas (arquivo temporário + os.replace), então vários processos podem
+    compartilhar o mesmo diretório.
+    """
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = 512 * 1024 ** 2, digits: int = 10):
+        if max_bytes <= 0:
+            raise ValueError("max_bytes deve ser positivo.")
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.digits = digits
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        self._bytes = sum(size for _, size, _ in self._scan())
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + ".npz")
+
+    def _scan(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".npz"):
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    yield path, st.st_size, st.st_mtime
+
+    def key(self, namespace: str, inputs: Dict[str, Any]) -> str:
+        return make_key(namespace, inputs, self.digits)
+
+    def get(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = loads(f.read())
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._misses += 1
+            return None
+        except (OSError, ValueError, KeyError, TypeError):
+            # Entrada corrompida ou de formato antigo: descarta
+            self._discard(path)
+            with self._lock:
+                self._misses += 1
+            return None
+        with self._lock:
+            self._hits += 1
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        data = dumps(value)
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        old = os.path.getsize(path) if os.path.exists(path) else 0
+        os.replace(tmp, path)
+        with self._lock:
+            self._bytes += len(data) - old
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def get_or_compute(self, namespace: str, inputs: Dict[str, Any], compute: Callable[[], Any]) -> Any:
+        key = self.key(namespace, inputs)
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def _discard(self, path: str) -> int:
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+            return size
+        except FileNotFoundError:
+            return 0
+
+    def _evict(self) -> None:
+        """Remove as entradas mais antigas até ficar em 90% do limite."""
+        entries = sorted(self._scan(), key=lambda e: e[2])
+        self._bytes = sum(size for _, size, _ in entries)
+        target = 0.9 * self.max_bytes
+        for path, _, _ in entries:
+            if self._bytes <= target:
+                break
+            self._bytes -= self._discard(path)
+            self._evictions += 1
+
+    def info(self) -> DiskCacheInfo:
+        with self._lock:
+            entries = sum(1 for _ in self._scan())
+            return DiskCacheInfo(self._hits, self._misses, self._evictions, entries, self._bytes)
+
+    def clear(self) -> None:
+        with self._lock:
+            for path, _, _ in list(self._scan()):
+                self._discard(path)
+            self._bytes = 0
+
+    def __getstate__(self):
+        return {'directory': self.directory, 'max_bytes': self.max_bytes, 'digits': self.digits}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
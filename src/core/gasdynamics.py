@@ -0,0 +1,294 @@
+# src/core/gasdynamics.py
+"""
+Núcleo vetorizado de escoamento isentrópico quase-1D (gás caloricamente perfeito).
+
+Todas as funções aceitam escalares ou arrays NumPy (com broadcasting) e devolvem
+float para entrada escalar ou np.ndarray para entrada vetorial.
+
+As inversões (área -> Mach e Prandtl-Meyer -> Mach) usam Newton protegido por
+intervalo (bracket): todo passo de Newton que sai do intervalo vira bissecção,
+então a convergência é garantida. Se mesmo assim algum ponto não convergir
+dentro de max_iter, um RuntimeError é levantado (nunca retornamos um Mach não
+convergido em silêncio). Entradas fisicamente sem solução (A/A* < 1, ν fora de
+[0, ν_max)) retornam NaN.
+"""
+from functools import lru_cache
+from typing import Callable, NamedTuple, Tuple, Union
+
+import numpy as np
+
+ArrayLike = Union[float, np.ndarray]
+
+
+def _check_gamma(k: ArrayLike) -> np.ndarray:
+    k = np.asarray(k, dtype=float)
+    if np.any(~(k > 1.0)):
+        raise ValueError("Specific heat ratio (k) must be greater than 1.")
+    return k
+
+
+def _as_output(values: np.ndarray, *inputs) -> ArrayLike:
+    """Mantém o tipo de saída coerente com a entrada (escalar -> float)."""
+    if all(np.ndim(x) == 0 for x in inputs):
+        return float(values)
+    return values
+
+
+def _flat(x: ArrayLike, k: ArrayLike) -> Tuple[np.ndarray, np.ndarray, tuple]:
+    x, k = np.broadcast_arrays(np.asarray(x, dtype=float), _check_gamma(k))
+    return x.ravel().copy(), k.ravel(), x.shape
+
+
+def _bracketed_newton(func: Callable, target: np.ndarray, k: np.ndarray,
+                      lo: np.ndarray, hi: np.ndarray, x0: np.ndarray,
+                      tol: float, max_iter: int, name: str) -> np.ndarray:
+    """
+    Resolve func(x, k) = target elemento a elemento, com func crescente em [lo, hi].
+    func retorna (f(x), f'(x)) e só é avaliada nos pontos ainda não convergidos.
+    """
+    x = np.clip(x0, lo, hi)
+    lo, hi = lo.copy(), hi.copy()
+    active = np.arange(target.size)
+
+    for _ in range(max_iter):
+        if active.size == 0:
+            return x
+        xa, la, ha = x[active], lo[active], hi[active]
+        f, df = func(xa, k[active])
+        r = f - target[active]
+
+        # Atualiza o intervalo pelo sinal do resíduo (func é crescente)
+        la = np.where(r < 0, xa, la)
+        ha = np.where(r > 0, xa, ha)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_new = xa - r / df
+        # Salvaguarda: passo fora do intervalo (ou derivada nula) -> bissecção
+        bad = ~np.isfinite(x_new) | (x_new <= la) | (x_new >= ha)
+        x_new = np.where(bad, 0.5 * (la + ha), x_new)
+
+        hit = np.abs(r) <= tol
+        done = hit | (np.abs(x_new - xa) <= tol * np.abs(xa)) | (ha - la <= tol * ha)
+        x[active] = np.where(hit, xa, x_new)
+        lo[active], hi[active] = la, ha
+        active = active[~done]
+
+    if active.size:
+        raise RuntimeError(f"{name}: {active.size} point(s) did not converge in {max_iter} iterations.")
+    return x
+
+
+# ---------------------------------------------------------------------------
+# Relações isentrópicas diretas
+# ---------------------------------------------------------------------------
+
+def isentropic_ratios(mach: ArrayLike, k: ArrayLike) -> Tuple[ArrayLike, ArrayLike, ArrayLike]:
+    """Razões de estagnação (p/p0, T/T0, rho/rho0) para um dado Mach."""
+    k_arr = _check_gamma(k)
+    m = np.asarray(mach, dtype=float)
+    t_ratio = 1 / (1 + (k_arr - 1) / 2 * m ** 2)
+    p_ratio = t_ratio ** (k_arr / (k_arr - 1))
+    rho_ratio = t_ratio ** (1 / (k_arr - 1))
+    return (_as_output(p_ratio, mach, k), _as_output(t_ratio, mach, k), _as_output(rho_ratio, mach, k))
+
+
+def area_ratio(mach: ArrayLike, k: ArrayLike) -> ArrayLike:
+    """Razão de áreas A/A* para um dado número de Mach."""
+    k_arr = _check_gamma(k)
+    m = np.asarray(mach, dtype=float)
+    exponent = (k_arr + 1) / (2 * (k_arr - 1))
+    with np.errstate(divide='ignore'):
+        out = (1 / m) * ((2 / (k_arr + 1)) * (1 + (k_arr - 1) / 2 * m ** 2)) ** exponent
+    return _as_output(out, mach, k)
+
+
+def prandtl_meyer(mach: ArrayLike, k: ArrayLike) -> ArrayLike:
+    """Função de Prandtl-Meyer ν(M) em radianos (0 para M <= 1)."""
+    k_arr = _check_gamma(k)
+    m = np.asarray(mach, dtype=float)
+    t1 = np.sqrt((k_arr + 1) / (k_arr - 1))
+    t2 = np.sqrt(np.maximum(m ** 2 - 1, 0.0))
+    nu = t1 * np.arctan(t2 / t1) - np.arctan(t2)
+    return _as_output(nu, mach, k)
+
+
+def max_turning_angle(k: ArrayLike) -> ArrayLike:
+    """ν_max = (sqrt((k+1)/(k-1)) - 1) * π/2, limite de ν quando M -> ∞."""
+    k_arr = _check_gamma(k)
+    return _as_output((np.sqrt((k_arr + 1) / (k_arr - 1)) - 1) * np.pi / 2, k)
+
+
+# ---------------------------------------------------------------------------
+# Inversões
+# ---------------------------------------------------------------------------
+
+def _log_area_ratio(m: np.ndarray, k: np.ndarray) -> np.ndarray:
+    exponent = (k + 1) / (2 * (k - 1))
+    return exponent * np.log((2 / (k + 1)) * (1 + (k - 1) / 2 * m ** 2)) - np.log(m)
+
+
+def _log_area_ratio_fdf(m: np.ndarray, k: np.ndarray):
+    # d ln(A/A*) / dM = (M² - 1) / (M (1 + (k-1)/2 M²))
+    return _log_area_ratio(m, k), (m ** 2 - 1) / (m * (1 + (k - 1) / 2 * m ** 2))
+
+
+def _neg_log_area_ratio_fdf(m: np.ndarray, k: np.ndarray):
+    f, df = _log_area_ratio_fdf(m, k)
+    return -f, -df
+
+
+def mach_from_area_ratio(ratio: ArrayLike, k: ArrayLike, supersonic: bool = True,
+                         tol: float = 1e-12, max_iter: int = 100) -> ArrayLike:
+    """
+    Inverte A/A* -> Mach no ramo supersônico (padrão) ou subsônico.
+    Trabalha com ln(A/A*), que é bem condicionado em toda a faixa de ε.
+    A/A* = 1 retorna exatamente Mach 1; A/A* < 1 retorna NaN.
+    """
+    eps, k_arr, shape = _flat(ratio, k)
+    mach = np.full_like(eps, np.nan)
+    mach[eps == 1.0] = 1.0
+
+    solve = np.flatnonzero(eps > 1.0)
+    if solve.size:
+        kk = k_arr[solve]
+        target = np.log(eps[solve])
+        exponent = (kk + 1) / (2 * (kk - 1))
+        # Expansão perto de M = 1: ln(A/A*) ≈ 2/(k+1) * (M-1)²
+        near_one = np.sqrt(target * (kk + 1) / 2)
+
+        if supersonic:
+            # Assíntota para M alto: A/A* ≈ C * M^(2e-1)
+            log_c = exponent * (np.log(2 / (kk + 1)) + np.log((kk - 1) / 2))
+            x0 = np.where(target < 0.5, 1 + near_one, np.exp((target - log_c) / (2 * exponent - 1)))
+            lo = np.ones_like(target)
+            hi = np.maximum(2.0, 2 * x0)
+            for _ in range(64):  # Expande o limite superior até cercar a raiz
+                short = _log_area_ratio(hi, kk) < target
+                if not np.any(short):
+                    break
+                hi[short] *= 2
+            mach[solve] = _bracketed_newton(_log_area_ratio_fdf, target, kk, lo, hi, x0,
+                                            tol, max_iter, "mach_from_area_ratio")
+        else:
+            # Assíntota para M baixo: A/A* ≈ (2/(k+1))^e / M
+            x0 = np.where(target < 0.5, 1 - near_one, (2 / (kk + 1)) ** exponent / eps[solve])
+            lo = np.full_like(target, np.finfo(float).tiny)
+            hi = np.ones_like(target)
+            # No ramo subsônico ln(A/A*) decresce com M: resolvemos -ln(A/A*) = -ln(ε)
+            mach[solve] = _bracketed_newton(_neg_log_area_ratio_fdf, -target, kk, lo, hi, x0,
+                                            tol, max_iter, "mach_from_area_ratio")
+
+    return _as_output(mach.reshape(shape), ratio, k)
+
+
+def _prandtl_meyer_fdf(m: np.ndarray, k: np.ndarray):
+    beta = np.sqrt(np.maximum(m ** 2 - 1, 0.0))
+    t1 = np.sqrt((k + 1) / (k - 1))
+    nu = t1 * np.arctan(beta / t1) - np.arctan(beta)
+    # dν/dM = sqrt(M² - 1) / (M (1 + (k-1)/2 M²))
+    return nu, beta / (m * (1 + (k - 1) / 2 * m ** 2))
+
+
+def inverse_prandtl_meyer(nu: ArrayLike, k: ArrayLike, tol: float = 1e-12, max_iter: int = 100) -> ArrayLike:
+    """
+    Inverte ν (rad) -> Mach supersônico. ν = 0 retorna Mach 1;
+    ν < 0 ou ν >= ν_max retornam NaN.
+    """
+    nu_arr, k_arr, shape = _flat(nu, k)
+    mach = np.full_like(nu_arr, np.nan)
+    mach[nu_arr == 0.0] = 1.0
+
+    nu_max = (np.sqrt((k_arr + 1) / (k_arr - 1)) - 1) * np.pi / 2
+    solve = np.flatnonzero((nu_arr > 0.0) & (nu_arr < nu_max))
+    if solve.size:
+        kk = k_arr[solve]
+        target = nu_arr[solve]
+        # Chute inicial: série perto de M = 1, ν ≈ 2/(3(k+1)) · (2(M-1))^1.5,
+        # e assíntota para M alto, ν_max - ν ≈ (t1² - 1) / M
+        t1_sq = (kk + 1) / (kk - 1)
+        near_one = 1 + 0.5 * (1.5 * (kk + 1) * target) ** (2 / 3)
+        far = (t1_sq - 1) / (nu_max[solve] - target)
+        x0 = np.where(target < 0.5 * nu_max[solve], near_one, far)
+        lo = np.ones_like(target)
+        hi = np.maximum(2.0, 2 * x0)
+        for _ in range(64):
+            short = _prandtl_meyer_fdf(hi, kk)[0] < target
+            if not np.any(short):
+                break
+            hi[short] *= 2
+        mach[solve] = _bracketed_newton(_prandtl_meyer_fdf, target, kk, lo, hi, x0,
+                                        tol, max_iter, "inverse_prandtl_meyer")
+
+    return _as_output(mach.reshape(shape), nu, k)
+
+
+# ---------------------------------------------------------------------------
+# Tabela isentrópica em cache (por gamma)
+# ---------------------------------------------------------------------------
+
+class IsentropicTable(NamedTuple):
+    """Tabela Mach x (A/A*, p/p0, ν) no ramo supersônico, com arrays somente-leitura."""
+    gamma: float
+    mach: np.ndarray
+    area_ratio: np.ndarray
+    pressure_ratio: np.ndarray
+    prandtl_meyer: np.ndarray
+
+    def mach_from_area_ratio(self, ratio: np.ndarray) -> np.ndarray:
+        """
+        Interpolação na tabela; razões acima da faixa tabelada caem no
+        solver exato (mach_from_area_ratio) em vez de serem truncadas.
+        """
+        ratio = np.maximum(np.asarray(ratio, dtype=float), 1.0)
+        mach = np.interp(ratio, self.area_ratio, self.mach)
+        beyond = ratio > self.area_ratio[-1]
+        if np.any(beyond):
+            mach[beyond] = mach_from_area_ratio(ratio[beyond], self.gamma)
+        return mach
+
+    def mach_from_prandtl_meyer(self, nu: np.ndarray) -> np.ndarray:
+        """Inversa de ν(M) por interpolação; ν <= 0 vira Mach 1 e ν acima da faixa usa o solver exato."""
+        nu = np.asarray(nu, dtype=float)
+        mach = np.interp(nu, self.prandtl_meyer, self.mach)
+        beyond = nu > self.prandtl_meyer[-1]
+        if np.any(beyond):
+            mach[beyond] = inverse_prandtl_meyer(nu[beyond], self.gamma)
+        return mach
+
+
+TABLE_SIZE = 4096
+TABLE_MAX_AREA_RATIO = 1e4
+
+
+@lru_cache(maxsize=32)
+def _build_isentropic_table(gamma: float) -> IsentropicTable:
+    # Espaçamento logarítmico em (M - 1): denso perto da garganta, onde A/A* é
+    # achatado (A/A* - 1 ∝ (M-1)²), e esparso no fim, onde a curva é suave.
+    # O Mach máximo se adapta ao gamma para cobrir A/A* até TABLE_MAX_AREA_RATIO.
+    m_max = mach_from_area_ratio(TABLE_MAX_AREA_RATIO, gamma)
+    mach = np.concatenate([[1.0], 1.0 + np.logspace(-6, np.log10(m_max - 1.0), TABLE_SIZE - 1)])
+    ratio = area_ratio(mach, gamma)
+    p_ratio, _, _ = isentropic_ratios(mach, gamma)
+    nu = prandtl_meyer(mach, gamma)
+    for arr in (mach, ratio, p_ratio, nu):
+        arr.flags.writeable = False
+    return IsentropicTable(gamma, mach, ratio, p_ratio, nu)
+
+
+def isentropic_table(gamma: float) -> IsentropicTable:
+    """
+    Tabela isentrópica para o gamma dado, compartilhada pelo processo inteiro
+    (cache LRU de 32 entradas). Chamadas repetidas com o mesmo gamma não
+    reconstroem a tabela.
+    """
+    _check_gamma(gamma)
+    return _build_isentropic_table(float(gamma))
+
+
+def isentropic_table_cache_info():
+    """Contadores do cache (hits, misses, maxsize, currsize)."""
+    return _build_isentropic_table.cache_info()
+
+
+def clear_isentropic_table_cache() -> None:
+    _build_isentropic_table.cache_clear()
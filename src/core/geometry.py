@@ -0,0 +1,510 @@
+# src/core/geometry.py
+"""
+Representação analítica do contorno do bocal.
+
+O contorno é guardado como primitivas geométricas exatas (arcos circulares,
+Bézier quadrática, polilinha da parede MOC) e os pontos só são gerados quando
+alguém pede, na resolução que quiser: N pontos por trecho, espaçamento
+uniforme em comprimento de arco, ou o raio em posições x arbitrárias.
+
+Todos os trechos são monotônicos em x (a parede nunca volta), o que permite
+avaliar r(x) em O(1): localiza o trecho e resolve a primitiva diretamente.
+"""
+import bisect
+import math
+from dataclasses import dataclass
+from functools import cached_property
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+ArrayLike = Union[float, np.ndarray]
+
+# Resolução da tabela comprimento de arco -> parâmetro (só para a Bézier)
+_ARCLENGTH_TABLE_SIZE = 1025
+
+
+@dataclass(frozen=True)
+class ArcSegment:
+    """
+    Arco circular de centro (cx, cy) e raio r, percorrido do ângulo a0 até a1
+    (rad). A parede usa a metade inferior do círculo (centro acima da parede).
+    O parâmetro u em [0, 1] é proporcional ao ângulo, logo ao comprimento.
+    """
+    cx: float
+    cy: float
+    r: float
+    a0: float
+    a1: float
+
+    def point(self, u: ArrayLike) -> Tuple[ArrayLike, ArrayLike]:
+        a = self.a0 + (self.a1 - self.a0) * np.asarray(u, dtype=float)
+        return self.cx + self.r * np.cos(a), self.cy + self.r * np.sin(a)
+
+    def sample(self, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        a = np.linspace(self.a0, self.a1, n)
+        return self.cx + self.r * np.cos(a), self.cy + self.r * np.sin(a)
+
+    def tangent_angle(self, u: ArrayLike) -> ArrayLike:
+        """Inclinação da parede (rad) ao longo do arco."""
+        return self.a0 + (self.a1 - self.a0) * np.asarray(u, dtype=float) + math.pi / 2
+
+    def radius_at(self, x: ArrayLike) -> ArrayLike:
+        dx = np.asarray(x, dtype=float) - self.cx
+        return self.cy - np.sqrt(np.maximum(self.r ** 2 - dx ** 2, 0.0))
+
+    def u_at_fraction(self, f: ArrayLike) -> ArrayLike:
+        return f
+
+    @property
+    def length(self) -> float:
+        return self.r * abs(self.a1 - self.a0)
+
+    @property
+    def x_start(self) -> float:
+        return self.cx + self.r * math.cos(self.a0)
+
+    @property
+    def x_end(self) -> float:
+        return self.cx + self.r * math.cos(self.a1)
+
+
+@dataclass(frozen=True)
+class QuadraticBezierSegment:
+    """Bézier quadrática P0-P1-P2 (no Rao: N-Q-E). O parâmetro u é o t da curva."""
+    p0: Tuple[float, float]
+    p1: Tuple[float, float]
+    p2: Tuple[float, float]
+
+    def point(self, u: ArrayLike) -> Tuple[ArrayLike, ArrayLike]:
+        t = np.asarray(u, dtype=float)
+        b0, b1, b2 = (1 - t) ** 2, 2 * (1 - t) * t, t ** 2
+        return (b0 * self.p0[0] + b1 * self.p1[0] + b2 * self.p2[0],
+                b0 * self.p0[1] + b1 * self.p1[1] + b2 * self.p2[1])
+
+    def sample(self, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        return self.point(np.linspace(0, 1, n))
+
+    def tangent_angle(self, u: ArrayLike) -> ArrayLike:
+        t = np.asarray(u, dtype=float)
+        dx = 2 * (1 - t) * (self.p1[0] - self.p0[0]) + 2 * t * (self.p2[0] - self.p1[0])
+        dy = 2 * (1 - t) * (self.p1[1] - self.p0[1]) + 2 * t * (self.p2[1] - self.p1[1])
+        return np.arctan2(dy, dx)
+
+    def radius_at(self, x: ArrayLike) -> ArrayLike:
+        """
+        Resolve x(t) = x analiticamente. Com x(t) crescente (b > 0) a raiz válida
+        é t = 2(x - x0) / (b + √Δ), forma estável também quando a → 0 (reta).
+        """
+        x0, x1, x2 = self.p0[0], self.p1[0], self.p2[0]
+        a = x0 - 2 * x1 + x2
+        b = 2 * (x1 - x0)
+        rel = np.asarray(x, dtype=float) - x0
+        disc = np.sqrt(np.maximum(b ** 2 + 4 * a * rel, 0.0))
+        t = np.clip(2 * rel / (b + disc), 0.0, 1.0)
+        return self.point(t)[1]
+
+    @cached_property
+    def _arclength_table(self) -> Tuple[np.ndarray, np.ndarray]:
+        t = np.linspace(0, 1, _ARCLENGTH_TABLE_SIZE)
+        x, y = self.point(t)
+        s = np.concatenate([[0.0], np.cumsum(np.hypot(np.diff(x), np.diff(y)))])
+        return t, s
+
+    def u_at_fraction(self, f: ArrayLike) -> ArrayLike:
+        t, s = self._arclength_table
+        return np.interp(np.asarray(f, dtype=float) * s[-1], s, t)
+
+    @property
+    def length(self) -> float:
+        return float(self._arclength_table[1][-1])
+
+    @property
+    def x_start(self) -> float:
+        return self.p0[0]
+
+    @property
+    def x_end(self) -> float:
+        return self.p2[0]
+
+
+class PolylineSegment:
+    """
+    Trecho discreto (parede do MOC, que já nasce como pontos da malha).
+    O parâmetro u é a fração do comprimento de arco; entre vértices a
+    interpolação é linear e r(x) é uma busca binária nos vértices.
+    """
+
+    def __init__(self, x: np.ndarray, y: np.ndarray):
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        s = np.concatenate([[0.0], np.cumsum(np.hypot(np.diff(self.x), np.diff(self.y)))])
+        self._u = s / s[-1] if s[-1] > 0 else np.linspace(0, 1, s.size)
+        self._length = float(s[-1])
+
+    def point(self, u: ArrayLike) -> Tuple[ArrayLike, ArrayLike]:
+        return np.interp(u, self._u, self.x), np.interp(u, self._u, self.y)
+
+    def sample(self, n: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Sem n devolve os próprios vértices."""
+        if n is None:
+            return self.x.copy(), self.y.copy()
+        return self.point(np.linspace(0, 1, n))
+
+    def tangent_angle(self, u: ArrayLike) -> ArrayLike:
+        seg_ang = np.arctan2(np.diff(self.y), np.diff(self.x))
+        idx = np.clip(np.searchsorted(self._u, u, side='right') - 1, 0, seg_ang.size - 1)
+        return seg_ang[idx]
+
+    def radius_at(self, x: ArrayLike) -> ArrayLike:
+        return np.interp(x, self.x, self.y)
+
+    def simplify(self, chord_tol: float, angle_tol: float) -> np.ndarray:
+        """
+        Subconjunto guloso dos vértices (índices): estende cada corda enquanto os
+        vértices pulados ficarem a menos de chord_tol dela e a tangente girar
+        menos que angle_tol (rad). O primeiro e o último vértice são mantidos.
+        """
+        seg_ang = np.arctan2(np.diff(self.y), np.diff(self.x))
+        keep, start, last = [0], 0, self.x.size - 1
+        while start < last:
+            end = start + 1
+            while end < last:
+                cand = end + 1
+                dx, dy = self.x[cand] - self.x[start], self.y[cand] - self.y[start]
+                inner = slice(start + 1, cand)
+                sag = np.abs(dx * (self.y[inner] - self.y[start]) - dy * (self.x[inner] - self.x[start])) / math.hypot(dx, dy)
+                if sag.max() > chord_tol or abs(seg_ang[cand - 1] - seg_ang[start]) > angle_tol:
+                    break
+                end = cand
+            keep.append(end)
+            start = end
+        return np.array(keep)
+
+    def u_at_fraction(self, f: ArrayLike) -> ArrayLike:
+        return f
+
+    @property
+    def length(self) -> float:
+        return self._length
+
+    @property
+    def x_start(self) -> float:
+        return float(self.x[0])
+
+    @property
+    def x_end(self) -> float:
+        return float(self.x[-1])
+
+
+Segment = Union[ArcSegment, QuadraticBezierSegment, PolylineSegment]
+
+
+@dataclass(frozen=True)
+class AdaptiveSampling:
+    """
+    Tolerâncias da amostragem adaptativa (ver NozzleContour.sample_adaptive).
+    chord_tol: erro de corda máximo, na unidade do contorno (None = 1e-4 do comprimento axial).
+    angle_tol: giro máximo da tangente entre pontos vizinhos, em graus.
+    max_points: orçamento total; ao atingi-lo só os piores intervalos são refinados.
+    """
+    chord_tol: Optional[float] = None
+    angle_tol: float = 1.0
+    max_points: int = 400
+
+
+# Predefinições usadas pela UI e pela simulação
+SAMPLING_PLOT = AdaptiveSampling(angle_tol=1.0, max_points=300)
+SAMPLING_MESH_3D = AdaptiveSampling(angle_tol=4.0, max_points=60)
+SAMPLING_DXF = AdaptiveSampling(chord_tol=0.005, angle_tol=1.0, max_points=2000)
+SAMPLING_FLOW = AdaptiveSampling(angle_tol=0.5, max_points=400)
+
+
+class NozzleContour:
+    """
+    Contorno do bocal como sequência de trechos contínuos, ordenados em x.
+    Nada é amostrado na construção: criar o contorno custa só alguns floats.
+    """
+
+    def __init__(self, segments: Sequence[Segment], default_counts: Optional[Sequence[Optional[int]]] = None):
+        self.segments = tuple(segments)
+        self.default_counts = tuple(default_counts) if default_counts is not None else (50,) * len(self.segments)
+        # Início de cada trecho (exceto o primeiro), para localizar x em O(1)
+        self._breaks = [seg.x_start for seg in self.segments[1:]]
+
+    @classmethod
+    def rao(cls, tr: float, ang_cov: float, rounding_factor: float, theta_n: float,
+            n: Tuple[float, float], q: Tuple[float, float], e: Tuple[float, float]) -> "NozzleContour":
+        """Convergente (raio 1.5·Rt) + arco da garganta (0.382·Rt·fator) + Bézier N-Q-E. Ângulos em graus."""
+        r_conv = 1.5 * tr
+        r_div = 0.382 * rounding_factor * tr
+        return cls((
+            ArcSegment(0.0, r_conv + tr, r_conv, math.radians(ang_cov), -math.pi / 2),
+            ArcSegment(0.0, r_div + tr, r_div, -math.pi / 2, math.radians(theta_n - 90)),
+            QuadraticBezierSegment(tuple(n), tuple(q), tuple(e)),
+        ), default_counts=(50, 50, 100))
+
+    @classmethod
+    def mln(cls, tr: float, r_down: float, theta_max: float,
+            wall_x: np.ndarray, wall_y: np.ndarray, n_arc: int = 25) -> "NozzleContour":
+        """Arco da garganta (raio r_down, até θmax em rad) + parede da malha MOC."""
+        return cls((
+            ArcSegment(0.0, tr + r_down, r_down, -math.pi / 2, theta_max - math.pi / 2),
+            PolylineSegment(wall_x, wall_y),
+        ), default_counts=(n_arc + 1, None))
+
+    @property
+    def x_min(self) -> float:
+        return self.segments[0].x_start
+
+    @property
+    def x_max(self) -> float:
+        return self.segments[-1].x_end
+
+    @property
+    def length(self) -> float:
+        """Comprimento de arco total da parede."""
+        return sum(seg.length for seg in self.segments)
+
+    def sample(self, counts: Optional[Sequence[Optional[int]]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Pontos uniformes no parâmetro de cada trecho (counts[i] pontos no trecho i,
+        None = vértices da polilinha). As junções aparecem duplicadas, como no
+        contorno denso original. Sem counts usa a resolução padrão do solver.
+        """
+        counts = self.default_counts if counts is None else counts
+        parts = [seg.sample(c) for seg, c in zip(self.segments, counts)]
+        return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
+    def sample_arclength(self, n: Optional[int] = None, spacing: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """n pontos (ou passo `spacing`) igualmente espaçados em comprimento de arco."""
+        lengths = np.array([seg.length for seg in self.segments])
+        total = lengths.sum()
+        if n is None:
+            if spacing is None or spacing <= 0:
+                raise ValueError("Informe n ou um spacing positivo.")
+            n = max(int(math.ceil(total / spacing)) + 1, 2)
+
+        s = np.linspace(0, total, n)
+        edges = np.concatenate([[0.0], np.cumsum(lengths)])
+        idx = np.clip(np.searchsorted(edges, s, side='right') - 1, 0, len(self.segments) - 1)
+
+        x, y = np.empty(n), np.empty(n)
+        for i, seg in enumerate(self.segments):
+            sel = idx == i
+            if not np.any(sel):
+                continue
+            frac = (s[sel] - edges[i]) / lengths[i] if lengths[i] > 0 else np.zeros(sel.sum())
+            x[sel], y[sel] = seg.point(seg.u_at_fraction(np.clip(frac, 0.0, 1.0)))
+        return x, y
+
+    def sample_adaptive(self, sampling: Optional[AdaptiveSampling] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Amostragem guiada pela curvatura: cada intervalo é dividido ao meio enquanto
+        o erro de corda (distância do ponto médio à corda) passar de chord_tol ou a
+        tangente girar mais que angle_tol. Trechos retos ficam com poucos pontos e
+        o arco da garganta recebe a maior parte do orçamento. Sem junções duplicadas.
+        """
+        sampling = sampling or AdaptiveSampling()
+        chord_tol = sampling.chord_tol if sampling.chord_tol is not None else 1e-4 * (self.x_max - self.x_min)
+        angle_tol = math.radians(sampling.angle_tol)
+
+        # Polilinhas já são discretas: só escolhe quais vértices manter
+        kept = {i: seg.simplify(chord_tol, angle_tol) for i, seg in enumerate(self.segments)
+                if isinstance(seg, PolylineSegment)}
+        smooth = np.array([i for i in range(len(self.segments)) if i not in kept], dtype=int)
+        fixed_points = sum(idx.size for idx in kept.values())
+        room = sampling.max_points - 3 * smooth.size
+        if kept and fixed_points > room:
+            # Orçamento estourado só pelas polilinhas: desbasta uniformemente
+            share = max(room // len(kept), 2)
+            kept = {i: idx[np.unique(np.linspace(0, idx.size - 1, min(share, idx.size)).round().astype(int))]
+                    for i, idx in kept.items()}
+            fixed_points = sum(idx.size for idx in kept.values())
+
+        # Intervalos (trecho, u0, u1) dos trechos analíticos; começa com dois por trecho
+        seg_id = np.repeat(smooth, 2)
+        u0 = np.tile([0.0, 0.5], smooth.size)
+        u1 = np.tile([0.5, 1.0], smooth.size)
+
+        def evaluate(u):
+            x, y, ang = np.empty_like(u), np.empty_like(u), np.empty_like(u)
+            for i, seg in enumerate(self.segments):
+                sel = seg_id == i
+                if np.any(sel):
+                    x[sel], y[sel] = seg.point(u[sel])
+                    ang[sel] = seg.tangent_angle(u[sel])
+            return x, y, ang
+
+        while u0.size:
+            xa, ya, ta = evaluate(u0)
+            xb, yb, tb = evaluate(u1)
+            xm, ym, _ = evaluate(0.5 * (u0 + u1))
+
+            chord = np.hypot(xb - xa, yb - ya)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                sag = np.abs((xb - xa) * (ym - ya) - (yb - ya) * (xm - xa)) / chord
+            sag = np.where(chord > 0, sag, 0.0)
+            turn = np.abs(np.angle(np.exp(1j * (tb - ta))))
+            score = np.maximum(sag / chord_tol, turn / angle_tol)
+
+            split = np.flatnonzero(score > 1.0)
+            budget = sampling.max_points - (u0.size + smooth.size + fixed_points)
+            if split.size > budget:
+                split = split[np.argsort(score[split])[::-1][:max(budget, 0)]]
+            if split.size == 0:
+                break
+
+            mid = 0.5 * (u0[split] + u1[split])
+            seg_id = np.concatenate([seg_id, seg_id[split]])
+            u0, u1 = np.concatenate([u0, mid]), np.concatenate([u1, u1[split]])
+            u1[split] = mid
+
+        xs, ys = [], []
+        for i, seg in enumerate(self.segments):
+            if i in kept:
+                x, y = seg.x[kept[i]], seg.y[kept[i]]
+            else:
+                x, y = seg.point(np.concatenate([[0.0], np.sort(u1[seg_id == i])]))
+            start = 0 if i == 0 else 1
+            xs.append(x[start:])
+            ys.append(y[start:])
+        return np.concatenate(xs), np.concatenate(ys)
+
+    def radius_at(self, x: ArrayLike) -> ArrayLike:
+        """Raio da parede em x (escalar ou array). Fora do contorno retorna NaN."""
+        # Tolerância relativa nas pontas (ex.: cos(-π/2) não é exatamente zero)
+        tol = 1e-9 * (self.x_max - self.x_min)
+        lo, hi = self.x_min - tol, self.x_max + tol
+        if np.ndim(x) == 0:
+            xf = float(x)
+            if not (lo <= xf <= hi):
+                return math.nan
+            return float(self.segments[bisect.bisect_right(self._breaks, xf)].radius_at(xf))
+
+        x = np.asarray(x, dtype=float)
+        out = np.full(x.shape, np.nan)
+        inside = (x >= lo) & (x <= hi)
+        idx = np.searchsorted(self._breaks, x, side='right')
+        for i, seg in enumerate(self.segments):
+            sel = inside & (idx == i)
+            if np.any(sel):
+                out[sel] = seg.radius_at(x[sel])
+        return out
+
+
+def stack_contours(contours: Sequence[Tuple[np.ndarray, np.ndarray]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Empilha contornos de tamanhos diferentes em arrays (B, M), completando com NaN."""
+    m = max(len(cx) for cx, _ in contours)
+    xs = np.full((len(contours), m), np.nan)
+    ys = np.full((len(contours), m), np.nan)
+    for i, (cx, cy) in enumerate(contours):
+        xs[i, :len(cx)] = cx
+        ys[i, :len(cy)] = cy
+    return xs, ys
+
+
+@dataclass
+class ContourQuality:
+    """
+    Diagnóstico de um lote de contornos (uma linha por contorno).
+    slope: inclinação de cada trecho entre pontos vizinhos [graus], (B, M-1).
+    turning: giro da tangente em cada vértice interno [graus], (B, M-2).
+    curvature: curvatura discreta nos vértices internos [rad / unidade do contorno], (B, M-2).
+    throat_exit: inclinação da corda que sai da garganta [graus], (B,); NaN se não avaliada.
+    kink_mask: vértices internos com giro acima de kink_angle, (B, M-2).
+    """
+    x: np.ndarray
+    slope: np.ndarray
+    turning: np.ndarray
+    curvature: np.ndarray
+    throat_exit: np.ndarray
+    kink_mask: np.ndarray
+    throat_angle: float
+    kink_angle: float
+
+    @property
+    def sharp_throat(self) -> np.ndarray:
+        return np.abs(self.throat_exit) > self.throat_angle
+
+    @property
+    def valid(self) -> np.ndarray:
+        """True para os contornos sem saída de garganta abrupta e sem quinas."""
+        return ~self.sharp_throat & ~self.kink_mask.any(axis=1)
+
+    def kinks(self, i: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Posição x e giro total (graus, com sinal) de todas as quinas do contorno i.
+        Vértices vizinhos marcados são a mesma quina caindo entre dois pontos: somados.
+        """
+        idx = np.flatnonzero(self.kink_mask[i])
+        if idx.size == 0:
+            return np.empty(0), np.empty(0)
+        starts = np.flatnonzero(np.diff(idx, prepend=-2) > 1)
+        angle = np.add.reduceat(self.turning[i, idx], starts)
+        weight = np.abs(self.turning[i, idx])
+        loc = np.add.reduceat(self.x[i, idx + 1] * weight, starts) / np.add.reduceat(weight, starts)
+        return loc, angle
+
+    def warnings(self, i: int = 0) -> List[str]:
+        out = []
+        if self.sharp_throat[i]:
+            out.append(f"CRITICAL: Sharp throat exit ({self.throat_exit[i]:.1f}°). Flow may detach. "
+                       f"Increasing TRF is suggested.")
+        for loc, angle in zip(*self.kinks(i)):
+            out.append(f"DISCONTINUITY: Kink of {abs(angle):.1f}° detected at X ≈ {loc:.3f}")
+        return out
+
+
+def contour_quality(x: np.ndarray, y: np.ndarray, throat_lookahead: float = 0.037,
+                    throat_angle: float = 2.0, kink_angle: float = 3.0) -> ContourQuality:
+    """
+    Inclinação, giro e curvatura ao longo de contornos que começam na garganta.
+
+    x, y: um contorno (1-D) ou um lote (2-D, NaN no fim das linhas mais curtas;
+    ver stack_contours). Tudo é relativo ao raio da garganta, então vale para
+    qualquer unidade de comprimento: a saída da garganta é a inclinação da corda
+    até a parede a throat_lookahead * Rt da garganta (0.037 Rt = 0.5 mm para
+    Rt = 13.5 mm). Uma quina é um vértice onde a tangente gira mais que
+    kink_angle de uma vez (as amostragens do contorno limitam o giro entre
+    pontos vizinhos de trechos suaves bem abaixo disso).
+    """
+    x = np.atleast_2d(np.asarray(x, dtype=float))
+    y = np.atleast_2d(np.asarray(y, dtype=float))
+    if x.shape != y.shape:
+        raise ValueError("x e y devem ter o mesmo formato.")
+    rows = np.arange(x.shape[0])
+
+    dx, dy = np.diff(x, axis=1), np.diff(y, axis=1)
+    ds = np.hypot(dx, dy)
+    # Pontos repetidos (ou separados só por ruído de arredondamento, como as
+    # junções duplicadas de NozzleContour.sample) não têm direção: herdam a do
+    # último trecho com comprimento, para a quina na junção ainda ser medida
+    span = np.nanmax(x, axis=1, keepdims=True) - x[:, :1]
+    has_dir = ds > 1e-9 * span
+    slope = np.where(has_dir, np.arctan2(dy, dx), np.nan)
+    last = np.maximum.accumulate(np.where(has_dir, np.arange(ds.shape[1]), 0), axis=1)
+    slope = np.where(np.isfinite(ds), slope[rows[:, None], last], np.nan)
+    turning = (slope[:, 1:] - slope[:, :-1] + np.pi) % (2 * np.pi) - np.pi
+    with np.errstate(divide='ignore', invalid='ignore'):
+        curvature = turning / (0.5 * (ds[:, 1:] + ds[:, :-1]))
+
+    # Contornos com poucos pontos não são avaliados
+    enough = np.sum(np.isfinite(x) & np.isfinite(y), axis=1) >= 5
+
+    # Raio interpolado exatamente a throat_lookahead * Rt da garganta (independe da amostragem)
+    lookahead = throat_lookahead * np.abs(y[:, 0])
+    ahead = x > (x[:, :1] + lookahead[:, None])
+    idx = np.maximum(np.argmax(ahead, axis=1), 1)
+    x0, x1, y0, y1 = x[rows, idx - 1], x[rows, idx], y[rows, idx - 1], y[rows, idx]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        y_ahead = y0 + (y1 - y0) * (x[:, 0] + lookahead - x0) / (x1 - x0)
+    throat_exit = np.degrees(np.arctan2(y_ahead - y[:, 0], lookahead))
+    throat_exit = np.where(enough & ahead.any(axis=1), throat_exit, np.nan)
+
+    turning = np.degrees(turning)
+    kink_mask = (np.abs(turning) > kink_angle) & enough[:, None]
+
+    return ContourQuality(x=x, slope=np.degrees(slope), turning=turning, curvature=curvature,
+                          throat_exit=throat_exit, kink_mask=kink_mask,
+                          throat_angle=throat_angle, kink_angle=kink_angle)
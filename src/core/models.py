@@ -1,7 +1,27 @@
 # src/core/models.py
-from dataclasses import dataclass
-from typing import Dict, Tuple
+from dataclasses import dataclass, field, fields
+from typing import Dict, Tuple, Optional, Sequence, Union
 import numpy as np
+from src.core.geometry import NozzleContour, AdaptiveSampling
+
+@dataclass
+class CharacteristicNet:
+    """
+    Malha do Método das Características (MOC) já em coordenadas do bocal.
+    Nós internos indexados por (i, j): cruzamento da característica C- nº i
+    (leque do canto) com a C+ nº j (refletida no eixo). Posições com j > i
+    não existem e ficam com NaN. A diagonal i == j está sobre o eixo.
+    """
+    x: np.ndarray
+    y: np.ndarray
+    theta: np.ndarray
+    mach: np.ndarray
+    wall_x: np.ndarray
+    wall_y: np.ndarray
+
+    @property
+    def n_characteristics(self) -> int:
+        return self.x.shape[0]
 
 @dataclass
 class NozzleResult:
@@ -20,5 +40,303 @@ class NozzleResult:
     lambda_eff: float
     cf_ideal: float
     cf_est: float
-    contour_x: np.ndarray 
-    contour_y: np.ndarray
\ No newline at end of file
+    # None quando gerado pelo caminho rápido (compute_metrics)
+    contour_x: Optional[np.ndarray] = None
+    contour_y: Optional[np.ndarray] = None
+    # Apenas no solver MOC: malha de características para plotagem
+    characteristic_net: Optional[CharacteristicNet] = None
+    # Primitivas exatas do contorno; pontos gerados sob demanda em qualquer resolução
+    contour: Optional[NozzleContour] = None
+
+    def sample_wall(self, sampling: Optional[AdaptiveSampling] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Contorno com amostragem adaptativa; sem primitivas, devolve o contorno denso."""
+        if self.contour is None:
+            return self.contour_x, self.contour_y
+        return self.contour.sample_adaptive(sampling)
+
+def _converged(valid: np.ndarray, throat_radius: np.ndarray, control_points: Dict[str, np.ndarray]) -> np.ndarray:
+    nx, ny = control_points['N'].T
+    qx, qy = control_points['Q'].T
+    ex, ey = control_points['E'].T
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cond1 = (nx >= 0) & (ny >= throat_radius)
+        cond2 = (ex >= qx) & (ey >= qy)
+        cond3 = qy >= ny
+        dx = ex - nx
+        slope_ne = (ey - ny) / np.where(dx != 0, dx, 1.0)
+        cond4 = (dx != 0) & (qy >= ny + slope_ne * (qx - nx))
+
+    return valid & cond1 & cond2 & cond3 & cond4
+
+@dataclass
+class NozzleBatchResult:
+    """
+    Resultado vetorizado de um lote de projetos (uma linha por projeto).
+    Campos escalares viram vetores (n,), pontos de controle viram (n, 2)
+    e os contornos (quando gerados) viram matrizes (n, m).
+    Linhas inválidas têm valid=False e NaN nos campos numéricos.
+    """
+    valid: np.ndarray
+    length: np.ndarray
+    epsilon: np.ndarray
+    throat_radius: np.ndarray
+    exhaust_radius: np.ndarray
+    percent: np.ndarray
+    throat_area: np.ndarray
+    exhaust_area: np.ndarray
+    control_points: Dict[str, np.ndarray]
+    angles: Dict[str, np.ndarray]
+    rounding_factor: np.ndarray
+    cone_ref_length: np.ndarray
+    divergent_angle_input: np.ndarray
+    lambda_eff: np.ndarray
+    cf_ideal: np.ndarray
+    cf_est: np.ndarray
+    contour_x: Optional[np.ndarray] = None
+    contour_y: Optional[np.ndarray] = None
+    # Ângulo do convergente (graus): com ele row() reconstrói o contorno analítico do Rao
+    convergent_angle_input: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.valid)
+
+    def is_converged(self) -> np.ndarray:
+        """Mesmo critério de convergência N-Q-E da UI, aplicado a todas as linhas."""
+        return _converged(self.valid, self.throat_radius, self.control_points)
+
+    def row(self, i: int) -> NozzleResult:
+        """Reconstrói o NozzleResult escalar da linha i."""
+        has_contour = self.contour_x is not None
+        contour = None
+        if self.convergent_angle_input is not None and self.valid[i]:
+            contour = NozzleContour.rao(
+                float(self.throat_radius[i]), float(self.convergent_angle_input[i]),
+                float(self.rounding_factor[i]), float(self.angles['theta_n'][i]),
+                *(tuple(map(float, self.control_points[p][i])) for p in ('N', 'Q', 'E'))
+            )
+        return NozzleResult(
+            length=float(self.length[i]),
+            epsilon=float(self.epsilon[i]),
+            throat_radius=float(self.throat_radius[i]),
+            exhaust_radius=float(self.exhaust_radius[i]),
+            percent=float(self.percent[i]),
+            throat_area=float(self.throat_area[i]),
+            exhaust_area=float(self.exhaust_area[i]),
+            control_points={k: (float(v[i, 0]), float(v[i, 1])) for k, v in self.control_points.items()},
+            angles={k: float(v[i]) for k, v in self.angles.items()},
+            rounding_factor=float(self.rounding_factor[i]),
+            cone_ref_length=float(self.cone_ref_length[i]),
+            divergent_angle_input=float(self.divergent_angle_input[i]),
+            lambda_eff=float(self.lambda_eff[i]),
+            cf_ideal=float(self.cf_ideal[i]),
+            cf_est=float(self.cf_est[i]),
+            contour_x=self.contour_x[i] if has_contour else None,
+            contour_y=self.contour_y[i] if has_contour else None,
+            contour=contour
+        )
+
+# Campos escalares comuns a NozzleResult, NozzleBatchResult e SweepResult
+SCALAR_FIELDS = ('length', 'epsilon', 'throat_radius', 'exhaust_radius', 'percent', 'throat_area',
+                 'exhaust_area', 'rounding_factor', 'cone_ref_length', 'divergent_angle_input',
+                 'lambda_eff', 'cf_ideal', 'cf_est')
+
+@dataclass
+class SweepResult:
+    """
+    Varredura guardada por colunas (struct-of-arrays), para muitos projetos.
+    Uma coluna por campo escalar, pontos de controle em (n, 2), entradas do
+    projeto (tr, k, pc, ...) em `inputs`, verificações por projeto (máscaras
+    e margens, ex.: 'has_separation') em `checks` e contornos opcionais em (n, m).
+    Fatias (sweep[a:b]) e linhas (sweep[i]) são visões sem cópia; filter,
+    sort e indexação por máscara/índices copiam só as linhas escolhidas.
+    """
+    valid: np.ndarray
+    length: np.ndarray
+    epsilon: np.ndarray
+    throat_radius: np.ndarray
+    exhaust_radius: np.ndarray
+    percent: np.ndarray
+    throat_area: np.ndarray
+    exhaust_area: np.ndarray
+    control_points: Dict[str, np.ndarray]
+    angles: Dict[str, np.ndarray]
+    rounding_factor: np.ndarray
+    cone_ref_length: np.ndarray
+    divergent_angle_input: np.ndarray
+    lambda_eff: np.ndarray
+    cf_ideal: np.ndarray
+    cf_est: np.ndarray
+    inputs: Dict[str, np.ndarray] = field(default_factory=dict)
+    checks: Dict[str, np.ndarray] = field(default_factory=dict)
+    contour_x: Optional[np.ndarray] = None
+    contour_y: Optional[np.ndarray] = None
+    # Ângulo do convergente (graus), só nas varreduras do Rao: com ele to_result() refaz o contorno analítico
+    convergent_angle_input: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_batch(cls, batch: NozzleBatchResult, inputs: Optional[Dict[str, np.ndarray]] = None,
+                   dtype=np.float64, contour_dtype=np.float32, keep_contours: bool = True,
+                   checks: Optional[Dict[str, np.ndarray]] = None) -> "SweepResult":
+        """
+        Converte um NozzleBatchResult. dtype vale para as colunas numéricas e
+        contour_dtype para os contornos (float32 corta pela metade a maior parte da memória).
+        Em `checks`, máscaras booleanas ficam bool e o resto segue dtype.
+        """
+        n = len(batch)
+        col = lambda a: np.ascontiguousarray(a, dtype=dtype)
+        has_contour = keep_contours and batch.contour_x is not None
+        return cls(
+            valid=np.asarray(batch.valid, dtype=bool),
+            control_points={k: col(v) for k, v in batch.control_points.items()},
+            angles={k: col(v) for k, v in batch.angles.items()},
+            inputs={k: col(np.broadcast_to(v, (n,))) for k, v in (inputs or {}).items()},
+            checks={k: np.ascontiguousarray(v) if np.asarray(v).dtype == bool else col(v)
+                    for k, v in (checks or {}).items()},
+            contour_x=np.ascontiguousarray(batch.contour_x, dtype=contour_dtype) if has_contour else None,
+            contour_y=np.ascontiguousarray(batch.contour_y, dtype=contour_dtype) if has_contour else None,
+            convergent_angle_input=(None if batch.convergent_angle_input is None
+                                    else col(np.broadcast_to(batch.convergent_angle_input, (n,)))),
+            **{name: col(getattr(batch, name)) for name in SCALAR_FIELDS},
+        )
+
+    @classmethod
+    def concat(cls, parts: Sequence["SweepResult"]) -> "SweepResult":
+        """Junta varreduras com as mesmas colunas (ex.: lotes calculados em paralelo)."""
+        if not parts:
+            raise ValueError("Nenhuma varredura para juntar.")
+        first = parts[0]
+        values = {}
+        for f in fields(cls):
+            value = getattr(first, f.name)
+            if isinstance(value, dict):
+                values[f.name] = {k: np.concatenate([getattr(p, f.name)[k] for p in parts]) for k in value}
+            elif value is None:
+                values[f.name] = None
+            else:
+                values[f.name] = np.concatenate([getattr(p, f.name) for p in parts])
+        return cls(**values)
+
+    def __len__(self) -> int:
+        return len(self.valid)
+
+    def _map(self, func) -> "SweepResult":
+        values = {}
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if isinstance(value, dict):
+                values[f.name] = {k: func(v) for k, v in value.items()}
+            else:
+                values[f.name] = None if value is None else func(value)
+        return type(self)(**values)
+
+    def __getitem__(self, index: Union[int, slice, np.ndarray]):
+        if isinstance(index, (int, np.integer)):
+            n = len(self)
+            if not -n <= index < n:
+                raise IndexError(index)
+            return SweepRow(self, int(index) % n)
+        return self._map(lambda a: a[index])
+
+    def filter(self, mask: np.ndarray) -> "SweepResult":
+        mask = np.asarray(mask, dtype=bool)
+        if mask.shape != (len(self),):
+            raise ValueError("A máscara deve ter uma entrada por linha.")
+        return self._map(lambda a: a[mask])
+
+    def column(self, name: str) -> np.ndarray:
+        """Coluna pelo nome: campo escalar, entrada ('pc'), verificação ('safety_margin'), ângulo ('theta_n') ou ponto ('E_x')."""
+        if name in SCALAR_FIELDS or name == 'valid':
+            return getattr(self, name)
+        if name in self.inputs:
+            return self.inputs[name]
+        if name in self.checks:
+            return self.checks[name]
+        if name in self.angles:
+            return self.angles[name]
+        point, _, axis = name.rpartition('_')
+        if point in self.control_points and axis in ('x', 'y'):
+            return self.control_points[point][:, 'xy'.index(axis)]
+        raise KeyError(name)
+
+    def sort(self, by: str, descending: bool = False) -> "SweepResult":
+        """Ordena pela coluna `by` (estável; NaN vão para o fim)."""
+        key = np.asarray(self.column(by), dtype=float)
+        order = np.argsort(-key if descending else key, kind='stable')
+        return self._map(lambda a: a[order])
+
+    def is_converged(self) -> np.ndarray:
+        return _converged(self.valid, self.throat_radius, self.control_points)
+
+    @property
+    def nbytes(self) -> int:
+        total = 0
+        for f in fields(self):
+            value = getattr(self, f.name)
+            arrays = value.values() if isinstance(value, dict) else ([] if value is None else [value])
+            total += sum(a.nbytes for a in arrays)
+        return total
+
+class SweepRow:
+    """
+    Uma linha do SweepResult com a interface de leitura do NozzleResult.
+    Não copia nada: os valores são lidos das colunas a cada acesso.
+    """
+    __slots__ = ('sweep', 'index')
+
+    def __init__(self, sweep: SweepResult, index: int):
+        self.sweep = sweep
+        self.index = index
+
+    def __getattr__(self, name: str):
+        if name in SCALAR_FIELDS:
+            return float(getattr(self.sweep, name)[self.index])
+        raise AttributeError(name)
+
+    @property
+    def valid(self) -> bool:
+        return bool(self.sweep.valid[self.index])
+
+    @property
+    def control_points(self) -> Dict[str, Tuple[float, float]]:
+        return {k: (float(v[self.index, 0]), float(v[self.index, 1])) for k, v in self.sweep.control_points.items()}
+
+    @property
+    def angles(self) -> Dict[str, float]:
+        return {k: float(v[self.index]) for k, v in self.sweep.angles.items()}
+
+    @property
+    def inputs(self) -> Dict[str, float]:
+        return {k: float(v[self.index]) for k, v in self.sweep.inputs.items()}
+
+    @property
+    def checks(self) -> Dict[str, Union[bool, float]]:
+        return {k: v[self.index].item() for k, v in self.sweep.checks.items()}
+
+    @property
+    def contour_x(self) -> Optional[np.ndarray]:
+        return None if self.sweep.contour_x is None else self.sweep.contour_x[self.index]
+
+    @property
+    def contour_y(self) -> Optional[np.ndarray]:
+        return None if self.sweep.contour_y is None else self.sweep.contour_y[self.index]
+
+    def to_result(self) -> NozzleResult:
+        """Cópia independente como NozzleResult (contorno analítico do Rao refeito se a varredura for do Rao)."""
+        contour = None
+        ang_cov = self.sweep.convergent_angle_input
+        if ang_cov is not None and self.valid:
+            cp = self.control_points
+            contour = NozzleContour.rao(self.throat_radius, float(ang_cov[self.index]), self.rounding_factor,
+                                       self.angles['theta_n'], cp['N'], cp['Q'], cp['E'])
+        return NozzleResult(
+            control_points=self.control_points,
+            angles=self.angles,
+            contour_x=None if self.contour_x is None else np.array(self.contour_x, dtype=float),
+            contour_y=None if self.contour_y is None else np.array(self.contour_y, dtype=float),
+            contour=contour,
+            **{name: getattr(self, name) for name in SCALAR_FIELDS},
+        )
+
+    def __repr__(self) -> str:
+        return f"SweepRow({self.index}, cf_est={self.cf_est:.4f}, epsilon={self.epsilon:.3f})"
@@ -1,10 +1,113 @@
 # src/core/solvers/bell_nozzle.py
 import math
+import bisect
 import numpy as np
 from typing import Tuple
-from src.core.models import NozzleResult
+from src.core import gasdynamics
+from src.core.geometry import NozzleContour
+from src.core.models import NozzleResult, NozzleBatchResult
+
+class RaoAngleTable:
+    """
+    Tabela 2-D pré-computada dos ângulos de Rao (θn, θe) sobre (epsilon, % de comprimento).
+
+    Guarda os coeficientes exatos da interpolação linear por partes em epsilon
+    (inclinação e valor de cada segmento, para as curvas de 60/80/90%) e repete,
+    operação por operação, a fórmula do np.interp. O resultado é bit a bit igual
+    à cadeia original de np.interp, tanto no caminho escalar (floats puros)
+    quanto no vetorizado (arrays de epsilon e porcentagem).
+    """
+
+    def __init__(self, aratio: np.ndarray, data_map: dict):
+        self.pcts = np.array([p / 100 for p in sorted(data_map)])
+        self.eps = np.asarray(aratio, dtype=float)
+        # (2, 3, 8): [tn|te] x [60|80|90] x epsilon
+        self.values = np.array([[data_map[p][key] for p in sorted(data_map)] for key in ('tn', 'te')], dtype=float)
+        self.slopes = np.diff(self.values, axis=-1) / np.diff(self.eps)
+
+        # Cópias em floats do Python para o caminho escalar (sem despacho do NumPy)
+        self._eps_list = self.eps.tolist()
+        self._pct_list = self.pcts.tolist()
+        self._values_list = self.values.tolist()
+        self._slopes_list = self.slopes.tolist()
+
+        # Tabela compartilhada entre todas as instâncias e threads: somente leitura
+        for arr in (self.pcts, self.eps, self.values, self.slopes):
+            arr.setflags(write=False)
+
+    @staticmethod
+    def _interp_scalar(x: float, xp: list, fp: list, slopes: list = None) -> float:
+        if x != x:
+            return x
+        if x < xp[0]:
+            return fp[0]
+        if x >= xp[-1]:
+            return fp[-1]
+        j = bisect.bisect_right(xp, x) - 1
+        if xp[j] == x:
+            return fp[j]
+        slope = slopes[j] if slopes is not None else (fp[j + 1] - fp[j]) / (xp[j + 1] - xp[j])
+        return slope * (x - xp[j]) + fp[j]
+
+    def lookup(self, eps: float, percent: float) -> Tuple[float, float]:
+        """Consulta escalar: retorna (θn, θe) em graus."""
+        eps = float(eps)
+        out = []
+        for values, slopes in zip(self._values_list, self._slopes_list):
+            by_pct = [self._interp_scalar(eps, self._eps_list, v, s) for v, s in zip(values, slopes)]
+            out.append(self._interp_scalar(float(percent), self._pct_list, by_pct))
+        return out[0], out[1]
+
+    @staticmethod
+    def _interp_rows(x: np.ndarray, xp: np.ndarray, fp: np.ndarray, slopes: np.ndarray = None) -> np.ndarray:
+        """np.interp vetorizado em que as ordenadas fp (..., len(xp), n) podem variar por coluna."""
+        n = len(xp)
+        j = np.clip(np.searchsorted(xp, x, side='right') - 1, 0, n - 2)
+        cols = np.arange(x.size)
+        y0 = fp[..., j, cols]
+        if slopes is None:
+            slope = (fp[..., j + 1, cols] - y0) / (xp[j + 1] - xp[j])
+        else:
+            slope = slopes[..., j]
+        with np.errstate(invalid='ignore'):
+            out = slope * (x - xp[j]) + y0
+        out = np.where(x == xp[j], y0, out)
+        out = np.where(x < xp[0], fp[..., 0, cols], out)
+        out = np.where(x >= xp[-1], fp[..., n - 1, cols], out)
+        return np.where(np.isnan(x), np.nan, out)
+
+    def lookup_array(self, eps: np.ndarray, percent: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Consulta vetorizada para arrays (com broadcasting) de epsilon e porcentagem."""
+        eps, percent = np.broadcast_arrays(np.asarray(eps, dtype=float), np.asarray(percent, dtype=float))
+        shape = eps.shape
+        eps, percent = eps.ravel(), percent.ravel()
+
+        # Estágio 1 (epsilon): inclinações fixas por segmento -> (2, 3, n)
+        n_eps = len(self.eps)
+        j = np.clip(np.searchsorted(self.eps, eps, side='right') - 1, 0, n_eps - 2)
+        y0 = self.values[..., j]
+        with np.errstate(invalid='ignore'):
+            by_pct = self.slopes[..., j] * (eps - self.eps[j]) + y0
+        by_pct = np.where(eps == self.eps[j], y0, by_pct)
+        by_pct = np.where(eps < self.eps[0], self.values[..., :1], by_pct)
+        by_pct = np.where(eps >= self.eps[-1], self.values[..., -1:], by_pct)
+        by_pct = np.where(np.isnan(eps), np.nan, by_pct)
+
+        # Estágio 2 (porcentagem): ordenadas dependem de cada linha
+        angles = self._interp_rows(percent, self.pcts, by_pct)
+        return angles[0].reshape(shape), angles[1].reshape(shape)
+
 
 class BellNozzleSolver:
+    """
+    Solver Rao (parábola/Bézier N-Q-E) para bocal sino.
+
+    Garantia de concorrência: o solver não guarda estado por chamada. Todos os
+    métodos são funções puras das entradas, as tabelas de classe são somente
+    leitura, e a instância é barata de criar e serializável (pickle). A mesma
+    instância pode ser usada ao mesmo tempo por várias threads ou enviada para
+    workers de um ProcessPoolExecutor (ver benchmarks/stress_solver_concurrency.py).
+    """
     _ARATIO = np.array([4, 5, 10, 20, 30, 40, 50, 100])
     _DATA_MAP = {
         60: {
@@ -20,6 +123,7 @@ class BellNozzleSolver:
             'te': np.array([11.5, 10.5, 8.0, 7.0, 6.5, 6.0, 6.0, 6.0])
         }
     }
+    _ANGLE_TABLE = RaoAngleTable(_ARATIO, _DATA_MAP)
 
     @staticmethod
     def calculate_epsilon(pc: float, pe: float, k: float) -> float:
@@ -34,21 +138,27 @@ class BellNozzleSolver:
         denominador = math.sqrt(termo3 * termo4)
         return numerador / denominador
 
-    @classmethod
-    def get_wall_angles(cls, eps: float, tr: float, percent: float, ang_div: float) -> Tuple[float, float, float]:
-        tn_60 = np.interp(eps, cls._ARATIO, cls._DATA_MAP[60]['tn'])
-        te_60 = np.interp(eps, cls._ARATIO, cls._DATA_MAP[60]['te'])
-        tn_80 = np.interp(eps, cls._ARATIO, cls._DATA_MAP[80]['tn'])
-        te_80 = np.interp(eps, cls._ARATIO, cls._DATA_MAP[80]['te'])
-        tn_90 = np.interp(eps, cls._ARATIO, cls._DATA_MAP[90]['tn'])
-        te_90 = np.interp(eps, cls._ARATIO, cls._DATA_MAP[90]['te'])
+    @staticmethod
+    def calculate_epsilon_array(pc: np.ndarray, pe: np.ndarray, k: np.ndarray) -> np.ndarray:
+        """Versão vetorizada de calculate_epsilon. Linhas inválidas retornam NaN."""
+        with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+            pe_mpa = pe / 9.86923
+            termo1 = (2 / (k + 1)) ** (1 / (k - 1))
+            termo2 = (pc / pe_mpa) ** (1 / k)
+            termo3 = (k + 1) / (k - 1)
+            termo4 = 1 - (pe_mpa / pc) ** ((k - 1) / k)
+            eps = (termo1 * termo2) / np.sqrt(termo3 * termo4)
+        ok = (termo4 > 0) & (k > 1) & (pc > 0) & (pe_mpa > 0) & np.isfinite(eps)
+        return np.where(ok, eps, np.nan)
 
-        x_percents = [0.6, 0.8, 0.9] 
-        y_tn = [tn_60, tn_80, tn_90]
-        y_te = [te_60, te_80, te_90]
+    @classmethod
+    def _interp_wall_angles(cls, eps: np.ndarray, percent: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Interpolação dupla (epsilon, % de comprimento) dos ângulos de Rao, em graus."""
+        return cls._ANGLE_TABLE.lookup_array(eps, percent)
 
-        final_theta_n = np.interp(percent, x_percents, y_tn)
-        final_theta_e = np.interp(percent, x_percents, y_te)
+    @classmethod
+    def get_wall_angles(cls, eps: float, tr: float, percent: float, ang_div: float) -> Tuple[float, float, float]:
+        final_theta_n, final_theta_e = cls._ANGLE_TABLE.lookup(eps, percent)
 
         f1 = ((math.sqrt(eps) - 1) * tr) / math.tan(math.radians(ang_div))
         ln = percent * f1
@@ -57,15 +167,7 @@ class BellNozzleSolver:
 
     def solve_mach_from_area(self, epsilon: float, k: float) -> float:
         if epsilon <= 1.0: return 1.0
-        M = 2.0 
-        for _ in range(20):
-            term1 = (2 / (k + 1)) * (1 + (k - 1) / 2 * M**2)
-            exponent = (k + 1) / (2 * (k - 1))
-            f = (1 / M) * (term1 ** exponent) - epsilon
-            df = (1/M) * exponent * (term1**(exponent-1)) * (2/(k+1)) * (k-1)*M - (1/M**2) * (term1**exponent)
-            if abs(f) < 1e-6: return M
-            M = M - f / df
-        return M
+        return gasdynamics.mach_from_area_ratio(epsilon, k)
 
     def calculate_performance(self, k: float, pc: float, pe: float, theta_e_deg: float, eps: float):
         theta_rad = math.radians(theta_e_deg)
@@ -81,9 +183,21 @@ class BellNozzleSolver:
         cf_real = cf_ideal * lam * 0.98
         return lam, cf_ideal, cf_real
 
-    def compute(self, tr: float, k: float, pc: float, pe: float, 
-               ang_div: float, ang_cov: float, length_pct: float, rounding_factor: float) -> NozzleResult:
-        
+    @staticmethod
+    def pressure_thrust_coefficient(pc, pe, pa, eps):
+        """
+        Parcela de pressão do Cf, (pe - pa)/pc · ε, que calculate_performance
+        omite (ela assume pa = pe). pc [MPa], pe [atm], pa [Pa]; aceita arrays.
+        """
+        return (np.asarray(pe) / 9.86923 - np.asarray(pa) * 1e-6) / pc * eps
+
+    def compute_metrics(self, tr: float, k: float, pc: float, pe: float,
+                        ang_div: float, ang_cov: float, length_pct: float, rounding_factor: float) -> NozzleResult:
+        """
+        Caminho rápido: calcula apenas as grandezas escalares (epsilon, comprimentos,
+        ângulos, N/Q/E, lambda e Cf) sem alocar o contorno (contour_x/contour_y = None).
+        Aceita a mesma assinatura de compute() para servir de substituto direto em loops.
+        """
         eps = self.calculate_epsilon(pc, pe, k)
         throat_area = math.pi * (tr ** 2)
         exhaust_area = throat_area * eps
@@ -114,22 +228,6 @@ class BellNozzleSolver:
         else:
             qx = (c2 - c1) / (m1 - m2)
             qy = (m1 * c2 - m2 * c1) / (m1 - m2)
-        
-        t_param = np.linspace(0, 1, 100)
-        
-        theta_conv = np.linspace(math.radians(ang_cov), math.radians(-90), 50)
-        x_conv = 1.5 * tr * np.cos(theta_conv)
-        y_conv = 1.5 * tr * np.sin(theta_conv) + 1.5 * tr + tr
-        
-        theta_div_arc = np.linspace(math.radians(-90), math.radians(theta_n_deg - 90), 50)
-        x_div_arc = r_div_rel * tr * np.cos(theta_div_arc)
-        y_div_arc = r_div_rel * tr * np.sin(theta_div_arc) + r_div_rel * tr + tr
-        
-        bx = (1 - t_param)**2 * nx + 2 * (1 - t_param) * t_param * qx + t_param**2 * ex
-        by = (1 - t_param)**2 * ny + 2 * (1 - t_param) * t_param * qy + t_param**2 * ey
-        
-        final_x = np.concatenate([x_conv, x_div_arc, bx])
-        final_y = np.concatenate([y_conv, y_div_arc, by])
 
         return NozzleResult(
             length=bell_length,
@@ -146,7 +244,128 @@ class BellNozzleSolver:
             divergent_angle_input=ang_div,
             lambda_eff=lam,
             cf_ideal=cf_i,
-            cf_est=cf_r,
-            contour_x=final_x,
-            contour_y=final_y
-        )
\ No newline at end of file
+            cf_est=cf_r
+        )
+
+    def compute(self, tr: float, k: float, pc: float, pe: float, 
+               ang_div: float, ang_cov: float, length_pct: float, rounding_factor: float) -> NozzleResult:
+        
+        res = self.compute_metrics(tr, k, pc, pe, ang_div, ang_cov, length_pct, rounding_factor)
+        res.contour = NozzleContour.rao(tr, ang_cov, rounding_factor, res.angles['theta_n'],
+                                        res.control_points['N'], res.control_points['Q'], res.control_points['E'])
+        # Contorno denso padrão: 50 (convergente) + 50 (arco da garganta) + 100 (Bézier)
+        res.contour_x, res.contour_y = res.contour.sample()
+        return res
+
+    def compute_batch(self, tr, k, pc, pe, ang_div, ang_cov, length_pct, rounding_factor,
+                      with_contour: bool = True,
+                      n_conv: int = 50, n_arc: int = 50, n_bezier: int = 100) -> NozzleBatchResult:
+        """
+        Versão vetorizada de compute(): aceita escalares ou arrays (com broadcasting)
+        e resolve todos os projetos de uma vez. Em vez de levantar ValueError,
+        linhas inválidas são marcadas em `valid` e preenchidas com NaN.
+        Com with_contour=False nenhum contorno é alocado (equivalente a compute_metrics).
+        """
+        arrays = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in
+                                       (tr, k, pc, pe, ang_div, ang_cov, length_pct, rounding_factor)))
+        tr, k, pc, pe, ang_div, ang_cov, length_pct, rounding_factor = (a.ravel() for a in arrays)
+
+        with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+            eps = self.calculate_epsilon_array(pc, pe, k)
+            throat_area = np.pi * tr ** 2
+            exhaust_area = throat_area * eps
+            exhaust_radius = np.sqrt(exhaust_area / np.pi)
+
+            theta_n_deg, theta_e_deg = self._interp_wall_angles(eps, length_pct)
+            theta_n_rad = np.radians(theta_n_deg)
+            theta_e_rad = np.radians(theta_e_deg)
+
+            tan_div = np.tan(np.radians(ang_div))
+            bell_length = length_pct * ((np.sqrt(eps) - 1) * tr) / tan_div
+            cone_ref_length = (exhaust_radius - tr) / tan_div
+            real_percent = np.where(cone_ref_length != 0, bell_length / cone_ref_length * 100, 0.0)
+
+            # Desempenho (mesmas fórmulas de calculate_performance)
+            lam = (1 + np.cos(theta_e_rad)) / 2
+            pratio = (pe / 9.86923) / pc
+            term1 = (2 * k ** 2) / (k - 1)
+            term2 = (2 / (k + 1)) ** ((k + 1) / (k - 1))
+            term3 = 1 - pratio ** ((k - 1) / k)
+            cf_i = np.where(pratio < 1.0, np.sqrt(term1 * term2 * term3), 0.0)
+            cf_r = cf_i * lam * 0.98
+
+            # Pontos de controle N, Q, E
+            r_div = 0.382 * rounding_factor * tr
+            angle_rel = theta_n_rad - np.pi / 2
+            nx = r_div * np.cos(angle_rel)
+            ny = r_div * np.sin(angle_rel) + (tr + r_div)
+            ex, ey = bell_length, exhaust_radius
+            m1 = np.tan(theta_n_rad)
+            m2 = np.tan(theta_e_rad)
+            c1 = ny - m1 * nx
+            c2 = ey - m2 * ex
+            parallel = np.abs(m1 - m2) < 1e-9
+            dm = np.where(parallel, 1.0, m1 - m2)
+            qx = np.where(parallel, (nx + ex) / 2, (c2 - c1) / dm)
+            qy = np.where(parallel, (ny + ey) / 2, (m1 * c2 - m2 * c1) / dm)
+
+        valid = (np.isfinite(eps) & np.isfinite(bell_length) & np.isfinite(qx) & np.isfinite(qy)
+                 & (tr > 0) & (tan_div > 0))
+
+        def masked(a):
+            return np.where(valid, a, np.nan)
+
+        contour_x = contour_y = None
+        if with_contour:
+            contour_x, contour_y = self._batch_contour(tr, ang_cov, angle_rel, r_div, nx, ny, qx, qy, ex, ey,
+                                                       n_conv, n_arc, n_bezier)
+            contour_x = np.where(valid[:, None], contour_x, np.nan)
+            contour_y = np.where(valid[:, None], contour_y, np.nan)
+
+        return NozzleBatchResult(
+            valid=valid,
+            length=masked(bell_length),
+            epsilon=masked(eps),
+            throat_radius=tr,
+            exhaust_radius=masked(exhaust_radius),
+            percent=masked(real_percent),
+            throat_area=masked(throat_area),
+            exhaust_area=masked(exhaust_area),
+            control_points={
+                'N': np.column_stack([masked(nx), masked(ny)]),
+                'Q': np.column_stack([masked(qx), masked(qy)]),
+                'E': np.column_stack([masked(ex), masked(ey)])
+            },
+            angles={'theta_n': masked(theta_n_deg), 'theta_e': masked(theta_e_deg)},
+            rounding_factor=rounding_factor,
+            cone_ref_length=masked(cone_ref_length),
+            divergent_angle_input=ang_div,
+            lambda_eff=masked(lam),
+            cf_ideal=masked(cf_i),
+            cf_est=masked(cf_r),
+            contour_x=contour_x,
+            contour_y=contour_y,
+            convergent_angle_input=ang_cov
+        )
+
+    @staticmethod
+    def _batch_contour(tr, ang_cov, angle_rel, r_div, nx, ny, qx, qy, ex, ey,
+                       n_conv: int, n_arc: int, n_bezier: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Contornos (n, m): arco convergente + arco da garganta + Bézier N-Q-E."""
+        with np.errstate(invalid='ignore'):
+            theta_conv = np.linspace(np.radians(ang_cov), np.full_like(ang_cov, -np.pi / 2), n_conv, axis=-1)
+            r_conv = (1.5 * tr)[:, None]
+            x_conv = r_conv * np.cos(theta_conv)
+            y_conv = r_conv * np.sin(theta_conv) + r_conv + tr[:, None]
+
+            theta_arc = np.linspace(np.full_like(angle_rel, -np.pi / 2), angle_rel, n_arc, axis=-1)
+            r_arc = r_div[:, None]
+            x_arc = r_arc * np.cos(theta_arc)
+            y_arc = r_arc * np.sin(theta_arc) + r_arc + tr[:, None]
+
+            t = np.linspace(0, 1, n_bezier)
+            b0, b1, b2 = (1 - t) ** 2, 2 * (1 - t) * t, t ** 2
+            bx = np.outer(nx, b0) + np.outer(qx, b1) + np.outer(ex, b2)
+            by = np.outer(ny, b0) + np.outer(qy, b1) + np.outer(ey, b2)
+
+        return np.concatenate([x_conv, x_arc, bx], axis=1), np.concatenate([y_conv, y_arc, by], axis=1)
\ No newline at end of file
@@ -1,15 +1,237 @@
 import math
+from functools import lru_cache
 import numpy as np
-from src.core.models import NozzleResult
+from typing import Callable, Dict
+from src.core import gasdynamics
+from src.core.geometry import NozzleContour
+from src.core.models import NozzleResult, NozzleBatchResult, CharacteristicNet
+
+
+def _mach_inverter(k: np.ndarray) -> Callable[[np.ndarray], np.ndarray]:
+    """ν (..., B) -> Mach: tabela em cache se o gamma é único, senão inversão exata."""
+    k_unique = np.unique(k)
+    if k_unique.size == 1:
+        return gasdynamics.isentropic_table(float(k_unique[0])).mach_from_prandtl_meyer
+    return lambda nu: gasdynamics.inverse_prandtl_meyer(nu, k)
+
+
+def _source_term(theta: np.ndarray, mu: np.ndarray, y: np.ndarray, sign: int) -> np.ndarray:
+    """
+    Termo axissimétrico das equações de compatibilidade:
+        C-: d(ν + θ) = sinμ·sinθ / (y·cos(θ - μ)) dx
+        C+: d(ν - θ) = sinμ·sinθ / (y·cos(θ + μ)) dx
+    No eixo (y = 0, θ = 0) o limite é tratado como zero (só ocorre no preditor).
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        q = np.sin(mu) * np.sin(theta) / (y * np.cos(theta + sign * mu))
+    return np.where(y > 0, q, 0.0)
+
+
+def _interior_point(a, b, mach_of_nu, passes: int):
+    """
+    Processo unitário de ponto interno: P no cruzamento da C- que vem de A
+    com a C+ que vem de B. Preditor com coeficientes de A/B e `passes`
+    correções com coeficientes médios. a, b = (x, y, θ, ν, μ).
+    """
+    xa, ya, tha, nua, mua = a
+    xb, yb, thb, nub, mub = b
+    th_m, mu_m, y_m = tha, mua, ya
+    th_p, mu_p, y_p = thb, mub, yb
+
+    for _ in range(passes + 1):
+        lam_m = np.tan(th_m - mu_m)
+        lam_p = np.tan(th_p + mu_p)
+        x = (yb - ya + lam_m * xa - lam_p * xb) / (lam_m - lam_p)
+        y = ya + lam_m * (x - xa)
+        r_m = nua + tha + _source_term(th_m, mu_m, y_m, -1) * (x - xa)  # (ν + θ) em P
+        r_p = nub - thb + _source_term(th_p, mu_p, y_p, +1) * (x - xb)  # (ν - θ) em P
+        nu = 0.5 * (r_m + r_p)
+        th = 0.5 * (r_m - r_p)
+        mu = np.arcsin(1 / mach_of_nu(nu))
+
+        th_m, mu_m, y_m = 0.5 * (tha + th), 0.5 * (mua + mu), 0.5 * (ya + y)
+        th_p, mu_p, y_p = 0.5 * (thb + th), 0.5 * (mub + mu), 0.5 * (yb + y)
+
+    return x, y, th, nu, mu
+
+
+def _axis_point(a, mach_of_nu, passes: int):
+    """Processo unitário de ponto no eixo de simetria (θ = 0, y = 0) a partir da C- que vem de A."""
+    xa, ya, tha, nua, mua = a
+    th_m, mu_m, y_m = tha, mua, ya
+    for _ in range(passes + 1):
+        lam_m = np.tan(th_m - mu_m)
+        x = xa - ya / lam_m
+        nu = nua + tha + _source_term(th_m, mu_m, y_m, -1) * (x - xa)
+        mu = np.arcsin(1 / mach_of_nu(nu))
+        th_m, mu_m, y_m = 0.5 * tha, 0.5 * (mua + mu), 0.5 * ya
+    return x, np.zeros_like(x), np.zeros_like(x), nu, mu
+
+
+def characteristic_net(theta_max: np.ndarray, k: np.ndarray, n: int, passes: int = 1) -> Dict[str, np.ndarray]:
+    """
+    Malha MOC axissimétrica de um bocal de comprimento mínimo (canto vivo na
+    garganta), para um lote de projetos (B,). Coordenadas normalizadas pelo
+    raio da garganta: o canto fica em (0, 1).
+
+    O leque do canto tem `n` características C- com θ = ν = θmax·(i+1)/n.
+    Os nós são resolvidos por anti-diagonais (i + j constante), que são
+    independentes entre si, então cada passo é uma operação vetorizada sobre
+    (nós da diagonal, B). O lote fica no último eixo, para que cada nó (i, j)
+    seja uma linha contígua nas leituras e escritas da diagonal. A parede é a linha de corrente do canto, traçada
+    sobre as C+ que saem da última C- por balanço de vazão.
+
+    Retorna arrays pré-alocados x, y, theta, nu, mu (B, n, n) (vistas do
+    armazenamento (n, n, B)) e wall_x,
+    wall_y, wall_theta (B, n + 1), com o canto como primeiro ponto da parede.
+    """
+    theta_max = np.asarray(theta_max, dtype=float).ravel()
+    k = np.broadcast_to(np.asarray(k, dtype=float), theta_max.shape)
+    n_batch = theta_max.size
+    mach_of_nu = _mach_inverter(k)
+
+    fan = (np.arange(1, n + 1) / n)[:, None] * theta_max  # (n, B)
+    fan_mu = np.arcsin(1 / mach_of_nu(fan))
+
+    X = np.full((n, n, n_batch), np.nan)
+    Y, TH, NU, MU = (np.full_like(X, np.nan) for _ in range(4))
+
+    def upstream_a(i, j):
+        """Ponto anterior na C- nº i: o nó (i, j-1) ou o canto quando j == 0."""
+        from_corner = (j == 0)[:, None]
+        jm = np.maximum(j - 1, 0)
+        return tuple(np.where(from_corner, corner, grid[i, jm]) for corner, grid in (
+            (0.0, X), (1.0, Y), (fan[i], TH), (fan[i], NU), (fan_mu[i], MU)))
+
+    for d in range(2 * n - 1):
+        j = np.arange(max(0, d - n + 1), d // 2 + 1)
+        i = d - j
+
+        inner = i > j
+        if np.any(inner):
+            ii, jj = i[inner], j[inner]
+            b = tuple(grid[ii - 1, jj] for grid in (X, Y, TH, NU, MU))
+            p = _interior_point(upstream_a(ii, jj), b, mach_of_nu, passes)
+            for grid, val in zip((X, Y, TH, NU, MU), p):
+                grid[ii, jj] = val
+
+        if d % 2 == 0:
+            c = np.array([d // 2])
+            p = _axis_point(upstream_a(c, c), mach_of_nu, passes)
+            for grid, val in zip((X, Y, TH, NU, MU), p):
+                grid[c, c] = val
+
+    # Traçado da parede a partir da última C- (i = n - 1). A parede é a linha de
+    # corrente que passa pelo canto: em cada C+ nº j, o ponto de parede é onde
+    # a vazão acumulada desde o eixo iguala a vazão da garganta (π, normalizada).
+    # Além da última C- as propriedades são mantidas iguais às do nó B = (n-1, j).
+    # Fluxo por comprimento de característica: ρV·sinμ·2πy, com ρV/(ρV)* = A*/A.
+    flux = np.sin(MU) / gasdynamics.area_ratio(1 / np.sin(MU), k) * 2 * np.pi * Y
+    seg = np.hypot(np.diff(X, axis=0), np.diff(Y, axis=0))          # trechos ao longo de cada C+
+    seg_mass = 0.5 * (flux[1:] + flux[:-1]) * seg
+    mass_net = np.nansum(np.where(np.isnan(seg_mass), 0.0, seg_mass), axis=0)  # (n, B)
+
+    xb, yb, thb, mub = X[n - 1], Y[n - 1], TH[n - 1], MU[n - 1]
+    phi = thb + mub
+    c = (np.pi - mass_net) * gasdynamics.area_ratio(1 / np.sin(mub), k) / (2 * np.pi * np.sin(mub))
+    # ∫ y ds = yB·L + ½·sinφ·L² = c  ->  raiz positiva
+    length = 2 * c / (yb + np.sqrt(yb ** 2 + 2 * np.sin(phi) * c))
+
+    wall_x = np.concatenate([np.zeros((1, n_batch)), xb + length * np.cos(phi)]).T
+    wall_y = np.concatenate([np.ones((1, n_batch)), yb + length * np.sin(phi)]).T
+    wall_th = np.concatenate([theta_max[None, :], thb]).T
+
+    grids = {key: np.moveaxis(grid, -1, 0) for key, grid in
+             (('x', X), ('y', Y), ('theta', TH), ('nu', NU), ('mu', MU))}
+    return dict(grids, wall_x=wall_x, wall_y=wall_y, wall_theta=wall_th)
+
+
+# Tabelas θmax -> ν no eixo: grade de θ, passo da grade de gamma e níveis de malha
+# grossa da extrapolação em n
+THETA_TABLE_SIZE = 128
+THETA_TABLE_K_STEP = 0.02
+THETA_LEVELS = (16, 32)
+
+
+@lru_cache(maxsize=128)
+def _axis_nu_table(k: float, n: int):
+    """
+    ν no eixo ao fim da última C- em função de θmax, para um gamma e `n`
+    características (uma malha vetorizada sobre a grade de θ). A grade vai
+    até ν_max/2 da tabela isentrópica e é cortada onde a malha deixa de ser
+    válida ou monotônica.
+    """
+    top = 0.5 * gasdynamics.isentropic_table(k).prandtl_meyer[-1]
+    theta = top * np.arange(1, THETA_TABLE_SIZE + 1) / THETA_TABLE_SIZE
+    with np.errstate(invalid='ignore', divide='ignore'):
+        nu = characteristic_net(theta, np.full(theta.size, k), n)['nu'][:, -1, -1]
+    bad = ~np.isfinite(nu) | np.concatenate([[False], np.diff(nu) <= 0])
+    stop = int(np.argmax(bad)) if np.any(bad) else nu.size
+    nu, theta = np.concatenate([[0.0], nu[:stop]]), np.concatenate([[0.0], theta[:stop]])
+    for arr in (nu, theta):
+        arr.flags.writeable = False
+    return nu, theta
+
+
+def _table_theta(nu_axis: np.ndarray, k: np.ndarray, n: int) -> np.ndarray:
+    """
+    θmax numa malha de `n` características, pelas tabelas dos dois nós da grade
+    de gamma que cercam cada k (interpolação linear em k). O resultado de cada
+    linha só depende dela, não do resto do lote. Abaixo do primeiro nó
+    (k < 1 + passo) usa a tabela do próprio k.
+    """
+    theta = np.full(nu_axis.shape, np.nan)
+    cell = np.floor((k - 1) / THETA_TABLE_K_STEP)
+    for c in np.unique(cell):
+        sel = cell == c
+        if c < 1:
+            for kk in np.unique(k[sel]):
+                rows = sel & (k == kk)
+                theta[rows] = np.interp(nu_axis[rows], *_axis_nu_table(float(kk), n), right=np.nan)
+            continue
+        k_lo = 1 + c * THETA_TABLE_K_STEP
+        t_lo = np.interp(nu_axis[sel], *_axis_nu_table(round(k_lo, 6), n), right=np.nan)
+        t_hi = np.interp(nu_axis[sel], *_axis_nu_table(round(k_lo + THETA_TABLE_K_STEP, 6), n), right=np.nan)
+        w = (k[sel] - k_lo) / THETA_TABLE_K_STEP
+        theta[sel] = (1 - w) * t_lo + w * t_hi
+    return theta
+
+
+def design_theta_max(nu_exit: np.ndarray, k: np.ndarray, n: int) -> np.ndarray:
+    """
+    Ângulo de parede no canto (θmax) que leva o eixo ao ν de saída desejado.
+    No caso plano θmax = ν_e/2; no axissimétrico o termo fonte acelera o
+    escoamento e θmax é menor. O θmax da malha muda com a resolução
+    (erro ~ C/n), então é resolvido em duas malhas grossas (THETA_LEVELS) e
+    extrapolado para `n`; até o nível mais fino a malha de `n` é usada direto.
+    Sobra um resíduo pequeno na saída, que o solver absorve na escala da parede.
+    """
+    nu_exit = np.asarray(nu_exit, dtype=float).ravel()
+    k = np.broadcast_to(np.asarray(k, dtype=float), nu_exit.shape)
+    lo, hi = THETA_LEVELS
+    if n <= hi:
+        return _table_theta(nu_exit, k, n)
+    t_lo, t_hi = _table_theta(nu_exit, k, lo), _table_theta(nu_exit, k, hi)
+    return t_hi + (t_hi - t_lo) * lo * (n - hi) / ((hi - lo) * n)
+
 
 class MOCSolver:
     """
     Solver para Bocal de Comprimento Mínimo (MLN) com Arredondamento de Garganta.
     Gera geometria baseada no Método das Características + Arco Circular.
+
+    Garantia de concorrência: o único atributo é a configuração
+    n_characteristics, definida na construção e nunca alterada. Cada chamada
+    trabalha só com variáveis locais (o gamma é passado adiante, não guardado),
+    então a mesma instância pode ser usada por várias threads e serializada
+    para workers de processo com resultados idênticos.
     """
 
-    def __init__(self):
-        self.gamma = 1.4
+    # Projetos resolvidos por vez em compute_batch (limita a memória da malha: B·n² nós)
+    BATCH_CHUNK = 256
+
+    def __init__(self, n_characteristics: int = 60):
+        self.n_characteristics = n_characteristics
 
     def _calculate_epsilon(self, pc: float, pe: float, k: float) -> float:
         pe_mpa = pe / 9.86923
@@ -21,128 +243,169 @@ class MOCSolver:
         if termo4 < 0: return 1.0
         return (termo1 * termo2) / math.sqrt(termo3 * termo4)
 
+    @staticmethod
+    def _calculate_epsilon_array(pc: np.ndarray, pe: np.ndarray, k: np.ndarray) -> np.ndarray:
+        """Versão vetorizada de _calculate_epsilon. Sem expansão supersônica retorna NaN."""
+        with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+            pe_mpa = pe / 9.86923
+            termo1 = (2 / (k + 1)) ** (1 / (k - 1))
+            termo2 = (pc / pe_mpa) ** (1 / k)
+            termo3 = (k + 1) / (k - 1)
+            termo4 = 1 - (pe_mpa / pc) ** ((k - 1) / k)
+            eps = (termo1 * termo2) / np.sqrt(termo3 * termo4)
+        ok = (termo4 > 0) & (k > 1) & (pc > 0) & (pe_mpa > 0) & (pe_mpa < pc) & np.isfinite(eps)
+        return np.where(ok, eps, np.nan)
+
     def _solve_mach_from_area(self, epsilon: float, k: float) -> float:
         if epsilon <= 1.0: return 1.0
-        M = 2.0
-        for _ in range(20):
-            term1 = (2 / (k + 1)) * (1 + (k - 1) / 2 * M**2)
-            exponent = (k + 1) / (2 * (k - 1))
-            f = (1 / M) * (term1 ** exponent) - epsilon
-            df = (1/M) * exponent * (term1**(exponent-1)) * (2/(k+1)) * (k-1)*M - (1/M**2) * (term1**exponent)
-            if abs(f) < 1e-6: return M
-            if df == 0: break
-            M = M - f / df
-        return M
-
-    def prandtl_meyer(self, M: float) -> float:
+        return gasdynamics.mach_from_area_ratio(epsilon, k)
+
+    @staticmethod
+    def prandtl_meyer(M: float, k: float) -> float:
         if M <= 1.0: return 0.0
-        g = self.gamma
-        t1 = math.sqrt((g + 1) / (g - 1))
-        t2 = math.sqrt(M**2 - 1)
-        t3 = math.sqrt((g - 1) / (g + 1))
-        return t1 * math.atan(t3 * t2) - math.atan(t2)
+        return gasdynamics.prandtl_meyer(M, k)
 
-    def compute(self, tr: float, k: float, pc: float, pe: float, 
+    def compute(self, tr: float, k: float, pc: float, pe: float,
                 ang_div: float, ang_cov: float, length_pct: float, rounding_factor: float) -> NozzleResult:
-        
-        self.gamma = k
-        print(f"--- MOC Solver: K={k}, Pc={pc}, Pe={pe} ---")
-        
+
+        batch, nets = self._solve(tr, k, pc, pe, ang_div, ang_cov, length_pct, rounding_factor,
+                                  with_contour=True, keep_net=True)
+        if not batch.valid[0]:
+            raise ValueError("Invalid exhaust pressure (no supersonic expansion).")
+
+        net = nets[0]
+        res = batch.row(0)
+        res.contour = NozzleContour.mln(
+            tr, tr * 0.382 * (rounding_factor if rounding_factor > 0 else 1.0),
+            math.radians(res.angles['theta_n']), net['wall_x'], net['wall_y']
+        )
+        res.characteristic_net = CharacteristicNet(
+            x=net['x'], y=net['y'], theta=net['theta'], mach=1 / np.sin(net['mu']),
+            wall_x=net['wall_x'], wall_y=net['wall_y']
+        )
+        return res
+
+    def compute_batch(self, tr, k, pc, pe, ang_div, ang_cov, length_pct, rounding_factor,
+                      with_contour: bool = True, n_arc: int = 25) -> NozzleBatchResult:
+        """
+        Versão vetorizada de compute(), com as mesmas regras do solver Rao:
+        escalares ou arrays com broadcasting, linhas inválidas marcadas em
+        `valid` e preenchidas com NaN. length_pct é aceito só por
+        compatibilidade (o MLN tem comprimento fixo).
+        """
+        batch, _ = self._solve(tr, k, pc, pe, ang_div, ang_cov, length_pct, rounding_factor,
+                               with_contour=with_contour, keep_net=False, n_arc=n_arc)
+        return batch
+
+    def _solve(self, tr, k, pc, pe, ang_div, ang_cov, length_pct, rounding_factor,
+               with_contour: bool, keep_net: bool, n_arc: int = 25):
+        arrays = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in
+                                       (tr, k, pc, pe, ang_div, ang_cov, length_pct, rounding_factor)))
+        tr, k, pc, pe, ang_div, ang_cov, length_pct, rounding_factor = (a.ravel() for a in arrays)
+        size, n = tr.size, self.n_characteristics
+
         # 1. Física do Escoamento
-        eps = self._calculate_epsilon(pc, pe, k)
-        M_exit = self._solve_mach_from_area(eps, k)
-        nu_exit = self.prandtl_meyer(M_exit)
-        
-        # Critério MLN: Theta_max = Nu_exit / 2
-        theta_max_rad = nu_exit / 2
-        theta_max_deg = math.degrees(theta_max_rad)
-        
-        # 2. Geometria: Arco da Garganta
-        # R_downstream = 0.382 * Rt * Fator
-        r_down = tr * 0.382 * (rounding_factor if rounding_factor > 0 else 1.0)
-        
-        x_points = []
-        y_points = []
-        
-        # Gera o arco de 0 até Theta_max
-        steps_arc = 25
-        for i in range(steps_arc + 1):
-            ang = (i / steps_arc) * theta_max_rad
-            # Círculo tangente à garganta: x = R*sin(a), y = Rt + R*(1-cos(a))
-            x = r_down * math.sin(ang)
-            y = tr + r_down * (1 - math.cos(ang))
-            x_points.append(x)
-            y_points.append(y)
-            
-        x_start_moc = x_points[-1]
-        y_start_moc = y_points[-1]
-        
-        # 3. Geometria: Curva de Cancelamento (MOC Kernel Approximation)
-        # Comprimento estimado para MLN
-        # L = (sqrt(eps)-1)*Rt / tan(theta_max)
-        approx_len = ((math.sqrt(eps) - 1) * tr) / math.tan(theta_max_rad)
-        
-        # Ajuste fino para garantir continuidade
-        len_curve = max(approx_len - x_start_moc, approx_len * 0.5)
-        
-        steps_curve = 100
-        curr_x = x_start_moc
-        curr_y = y_start_moc
-        dx = len_curve / steps_curve
-        
-        for i in range(1, steps_curve + 1):
-            t = i / steps_curve
-            # Perfil de ângulo cossenoidal: vai de Theta_max até 0 graus
-            theta_loc = theta_max_rad * math.cos(t * math.pi / 2)
-            
-            dy = math.tan(theta_loc) * dx
-            curr_x += dx
-            curr_y += dy
-            x_points.append(curr_x)
-            y_points.append(curr_y)
-            
-        final_x = np.array(x_points)
-        final_y = np.array(y_points)
-        
-        r_exit_real = final_y[-1]
-        l_total = final_x[-1]
-        area_exit = math.pi * r_exit_real**2
-        area_throat = math.pi * tr**2
-        eps_real = area_exit / area_throat
-        
-        # 4. Cálculo do Ponto 'Q' (Virtual) para evitar crash na UI
-        # Q é a interseção da tangente inicial (Theta_max) com a linha de saída (Horizontal)
-        # Reta 1: y - y_s = tan(theta_max) * (x - x_s)
-        # Reta 2: y = r_exit
-        # x_q = x_s + (r_exit - y_s) / tan(theta_max)
-        if math.tan(theta_max_rad) > 1e-4:
-            xq = x_start_moc + (r_exit_real - y_start_moc) / math.tan(theta_max_rad)
-        else:
-            xq = l_total / 2
-        yq = r_exit_real
-        
-        print(f"MOC Calculado: L={l_total:.2f}, Eps={eps_real:.2f}, Theta_max={theta_max_deg:.2f}")
-
-        return NozzleResult(
+        eps = self._calculate_epsilon_array(pc, pe, k)
+        with np.errstate(invalid='ignore'):
+            m_exit = gasdynamics.mach_from_area_ratio(eps, np.where(k > 1, k, 2.0))
+            nu_exit = gasdynamics.prandtl_meyer(m_exit, np.where(k > 1, k, 2.0))
+        valid = np.isfinite(nu_exit) & (nu_exit > 0) & (tr > 0)
+
+        theta_max = np.full(size, np.nan)
+        wall_x = np.full((size, n + 1), np.nan)
+        wall_y = np.full_like(wall_x, np.nan)
+        nets = [None] * size
+
+        # Arco da Garganta, R_downstream = 0.382 * Rt * Fator
+        r_down = tr * 0.382 * np.where(rounding_factor > 0, rounding_factor, 1.0)
+
+        # 2. Malha de Características (MLN), em blocos para limitar a memória.
+        # A malha começa no fim do arco, de raio y_start > tr: o ν no eixo deve ser o
+        # da razão de áreas vista de lá, ε·(tr/y_start)², que depende do próprio θmax.
+        rows = np.flatnonzero(valid)
+        for start in range(0, rows.size, self.BATCH_CHUNK):
+            sel = rows[start:start + self.BATCH_CHUNK]
+            th = design_theta_max(nu_exit[sel], k[sel], n)
+            for _ in range(2):
+                y0 = tr[sel] + r_down[sel] * (1 - np.cos(th))
+                with np.errstate(invalid='ignore'):
+                    m_net = gasdynamics.mach_from_area_ratio(eps[sel] * (tr[sel] / y0) ** 2, k[sel])
+                    th = design_theta_max(gasdynamics.prandtl_meyer(m_net, k[sel]), k[sel], n)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                net = characteristic_net(np.where(np.isfinite(th), th, 0.0), k[sel], n)
+            theta_max[sel] = th
+            wall_x[sel], wall_y[sel] = net['wall_x'], net['wall_y']
+            if keep_net:
+                for pos, row in enumerate(sel):
+                    nets[row] = {key: val[pos] for key, val in net.items()}
+        valid &= np.isfinite(theta_max) & np.all(np.isfinite(wall_y), axis=1)
+
+        # 3. Geometria: círculo tangente à garganta, x = R*sin(a), y = Rt + R*(1-cos(a)), a de 0 até θmax
+        x_start = r_down * np.sin(theta_max)
+        y_start = tr + r_down * (1 - np.cos(theta_max))
+
+        # A malha (normalizada pelo raio do canto) é escalada pela altura do fim do
+        # arco e deslocada em x até ele: parede contínua e eixo preservado em y = 0.
+        # O resíduo de discretização na saída vira um alongamento radial que cresce
+        # linearmente em x até a saída, de modo que A_e = ε·At exatamente.
+        r_exit = np.where(valid, tr * np.sqrt(eps), np.nan)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            stretch = r_exit / (wall_y[:, -1] * y_start) - 1
+        x_end = wall_x[:, -1]
+
+        def place(x, y, row):
+            """Coordenadas normalizadas da malha -> mm, para a linha `row` (índice ou slice)."""
+            ys = y * (y_start[row] * (1 + stretch[row] * x / x_end[row]))
+            return x * y_start[row] + x_start[row], ys
+
+        for row in (rows if keep_net else ()):
+            net = nets[row]
+            net['x'], net['y'] = place(net['x'], net['y'], row)
+            net['wall_x'], net['wall_y'] = place(net['wall_x'], net['wall_y'], row)
+        wall_x, wall_y = place(wall_x, wall_y, (slice(None), None))
+
+        l_total = wall_x[:, -1]
+        area_throat = np.pi * tr ** 2
+        area_exit = np.pi * r_exit ** 2
+
+        # 4. Ponto 'Q' (virtual): interseção da tangente inicial (θmax) com y = r_exit
+        tan_max = np.tan(theta_max)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            xq = np.where(tan_max > 1e-4, x_start + (r_exit - y_start) / tan_max, l_total / 2)
+
+        contour_x = contour_y = None
+        if with_contour:
+            ang = theta_max[:, None] * np.linspace(0.0, 1.0, n_arc + 1)
+            arc_x = r_down[:, None] * np.sin(ang)
+            arc_y = tr[:, None] + r_down[:, None] * (1 - np.cos(ang))
+            contour_x = np.concatenate([arc_x, wall_x[:, 1:]], axis=1)
+            contour_y = np.concatenate([arc_y, wall_y[:, 1:]], axis=1)
+
+        def masked(a):
+            return np.where(valid, a, np.nan)
+
+        batch = NozzleBatchResult(
+            valid=valid,
             length=l_total,
-            epsilon=eps_real,
+            epsilon=area_exit / area_throat,
             throat_radius=tr,
-            exhaust_radius=r_exit_real,
-            percent=100.0,
-            throat_area=area_throat,
+            exhaust_radius=r_exit,
+            percent=masked(np.full(size, 100.0)),
+            throat_area=masked(area_throat),
             exhaust_area=area_exit,
             control_points={
-                'N': (x_start_moc, y_start_moc), # Fim do arco, início do MOC
-                'Q': (xq, yq),                   # Ponto virtual para visualização
-                'E': (l_total, r_exit_real)
+                'N': np.column_stack([x_start, y_start]),  # Fim do arco, início do MOC
+                'Q': np.column_stack([xq, r_exit]),         # Ponto virtual para visualização
+                'E': np.column_stack([l_total, r_exit])
             },
-            angles={'theta_n': theta_max_deg, 'theta_e': 0.0},
+            angles={'theta_n': np.degrees(theta_max), 'theta_e': masked(np.zeros(size))},
             rounding_factor=rounding_factor,
-            cone_ref_length=0,
+            cone_ref_length=masked(np.zeros(size)),
             divergent_angle_input=ang_div,
-            lambda_eff=0.992,
-            cf_ideal=0.0,
-            cf_est=0.0,
-            contour_x=final_x,
-            contour_y=final_y
-        )
\ No newline at end of file
+            lambda_eff=masked(np.full(size, 0.992)),
+            cf_ideal=masked(np.zeros(size)),
+            cf_est=masked(np.zeros(size)),
+            contour_x=contour_x,
+            contour_y=contour_y
+        )
+        return batch, nets
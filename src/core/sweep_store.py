@@ -0,0 +1,260 @@
+# src/core/sweep_store.py
+"""
+Armazenamento de varreduras em disco, só de acréscimo, para rodadas longas.
+
+Cada lote concluído vira um shard: um diretório shard-<início>-<fim> com um
+.npy por coluna do SweepResult (mesmos campos do NozzleBatchResult dos solvers
+Rao e MOC, mais as entradas do projeto). O shard é escrito num diretório
+temporário e renomeado no fim, então um processo interrompido nunca deixa um
+shard pela metade, e vários processos podem acrescentar ao mesmo tempo.
+
+manifest.json guarda o esquema (colunas, dtypes), os metadados da varredura e
+os intervalos de índices de projeto já concluídos. A lista de shards em disco é
+a fonte da verdade: ao abrir, o manifesto é reconciliado com ela, e pending()
+devolve só os intervalos que faltam (retomada após interrupção).
+
+A leitura é preguiçosa: os .npy são abertos com mmap_mode='r', e column()
+junta só a coluna pedida.
+"""
+import json
+import os
+import shutil
+import tempfile
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from src.config import CURRENT_VERSION
+from src.core.models import SweepResult, SCALAR_FIELDS
+
+FORMAT_VERSION = 1
+_MANIFEST = "manifest.json"
+_SHARD_PREFIX = "shard-"
+
+# Campos do SweepResult guardados como dict de colunas
+_DICT_FIELDS = ('control_points', 'angles', 'inputs', 'checks')
+
+
+def _flatten(sweep: SweepResult) -> Dict[str, np.ndarray]:
+    """SweepResult -> {nome da coluna: array}; dicts viram 'campo.chave'."""
+    columns = {'valid': sweep.valid}
+    columns.update({name: getattr(sweep, name) for name in SCALAR_FIELDS})
+    for name in _DICT_FIELDS:
+        columns.update({f"{name}.{k}": v for k, v in getattr(sweep, name).items()})
+    if sweep.contour_x is not None:
+        columns['contour_x'] = sweep.contour_x
+        columns['contour_y'] = sweep.contour_y
+    if sweep.convergent_angle_input is not None:
+        columns['convergent_angle_input'] = sweep.convergent_angle_input
+    return columns
+
+
+def _unflatten(columns: Dict[str, np.ndarray]) -> SweepResult:
+    values: Dict[str, Any] = {name: {} for name in _DICT_FIELDS}
+    for key, arr in columns.items():
+        field_name, _, sub = key.partition('.')
+        if sub:
+            values[field_name][sub] = arr
+        else:
+            values[field_name] = arr
+    return SweepResult(**values)
+
+
+def _merge(ranges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    merged: List[List[int]] = []
+    for start, stop in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], stop)
+        else:
+            merged.append([start, stop])
+    return [(a, b) for a, b in merged]
+
+
+def _shard_name(start: int, stop: int) -> str:
+    return f"{_SHARD_PREFIX}{start:012d}-{stop:012d}"
+
+
+def _parse_shard(name: str) -> Optional[Tuple[int, int]]:
+    if not name.startswith(_SHARD_PREFIX):
+        return None
+    try:
+        start, stop = name[len(_SHARD_PREFIX):].split('-')
+        return int(start), int(stop)
+    except ValueError:
+        return None
+
+
+class SweepStore:
+    """
+    Diretório de shards de uma varredura. Os projetos são identificados por um
+    índice inteiro (posição na enumeração do espaço de projeto); cada append
+    grava o intervalo [start, start + len(sweep)).
+
+    meta descreve a varredura (solver, faixas das entradas, ...). Reabrir um
+    diretório existente com meta diferente levanta ValueError, para não
+    misturar resultados de varreduras diferentes.
+    """
+
+    def __init__(self, directory: str, meta: Optional[Dict[str, Any]] = None, readonly: bool = False):
+        self.directory = directory
+        self.readonly = readonly
+        self._lock = threading.Lock()
+        manifest_path = os.path.join(directory, _MANIFEST)
+
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                self._manifest = json.load(f)
+            if self._manifest.get('format') != FORMAT_VERSION:
+                raise ValueError(f"Formato de varredura não suportado em {directory}.")
+            if meta is not None and json.loads(json.dumps(meta)) != self._manifest['meta']:
+                raise ValueError(f"{directory} contém outra varredura (metadados diferentes).")
+        elif readonly:
+            raise FileNotFoundError(f"Nenhuma varredura em {directory}.")
+        else:
+            os.makedirs(directory, exist_ok=True)
+            self._manifest = {'format': FORMAT_VERSION, 'version': CURRENT_VERSION,
+                              'meta': meta or {}, 'columns': None, 'completed': [], 'rows': 0}
+            self._write_manifest()
+
+        self._shards = self._scan()
+        if not readonly:
+            self._sync_manifest()
+
+    # --- Manifesto -----------------------------------------------------
+
+    def _scan(self) -> List[Tuple[int, int]]:
+        shards = []
+        for name in os.listdir(self.directory):
+            rng = _parse_shard(name)
+            if rng is not None and os.path.isdir(os.path.join(self.directory, name)):
+                shards.append(rng)
+        return sorted(shards)
+
+    def _write_manifest(self) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(self._manifest, f, indent=1)
+        os.replace(tmp, os.path.join(self.directory, _MANIFEST))
+
+    def _sync_manifest(self) -> None:
+        completed = [list(r) for r in _merge(self._shards)]
+        rows = sum(stop - start for start, stop in self._shards)
+        if completed != self._manifest['completed'] or rows != self._manifest['rows']:
+            self._manifest['completed'] = completed
+            self._manifest['rows'] = rows
+            self._write_manifest()
+
+    def refresh(self) -> None:
+        """Relê a lista de shards (ex.: para ver o que outros processos acrescentaram)."""
+        with self._lock:
+            if self._manifest['columns'] is None:
+                with open(os.path.join(self.directory, _MANIFEST), 'r', encoding='utf-8') as f:
+                    self._manifest['columns'] = json.load(f)['columns']
+            self._shards = self._scan()
+            if not self.readonly:
+                self._sync_manifest()
+
+    @property
+    def meta(self) -> Dict[str, Any]:
+        return self._manifest['meta']
+
+    @property
+    def completed(self) -> List[Tuple[int, int]]:
+        """Intervalos [início, fim) de índices de projeto já gravados (unidos)."""
+        return _merge(self._shards)
+
+    def pending(self, total: int, chunk: int) -> List[Tuple[int, int]]:
+        """Intervalos de até `chunk` projetos, dentro de [0, total), que ainda faltam."""
+        if chunk < 1:
+            raise ValueError("chunk deve ser >= 1.")
+        out = []
+        cursor = 0
+        for start, stop in self.completed + [(total, total)]:
+            for a in range(cursor, min(start, total), chunk):
+                out.append((a, min(a + chunk, start, total)))
+            cursor = max(cursor, stop)
+        return out
+
+    def __len__(self) -> int:
+        return sum(stop - start for start, stop in self._shards)
+
+    # --- Escrita -------------------------------------------------------
+
+    def _check_schema(self, columns: Dict[str, np.ndarray]) -> None:
+        schema = {k: [v.dtype.str, list(v.shape[1:])] for k, v in columns.items()}
+        if self._manifest['columns'] is None:
+            self._manifest['columns'] = schema
+        elif schema != self._manifest['columns']:
+            raise ValueError("As colunas do lote não batem com as da varredura gravada.")
+
+    def append(self, start: int, sweep: SweepResult) -> Tuple[int, int]:
+        """Grava o lote como os projetos [start, start + len(sweep)). Devolve o intervalo."""
+        if self.readonly:
+            raise PermissionError("Varredura aberta somente para leitura.")
+        stop = start + len(sweep)
+        if start < 0 or stop <= start:
+            raise ValueError("Intervalo de projetos inválido.")
+        columns = _flatten(sweep)
+
+        with self._lock:
+            self._check_schema(columns)
+            if any(a < stop and start < b for a, b in self._shards):
+                raise ValueError(f"O intervalo [{start}, {stop}) já foi gravado (total ou parcialmente).")
+
+            tmp = tempfile.mkdtemp(dir=self.directory, prefix=".tmp-")
+            try:
+                for name, arr in columns.items():
+                    np.save(os.path.join(tmp, name + ".npy"), np.ascontiguousarray(arr), allow_pickle=False)
+                os.replace(tmp, os.path.join(self.directory, _shard_name(start, stop)))
+            except OSError:
+                shutil.rmtree(tmp, ignore_errors=True)
+                # Outro processo gravou o mesmo intervalo primeiro: o resultado é o mesmo
+                if not os.path.isdir(os.path.join(self.directory, _shard_name(start, stop))):
+                    raise
+
+            self._shards = self._scan()
+            self._sync_manifest()
+        return start, stop
+
+    # --- Leitura -------------------------------------------------------
+
+    def _shard_dir(self, rng: Tuple[int, int]) -> str:
+        return os.path.join(self.directory, _shard_name(*rng))
+
+    def _column_names(self) -> List[str]:
+        columns = self._manifest['columns']
+        if columns is None:
+            return []
+        return list(columns)
+
+    def shard(self, rng: Tuple[int, int]) -> SweepResult:
+        """Um shard como SweepResult de memmaps (nada é lido até ser usado)."""
+        path = self._shard_dir(rng)
+        return _unflatten({name: np.load(os.path.join(path, name + ".npy"), mmap_mode='r')
+                           for name in self._column_names()})
+
+    def iter_shards(self) -> Iterator[Tuple[Tuple[int, int], SweepResult]]:
+        """Percorre os shards em ordem de índice de projeto."""
+        for rng in list(self._shards):
+            yield rng, self.shard(rng)
+
+    def indices(self) -> np.ndarray:
+        """Índice de projeto de cada linha, na ordem de column() e load()."""
+        if not self._shards:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([np.arange(a, b, dtype=np.int64) for a, b in self._shards])
+
+    def column(self, name: str) -> np.ndarray:
+        """Uma coluna inteira ('cf_est', 'inputs.pc', 'control_points.E', ...), lendo só ela."""
+        if name not in self._column_names():
+            raise KeyError(name)
+        parts = [np.load(os.path.join(self._shard_dir(rng), name + ".npy"), mmap_mode='r')
+                 for rng in self._shards]
+        return np.concatenate(parts)
+
+    def load(self) -> SweepResult:
+        """Varredura inteira em memória (use column()/iter_shards() se não couber)."""
+        if not self._shards:
+            raise ValueError("Varredura vazia.")
+        return SweepResult.concat([sweep for _, sweep in self.iter_shards()])
@@ -8,7 +8,11 @@ class UnitManager:
     
     CONVERTERS = {
         'length_to_mm': {
-            'mm': 1.0, 'cm': 10.0, 'm': 1000.0
+            'mm': 1.0, 
+            'cm': 10.0, 
+            'm': 1000.0,
+            'in': 25.4,
+            'ft': 304.8  
         },
         'pressure_to_mpa': {
             'MPa': 1.0, 'Pa': 1e-6, 'psi': 0.00689476, 'ksi': 6.89476, 'atm': 0.101325
@@ -24,7 +28,12 @@ class UnitManager:
         category: 'length_to_mm', 'pressure_to_mpa', etc.
         reverse: Se True, converte DA base PARA a unidade de exibição (usado na UI).
         """
+        # Proteção contra unidade vazia ou inválida
+        if not from_unit or from_unit not in UnitManager.CONVERTERS.get(category, {}):
+            return value
+
         factor = UnitManager.CONVERTERS[category].get(from_unit, 1.0)
+        
         if reverse:
             return value / factor
-        return value * factor
\ No newline at end of file
+        return value * factor
@@ -0,0 +1,443 @@
+# src/simulation/explorer.py
+"""
+Exploração N-dimensional do espaço de projeto num pool de processos.
+
+Qualquer entrada do solver (tr, k, pc, pe, ang_div, ang_cov, length_pct,
+rounding_factor) e a pressão ambiente pa podem ser fixas, uma lista de valores
+ou uma faixa (Range). O espaço vira a grade completa ou uma amostra Latin
+hypercube/Sobol; cada ponto tem um índice fixo, então a varredura pode ser
+feita em lotes fora de ordem, gravada num SweepStore e retomada.
+
+Cada lote roda o solver vetorizado (Rao ou MOC) e a verificação de
+descolamento vetorizada (evaluate_contours) e vira um SweepResult com as
+máscaras em `checks`: converged, geometry_ok, has_separation e feasible
+(válido, convergido, geometria sem avisos e sem descolamento), além de
+safety_margin e separation_x.
+
+O tamanho dos lotes se ajusta à vazão medida (alvo de TARGET_SECONDS por
+lote) e diminui no fim, para nenhum processo ficar parado esperando o último.
+
+Uso (a partir da raiz do projeto):
+    python -m src.simulation.explorer -o varredura/ --set tr=13.5 --set k=1.2 --set pc=4 \\
+        --set pe=0.5:2:50 --set rounding_factor=0.3:1.5:20 --set ang_div=12,15,18 \\
+        --set length_pct=0.6:0.9:25 --set ang_cov=-135
+    python -m src.simulation.explorer -o varredura/ --sampling sobol -n 1000000 --set pe=0.5:2 ...
+"""
+import argparse
+import math
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from src.cli import Progress
+from src.config import CURRENT_VERSION
+from src.core.designs import ALIASES, CF_SOLVERS, DEFAULT_PA, DESIGN_KEYS, SOLVER_NAMES, solver_for
+from src.core.models import SweepResult
+from src.core.sweep_store import SweepStore
+from src.simulation.separation import evaluate_contours
+
+PARAM_KEYS = DESIGN_KEYS + ('pa',)
+SAMPLINGS = ('grid', 'lhs', 'sobol')
+
+# Lotes: tamanho inicial, limites e duração alvo de cada tarefa do pool
+MIN_CHUNK = 64
+MAX_CHUNK = 16384
+TARGET_SECONDS = 0.5
+
+# Joe & Kuo (2008), new-joe-kuo-6.21201: (s, a, m_1..m_s) das dimensões 2 a 9
+_SOBOL_PARAMS = ((1, 0, (1,)), (2, 1, (1, 3)), (3, 1, (1, 3, 1)), (3, 2, (1, 1, 1)),
+                 (4, 1, (1, 1, 3, 3)), (4, 4, (1, 3, 5, 13)), (5, 2, (1, 1, 5, 5, 17)),
+                 (5, 4, (1, 1, 5, 5, 5)))
+_SOBOL_BITS = 32
+
+
+@dataclass(frozen=True)
+class Range:
+    """Faixa contínua [low, high]. count é obrigatório na grade; log espaça em escala logarítmica."""
+    low: float
+    high: float
+    count: Optional[int] = None
+    log: bool = False
+
+    def __post_init__(self):
+        if not self.high >= self.low:
+            raise ValueError(f"Faixa inválida: [{self.low}, {self.high}].")
+        if self.log and self.low <= 0:
+            raise ValueError("Faixa logarítmica exige low > 0.")
+        if self.count is not None and self.count < 1:
+            raise ValueError("count deve ser >= 1.")
+
+    def levels(self) -> np.ndarray:
+        if self.count is None:
+            raise ValueError("A grade precisa de count em todas as faixas (Range(low, high, count)).")
+        space = np.geomspace if self.log else np.linspace
+        return space(self.low, self.high, self.count)
+
+    def scale(self, u: np.ndarray) -> np.ndarray:
+        """[0, 1) -> [low, high)."""
+        if self.log:
+            return np.exp(np.log(self.low) + u * (np.log(self.high) - np.log(self.low)))
+        return self.low + u * (self.high - self.low)
+
+
+def sobol_directions(dims: int, bits: int = _SOBOL_BITS) -> np.ndarray:
+    """Números de direção (dims, bits) como inteiros de `bits` bits."""
+    if dims > len(_SOBOL_PARAMS) + 1:
+        raise ValueError(f"Sobol implementado até {len(_SOBOL_PARAMS) + 1} dimensões.")
+    v = np.zeros((dims, bits), dtype=np.uint64)
+    if dims == 0:
+        return v
+    v[0] = [1 << (bits - j) for j in range(1, bits + 1)]
+    for d in range(1, dims):
+        s, a, m_init = _SOBOL_PARAMS[d - 1]
+        m = list(m_init)
+        for j in range(s, bits):
+            new = m[j - s] ^ (m[j - s] << s)
+            for i in range(1, s):
+                if (a >> (s - 1 - i)) & 1:
+                    new ^= m[j - i] << i
+            m.append(new)
+        v[d] = [m[j] << (bits - 1 - j) for j in range(bits)]
+    return v
+
+
+def sobol_points(start: int, stop: int, dims: int, shift: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Pontos [start, stop) da sequência de Sobol em [0, 1)^dims (ordem de código de
+    Gray, sem pular o ponto 0). Cada ponto é calculado direto do índice, sem
+    percorrer os anteriores. shift: deslocamento digital (dims,) em inteiros.
+    """
+    v = sobol_directions(dims)
+    index = np.arange(start, stop, dtype=np.uint64)
+    gray = index ^ (index >> np.uint64(1))
+    x = np.zeros((index.size, dims), dtype=np.uint64)
+    # Todos os bits: um intervalo que não começa em 0 pode ter bits altos ligados e baixos não
+    for bit in range(_SOBOL_BITS):
+        on = ((gray >> np.uint64(bit)) & np.uint64(1)).astype(bool)
+        if on.any():
+            x[on] ^= v[:, bit]
+    if shift is not None:
+        x ^= shift.astype(np.uint64)
+    return x.astype(float) / float(1 << _SOBOL_BITS)
+
+
+class DesignSpace:
+    """
+    Espaço de projeto: params mapeia cada entrada (PARAM_KEYS, ou os nomes
+    'len_pct'/'rounding' da UI) para um escalar, uma lista de valores ou um Range.
+    pa vale DEFAULT_PA se omitida; as demais entradas são obrigatórias.
+
+    sampling='grid': produto cartesiano de todas as listas e faixas (em ordem C,
+    na ordem de PARAM_KEYS). 'lhs'/'sobol': `samples` pontos; faixas são
+    amostradas no contínuo e listas viram escolhas discretas equiprováveis.
+    O LHS sem seed sorteia uma, guardada em meta() para a retomada reproduzir a amostra.
+    """
+
+    def __init__(self, params: Dict[str, Any], sampling: str = 'grid',
+                 samples: Optional[int] = None, seed: Optional[int] = None):
+        if sampling not in SAMPLINGS:
+            raise ValueError(f"Amostragem desconhecida: {sampling} (use {', '.join(SAMPLINGS)}).")
+        specs: Dict[str, Any] = {'pa': DEFAULT_PA}
+        for key, spec in params.items():
+            key = ALIASES.get(key, key)
+            if key not in PARAM_KEYS:
+                raise ValueError(f"Entrada desconhecida: {key}.")
+            if not isinstance(spec, Range) and np.ndim(spec) > 0:
+                spec = np.asarray(spec, dtype=float).ravel()
+                if spec.size == 0:
+                    raise ValueError(f"Lista vazia para {key}.")
+                spec = spec if spec.size > 1 else float(spec[0])
+            specs[key] = spec
+        missing = [k for k in PARAM_KEYS if k not in specs]
+        if missing:
+            raise ValueError(f"Faltam entradas: {', '.join(missing)}.")
+
+        self.specs = {k: specs[k] for k in PARAM_KEYS}
+        self.sampling = sampling
+        self.varying = [k for k, s in self.specs.items() if isinstance(s, (Range, np.ndarray))]
+
+        if sampling == 'grid':
+            self._levels = [self.specs[k] if isinstance(self.specs[k], np.ndarray) else self.specs[k].levels()
+                            for k in self.varying]
+            self._shape = tuple(len(lv) for lv in self._levels)
+            self.size = int(np.prod(self._shape, dtype=np.int64))
+        else:
+            if samples is None or samples < 1:
+                raise ValueError("lhs/sobol precisam de samples >= 1.")
+            self.size = int(samples)
+        if sampling == 'lhs' and seed is None:
+            seed = int(np.random.SeedSequence().entropy % (1 << 32))
+        self.seed = seed
+        self._unit: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _unit_points(self, start: int, stop: int) -> np.ndarray:
+        """Pontos da amostra em [0, 1)^d, (stop - start, d)."""
+        d = len(self.varying)
+        if self.sampling == 'sobol':
+            shift = None
+            if self.seed is not None:
+                shift = np.random.default_rng(self.seed).integers(0, 1 << _SOBOL_BITS, d, dtype=np.uint64)
+            return sobol_points(start, stop, d, shift)
+        if self._unit is None:
+            # LHS: um estrato por ponto em cada dimensão, estratos embaralhados por dimensão
+            rng = np.random.default_rng(self.seed)
+            n = self.size
+            self._unit = np.empty((n, d))
+            for j in range(d):
+                self._unit[:, j] = (rng.permutation(n) + rng.random(n)) / n
+        return self._unit[start:stop]
+
+    def points(self, start: int, stop: int) -> Dict[str, np.ndarray]:
+        """Entradas dos projetos [start, stop), uma coluna (stop - start,) por chave de PARAM_KEYS."""
+        if not 0 <= start <= stop <= self.size:
+            raise ValueError(f"Intervalo [{start}, {stop}) fora do espaço (0 a {self.size}).")
+        n = stop - start
+        out = {k: np.full(n, s, dtype=float) for k, s in self.specs.items() if k not in self.varying}
+        if self.sampling == 'grid':
+            idx = np.unravel_index(np.arange(start, stop), self._shape) if self.varying else ()
+            for key, levels, i in zip(self.varying, self._levels, idx):
+                out[key] = levels[i]
+        else:
+            unit = self._unit_points(start, stop)
+            for j, key in enumerate(self.varying):
+                spec = self.specs[key]
+                if isinstance(spec, Range):
+                    out[key] = spec.scale(unit[:, j])
+                else:
+                    out[key] = spec[np.minimum((unit[:, j] * spec.size).astype(np.int64), spec.size - 1)]
+        return {k: out[k] for k in PARAM_KEYS}
+
+    def meta(self) -> Dict[str, Any]:
+        """Descrição serializável (JSON) do espaço, para o SweepStore."""
+        def describe(spec):
+            if isinstance(spec, Range):
+                return {'low': spec.low, 'high': spec.high, 'count': spec.count, 'log': spec.log}
+            if isinstance(spec, np.ndarray):
+                return spec.tolist()
+            return float(spec)
+        return {'sampling': self.sampling, 'size': self.size, 'seed': self.seed,
+                'params': {k: describe(s) for k, s in self.specs.items()}}
+
+
+def stored_seed(directory: str) -> Optional[int]:
+    """Semente guardada na varredura em `directory` (None se ainda não houver varredura)."""
+    try:
+        meta = SweepStore(directory, readonly=True).meta
+    except FileNotFoundError:
+        return None
+    return meta.get('space', {}).get('seed')
+
+
+# --- Cálculo (roda nos processos do pool) -----------------------------------
+
+def evaluate_points(points: Dict[str, np.ndarray], options: Dict[str, Any]) -> Tuple[SweepResult, float]:
+    """Resolve um lote de pontos; devolve o SweepResult e o tempo gasto (s)."""
+    t0 = time.perf_counter()
+    solver = solver_for(options['solver'], options['moc_n'])
+    batch = solver.compute_batch(**{k: points[k] for k in DESIGN_KEYS}, with_contour=options['flow'])
+    converged = batch.is_converged()
+    checks: Dict[str, np.ndarray] = {'converged': converged}
+    feasible = batch.valid & converged
+    if options['flow']:
+        gamma = points['k']
+        if options.get('mach_table'):
+            if np.any(gamma != gamma[0]):
+                raise ValueError("mach_table exige o mesmo k em todo o espaço.")
+            gamma = float(gamma[0])
+        sep = evaluate_contours(batch.contour_x, batch.contour_y, points['pc'] * 1e6, points['pa'], gamma,
+                                mach_table=bool(options.get('mach_table')))
+        checks.update(geometry_ok=sep.geometry_ok, has_separation=sep.has_separation,
+                      safety_margin=sep.safety_margin, separation_x=sep.separation_x)
+        feasible = feasible & sep.geometry_ok & ~sep.has_separation
+    checks['feasible'] = feasible
+    sweep = SweepResult.from_batch(batch, inputs=points, dtype=options['dtype'],
+                                   keep_contours=False, checks=checks)
+    return sweep, time.perf_counter() - t0
+
+
+# --- Agendamento --------------------------------------------------------------
+
+class ChunkSizer:
+    """
+    Tamanho do próximo lote a partir da vazão medida por processo (média móvel),
+    mirando `target` segundos por tarefa. Perto do fim os lotes encolhem para
+    dividir o que resta entre todos os processos.
+    """
+
+    def __init__(self, workers: int, target: float = TARGET_SECONDS,
+                 min_chunk: int = MIN_CHUNK, max_chunk: int = MAX_CHUNK):
+        self.workers = workers
+        self.target = target
+        self.min_chunk = min_chunk
+        self.max_chunk = max_chunk
+        self.rate: Optional[float] = None
+
+    def update(self, rows: int, seconds: float) -> None:
+        rate = rows / max(seconds, 1e-6)
+        self.rate = rate if self.rate is None else 0.7 * self.rate + 0.3 * rate
+
+    def next(self, remaining: int) -> int:
+        size = self.min_chunk if self.rate is None else int(self.rate * self.target)
+        size = min(size, math.ceil(remaining / (2 * self.workers)))
+        return max(1, min(remaining, max(self.min_chunk, min(size, self.max_chunk))))
+
+
+def explore(space: DesignSpace, solver: str = 'rao', workers: Optional[int] = None,
+            store_dir: Optional[str] = None, flow: bool = True, moc_n: int = 60,
+            dtype=np.float64, progress: Optional[Callable[[int], None]] = None,
+            target_seconds: float = TARGET_SECONDS, mach_table: bool = False) -> SweepResult:
+    """
+    Avalia todo o espaço e devolve um SweepResult na ordem dos índices.
+    space é um DesignSpace ou outro objeto com len(), points(start, stop) e
+    meta() (ex.: ToleranceSpace). mach_table usa a tabela Mach x A/A* de
+    FlowSimulation na verificação de descolamento (exige k fixo no espaço).
+
+    Com store_dir, cada lote é gravado num SweepStore assim que termina;
+    reabrir o mesmo diretório com o mesmo espaço e opções calcula só o que falta
+    (outro espaço ou opção levanta ValueError). progress(n) é chamado a cada lote.
+    """
+    if solver not in SOLVER_NAMES:
+        raise ValueError(f"Solver desconhecido: {solver} (use {', '.join(SOLVER_NAMES)}).")
+    options = {'solver': solver, 'moc_n': moc_n, 'flow': flow, 'dtype': np.dtype(dtype), 'mach_table': mach_table}
+    workers = max(1, workers or os.cpu_count() or 1)
+    total = len(space)
+
+    store = None
+    gaps = [(0, total)]
+    if store_dir is not None:
+        meta = {'space': space.meta(), 'solver': solver, 'moc_n': moc_n, 'flow': flow,
+                'dtype': options['dtype'].str, 'mach_table': mach_table}
+        store = SweepStore(store_dir, meta=meta)
+        gaps = store.pending(total, total)
+
+    sizer = ChunkSizer(workers, target_seconds)
+    remaining = sum(b - a for a, b in gaps)
+    parts: Dict[int, SweepResult] = {}
+
+    def next_range() -> Tuple[int, int]:
+        nonlocal remaining
+        start, stop = gaps[0]
+        size = sizer.next(remaining)
+        end = min(stop, start + size)
+        if end == stop:
+            gaps.pop(0)
+        else:
+            gaps[0] = (end, stop)
+        remaining -= end - start
+        return start, end
+
+    def collect(start: int, sweep: SweepResult, seconds: float) -> None:
+        sizer.update(len(sweep), seconds)
+        if store is not None:
+            store.append(start, sweep)
+        else:
+            parts[start] = sweep
+        if progress is not None:
+            progress(len(sweep))
+
+    if workers == 1:
+        while gaps:
+            start, stop = next_range()
+            collect(start, *evaluate_points(space.points(start, stop), options))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            in_flight: Dict[Any, int] = {}
+            try:
+                while gaps or in_flight:
+                    # Duas tarefas por processo na fila: ninguém espera o próximo lote ser montado
+                    while gaps and len(in_flight) < 2 * workers:
+                        start, stop = next_range()
+                        in_flight[executor.submit(evaluate_points, space.points(start, stop), options)] = start
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(in_flight.pop(future), *future.result())
+            except BaseException:
+                for future in in_flight:
+                    future.cancel()
+                raise
+
+    if store is not None:
+        return store.load()
+    if not parts:
+        raise ValueError("Espaço de projeto vazio.")
+    return SweepResult.concat([parts[k] for k in sorted(parts)])
+
+
+# --- Linha de comando -----------------------------------------------------------
+
+def parse_spec(text: str) -> Union[float, List[float], Range]:
+    """'4' -> escalar, '10,12,14' -> lista, '0.5:2' ou '0.5:2:50' -> Range."""
+    if ':' in text:
+        parts = text.split(':')
+        if len(parts) not in (2, 3):
+            raise ValueError(f"Faixa deve ser low:high ou low:high:n, recebeu '{text}'.")
+        return Range(float(parts[0]), float(parts[1]), int(parts[2]) if len(parts) == 3 else None)
+    if ',' in text:
+        return [float(v) for v in text.split(',')]
+    return float(text)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.simulation.explorer",
+                                     description=f"NozzleCalc {CURRENT_VERSION} - exploração do espaço de projeto.")
+    parser.add_argument("-o", "--output", required=True, help="Diretório da varredura (retoma se já existir)")
+    parser.add_argument("--set", action='append', default=[], metavar="CHAVE=VALOR",
+                        help="Entrada fixa (pc=4), lista (ang_div=12,15,18) ou faixa (pe=0.5:2:50)")
+    parser.add_argument("--sampling", choices=SAMPLINGS, default='grid')
+    parser.add_argument("-n", "--samples", type=int, help="Número de pontos (lhs/sobol)")
+    parser.add_argument("--seed", type=int, help="Semente (lhs; no sobol ativa o embaralhamento). "
+                                                   "Sem ela, o lhs retoma com a semente gravada em -o")
+    parser.add_argument("--solver", choices=sorted(SOLVER_NAMES), default='rao')
+    parser.add_argument("--moc-n", type=int, default=60, help="Número de características do MOC")
+    parser.add_argument("--no-flow", action='store_true', help="Não roda a verificação de descolamento")
+    parser.add_argument("--float32", action='store_true', help="Grava as colunas numéricas em float32")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processos do pool")
+    args = parser.parse_args(argv)
+
+    try:
+        params = {}
+        for item in args.set:
+            key, sep, value = item.partition('=')
+            if not sep:
+                raise ValueError(f"--set espera chave=valor, recebeu '{item}'.")
+            params[key.strip()] = parse_spec(value.strip())
+        seed = args.seed
+        if seed is None and args.sampling == 'lhs':
+            # Retomada sem --seed: a mesma semente da varredura gravada
+            seed = stored_seed(args.output)
+        space = DesignSpace(params, args.sampling, args.samples, seed)
+    except ValueError as e:
+        print(f"Erro no espaço de projeto: {e}", file=sys.stderr)
+        return 2
+
+    print(f"{len(space)} pontos ({space.sampling}, variando {', '.join(space.varying) or '-'}) | "
+          f"{args.workers} processo(s)", file=sys.stderr)
+    progress = Progress(len(space))
+    try:
+        sweep = explore(space, solver=args.solver, workers=args.workers, store_dir=args.output,
+                        flow=not args.no_flow, moc_n=args.moc_n,
+                        dtype=np.float32 if args.float32 else np.float64, progress=progress.update)
+    except ValueError as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 2
+
+    feasible = sweep.checks['feasible']
+    print(f"Concluído em {progress.elapsed:.2f} s -> {args.output} | válidos: {int(sweep.valid.sum())} | "
+          f"viáveis: {int(feasible.sum())}", file=sys.stderr)
+    # O MOC não estima Cf (cf_est = 0): sem ranking
+    if feasible.any() and args.solver in CF_SOLVERS:
+        best = sweep.filter(feasible).sort('cf_est', descending=True)[0]
+        print(f"Melhor Cf viável: {best.cf_est:.4f} com {best.inputs}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,19 @@
 import numpy as np
 from dataclasses import dataclass, field
-from typing import Optional, Tuple, List
+from typing import Optional, Tuple, List, Union
+from src.core import gasdynamics
 from src.core.models import NozzleResult
+from src.core.geometry import AdaptiveSampling, contour_quality
+from src.core.disk_cache import DiskCache, register_type
 
+@register_type
 @dataclass
 class SimulationInput:
     chamber_pressure: float
     ambient_pressure: float
     gamma: float
 
+@register_type
 @dataclass
 class SeparationResult:
     has_separation: bool
@@ -27,12 +32,19 @@ class SeparationResult:
     schmucker_limit: np.ndarray = field(default_factory=lambda: np.array([]))
 
 class FlowSimulation:
-    def __init__(self, geometry: NozzleResult, inputs: SimulationInput):
+    def __init__(self, geometry: NozzleResult, inputs: SimulationInput,
+                 sampling: Optional[AdaptiveSampling] = None):
         self.geo = geometry
         self.inputs = inputs
+        # None = contorno denso do solver; senão, amostragem adaptativa das primitivas
+        self.sampling = sampling
         self.warnings = []
 
     def run(self) -> SeparationResult:
+        return self.prepare().evaluate(self.inputs.ambient_pressure)
+
+    def prepare(self) -> "PreparedFlow":
+        """Parte que não depende da pressão ambiente (geometria, gamma e pc)."""
         # 1. Dados Brutos
         div_x, div_y, area_ratios = self._extract_divergent_section()
 
@@ -42,27 +54,29 @@ class FlowSimulation:
         # 3. Solver Físico
         mach_profile = self._solve_mach_distribution(area_ratios)
         pressure_profile = self._calculate_pressure_profile(mach_profile)
-        
-        # 4. Critério de Descolamento
-        result = self._analyze_separation(div_x, mach_profile, pressure_profile)
-        
-        # Injeta avisos
-        result.geometric_warnings = self.warnings
-        
-        # Se houve erro geométrico, invalidamos o resultado visualmente
-        if len(self.warnings) > 0:
-            result.safety_margin = -1.0 # Força vermelho
-            result.has_separation = True
-            
-        return result
+
+        return PreparedFlow(
+            axis_x=div_x,
+            wall_y=div_y,
+            area_ratios=area_ratios,
+            mach_distribution=mach_profile,
+            wall_pressure=pressure_profile,
+            schmucker_ratio=self._schmucker_ratio(mach_profile),
+            geometric_warnings=list(self.warnings),
+            chamber_pressure=self.inputs.chamber_pressure,
+        )
 
     def _extract_divergent_section(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
-        throat_idx = np.argmin(self.geo.contour_y)
-        throat_radius = self.geo.contour_y[throat_idx]
+        if self.sampling is None:
+            cx, cy = self.geo.contour_x, self.geo.contour_y
+        else:
+            cx, cy = self.geo.sample_wall(self.sampling)
+        throat_idx = np.argmin(cy)
+        throat_radius = cy[throat_idx]
         throat_area = np.pi * (throat_radius ** 2)
 
-        div_x = self.geo.contour_x[throat_idx:]
-        div_y = self.geo.contour_y[throat_idx:]
+        div_x = cx[throat_idx:]
+        div_y = cy[throat_idx:]
         
         # Garante que x começa em 0 para facilitar a matemática
         div_x = div_x - div_x[0]
@@ -73,101 +87,65 @@ class FlowSimulation:
         return div_x, div_y, area_ratios
 
     def _analyze_geometry_quality(self, x: np.ndarray, y: np.ndarray):
-        """
-        Analisa a geometria usando vetores de deslocamento físico.
-        Impede matematicamente o erro de 180 graus.
-        """
-        if len(x) < 5: return
-
-        # Detecta escala (m ou mm)
-        span = x[-1] - x[0]
-        is_meters = span < 1.0
-        # Tolerância: Procura um ponto a 0.5mm de distância física
-        LOOKAHEAD_DIST = 0.0005 if is_meters else 0.5
-        unit = "m" if is_meters else "mm"
-
-        # --- CHECK 1: Saída da Garganta (Throat Exit) ---
-        # Encontra o índice do primeiro ponto que está "longe o suficiente" (dx > 0.5mm)
-        # Isso ignora qualquer ruído microscópico nos primeiros índices.
-        indices_ahead = np.where(x > (x[0] + LOOKAHEAD_DIST))[0]
-        
-        if len(indices_ahead) > 0:
-            idx = indices_ahead[0]
-            
-            # Cálculo vetorial simples
-            dx = x[idx] - x[0] # Sempre positivo por definição
-            dy = y[idx] - y[0]
-            
-            # Como dx > 0, arctan2 está limitado a (-90, 90). 180 é impossível.
-            angle = np.degrees(np.arctan2(dy, dx))
-            
-            print(f"[GEO DEBUG] Throat Angle (at {LOOKAHEAD_DIST}{unit}): {angle:.4f}°")
-
-            # Aumentei a tolerância para 2.0 graus para evitar falsos positivos em tubeiras pequenas
-            if abs(angle) > 2.0:
-                self.warnings.append(f"CRITICAL: Sharp throat exit ({angle:.1f}°). Flow may detach. Increasing TRF is suggested.")
-
-        # --- CHECK 2: Quinas no corpo (Kinks) ---
-        # Percorre a tubeira verificando mudanças de ângulo em intervalos fixos
-        # Passo: a cada 2% do comprimento
-        step_idx = max(1, len(x) // 50) 
-        
-        for i in range(0, len(x) - step_idx * 2, step_idx):
-            # Pontos: A -> B -> C
-            idx_a = i
-            idx_b = i + step_idx
-            idx_c = i + step_idx * 2
-            
-            # Vetor 1 (A->B)
-            dx1 = x[idx_b] - x[idx_a]
-            dy1 = y[idx_b] - y[idx_a]
-            ang1 = np.degrees(np.arctan2(dy1, dx1))
-            
-            # Vetor 2 (B->C)
-            dx2 = x[idx_c] - x[idx_b]
-            dy2 = y[idx_c] - y[idx_b]
-            ang2 = np.degrees(np.arctan2(dy2, dx2))
-            
-            diff = abs(ang2 - ang1)
-            
-            # Se a parede dobrar mais que 3 graus de repente
-            if diff > 3.0:
-                loc = x[idx_b]
-                self.warnings.append(f"DISCONTINUITY: Kink of {diff:.1f}° detected at X ≈ {loc:.3f}")
-                # Reporta apenas o primeiro erro grave para não poluir
-                break 
+        """Saída da garganta e quinas ao longo de toda a parede (ver contour_quality)."""
+        self.warnings.extend(contour_quality(x, y).warnings(0))
 
     def _solve_mach_distribution(self, area_ratios: np.ndarray) -> np.ndarray:
-        # Solver rápido usando interpolação para robustez
-        # (Newton-Raphson pode falhar com inputs ruins, interpolação nunca falha)
-        # Criamos uma tabela pré-calculada de Mach vs AreaRatio
-        g = self.inputs.gamma
-        
-        # Tabela de Mach 1.0 a 10.0
-        mach_table = np.linspace(1.0, 10.0, 1000)
-        
-        # Fórmula da Razão de Área
-        term1 = 1 / mach_table**2
-        term2 = (2 + (g - 1) * mach_table**2) / (g + 1)
-        exp = (g + 1) / (g - 1)
-        area_table = np.sqrt(term1 * (term2 ** exp))
-        
-        # Interpola o Mach real baseado na área da tubeira atual
-        return np.interp(area_ratios, area_table, mach_table)
+        # Tabela Mach x A/A* em cache por gamma (construída uma vez por processo).
+        # Razões ligeiramente abaixo de 1 (ruído numérico na garganta) viram Mach 1.
+        table = gasdynamics.isentropic_table(self.inputs.gamma)
+        return table.mach_from_area_ratio(area_ratios)
 
     def _calculate_pressure_profile(self, mach_profile: np.ndarray) -> np.ndarray:
-        g = self.inputs.gamma
-        base = 1 + (g - 1) / 2 * np.power(mach_profile, 2)
-        exponent = -g / (g - 1)
-        return self.inputs.chamber_pressure * np.power(base, exponent)
+        p_ratio, _, _ = gasdynamics.isentropic_ratios(mach_profile, self.inputs.gamma)
+        return self.inputs.chamber_pressure * p_ratio
 
-    def _analyze_separation(self, x_coords: np.ndarray, mach: np.ndarray, pressure: np.ndarray) -> SeparationResult:
+    @staticmethod
+    def _schmucker_ratio(mach: np.ndarray) -> np.ndarray:
+        """P_limite / P_ambiente ao longo da parede (critério de Schmucker)."""
         # Critério Schmucker (simplificado para robustez)
         term = 1.88 * mach - 1
         term = np.maximum(term, 0.6) # Evita números negativos/zero
-        schmucker_ratio = np.power(term, -0.64)
-        
-        p_limit = self.inputs.ambient_pressure * schmucker_ratio
+        return np.power(term, -0.64)
+
+
+@register_type
+@dataclass
+class SeparationSweep:
+    """Resultado de PreparedFlow.evaluate_many: um valor por pressão ambiente (NaN = sem descolamento)."""
+    ambient_pressure: np.ndarray
+    has_separation: np.ndarray
+    separation_x: np.ndarray
+    separation_pressure: np.ndarray
+    safety_margin: np.ndarray
+    # False onde a análise geométrica gerou avisos (margem forçada a -1, como em evaluate)
+    geometry_ok: Optional[np.ndarray] = None
+
+
+@register_type
+@dataclass
+class PreparedFlow:
+    """
+    Escoamento na parede já resolvido para uma geometria, gamma e pc. Só o
+    limite de Schmucker e o cruzamento dependem da pressão ambiente, então
+    avaliar uma nova pressão (ou um vetor delas) não refaz Mach nem pressão.
+    """
+    axis_x: np.ndarray
+    wall_y: np.ndarray
+    area_ratios: np.ndarray
+    mach_distribution: np.ndarray
+    wall_pressure: np.ndarray
+    schmucker_ratio: np.ndarray
+    geometric_warnings: List[str] = field(default_factory=list)
+    # pc [Pa] usado em wall_pressure (a razão p/p0 na parede não depende dele)
+    chamber_pressure: Optional[float] = None
+
+    # Limite de elementos da matriz (pressões x pontos) montada por vez em evaluate_many
+    CHUNK_ELEMENTS = 1 << 20
+
+    def evaluate(self, ambient_pressure: float) -> SeparationResult:
+        pressure = self.wall_pressure
+        p_limit = ambient_pressure * self.schmucker_ratio
         
         # Detecta onde P_wall cruza P_limit
         # Usamos argmax para achar o primeiro True
@@ -179,7 +157,7 @@ class FlowSimulation:
         
         if has_separation:
             idx = np.argmax(sep_mask) # Primeiro índice onde ocorre
-            sep_x = x_coords[idx]
+            sep_x = self.axis_x[idx]
             sep_p = pressure[idx]
 
         # Margem de segurança
@@ -190,14 +168,231 @@ class FlowSimulation:
         else:
             min_margin = 0.0
 
-        return SeparationResult(
+        result = SeparationResult(
             has_separation=has_separation,
             separation_x=sep_x,
             separation_mach=None,
             separation_pressure=sep_p,
             safety_margin=min_margin,
-            axis_x=x_coords,
-            mach_distribution=mach,
+            axis_x=self.axis_x,
+            mach_distribution=self.mach_distribution,
             wall_pressure=pressure,
             schmucker_limit=p_limit
-        )
\ No newline at end of file
+        )
+
+        # Injeta avisos
+        result.geometric_warnings = list(self.geometric_warnings)
+        
+        # Se houve erro geométrico, invalidamos o resultado visualmente
+        if len(self.geometric_warnings) > 0:
+            result.safety_margin = -1.0 # Força vermelho
+            result.has_separation = True
+            
+        return result
+
+    def evaluate_many(self, ambient_pressures: Union[float, np.ndarray]) -> SeparationSweep:
+        """Mesmo critério de evaluate para um vetor de pressões ambiente, sem laço em Python."""
+        pa = np.atleast_1d(np.asarray(ambient_pressures, dtype=float)).ravel()
+        n = len(pa)
+        pressure = self.wall_pressure
+        has_sep = np.zeros(n, dtype=bool)
+        sep_x = np.full(n, np.nan)
+        sep_p = np.full(n, np.nan)
+        margin = np.zeros(n)
+
+        if len(pressure) > 0:
+            denom = pressure + 1e-9
+            step = max(1, self.CHUNK_ELEMENTS // len(pressure))
+            for start in range(0, n, step):
+                chunk = slice(start, start + step)
+                p_limit = pa[chunk, None] * self.schmucker_ratio        # (pressões, pontos)
+                sep_mask = pressure < p_limit
+                hit = sep_mask.any(axis=1)
+                idx = np.argmax(sep_mask, axis=1)
+                has_sep[chunk] = hit
+                sep_x[chunk] = np.where(hit, self.axis_x[idx], np.nan)
+                sep_p[chunk] = np.where(hit, pressure[idx], np.nan)
+                margin[chunk] = np.min((pressure - p_limit) / denom, axis=1)
+
+        if len(self.geometric_warnings) > 0:
+            margin[:] = -1.0
+            has_sep[:] = True
+
+        return SeparationSweep(ambient_pressure=pa, has_separation=has_sep, separation_x=sep_x,
+                               separation_pressure=sep_p, safety_margin=margin,
+                               geometry_ok=np.full(n, len(self.geometric_warnings) == 0))
+
+
+    def _pressure_criterion(self, pc: np.ndarray, pa: np.ndarray):
+        """
+        Critério de evaluate para pares (pc, pa) em broadcast, via t = pa/pc
+        (ver envelope). Devolve (has_sep, sep_x, sep_p, margin) sem os avisos geométricos.
+        """
+        n = len(self.wall_pressure)
+        if n == 0:
+            raise ValueError("Perfil de parede vazio.")
+        p_ratio = self.wall_pressure / self.chamber_pressure
+        # -min acumulado de (p/p0)/r: não decrescente, pronto para searchsorted
+        lead = -np.minimum.accumulate(p_ratio / self.schmucker_ratio)
+        t = pa / pc
+        idx = np.searchsorted(lead, -t, side='right')
+        has_sep = idx < n
+        idx = np.minimum(idx, n - 1)
+
+        j = np.argmax(self.schmucker_ratio / p_ratio)
+        p_crit = pc * p_ratio[j]
+        margin = (p_crit - pa * self.schmucker_ratio[j]) / (p_crit + 1e-9)
+        sep_x = np.where(has_sep, self.axis_x[idx], np.nan)
+        sep_p = np.where(has_sep, pc * p_ratio[idx], np.nan)
+        return has_sep, sep_x, sep_p, margin
+
+    def evaluate_pressures(self, chamber_pressures: Union[float, np.ndarray],
+                           ambient_pressures: Union[float, np.ndarray]) -> SeparationSweep:
+        """
+        Critério de evaluate amostra a amostra para pc e pa [Pa] variando juntos
+        (ex.: transdutor de um teste estático), com broadcast entre os dois
+        vetores. Os avisos geométricos valem como em evaluate_many.
+        """
+        if self.chamber_pressure is None:
+            raise ValueError("PreparedFlow sem pressão de câmara: use FlowSimulation.prepare().")
+        pc, pa = np.broadcast_arrays(np.atleast_1d(np.asarray(chamber_pressures, dtype=float)).ravel(),
+                                     np.atleast_1d(np.asarray(ambient_pressures, dtype=float)).ravel())
+        if np.any(pc <= 0) or np.any(pa < 0):
+            raise ValueError("A avaliação exige pc > 0 e pa >= 0.")
+        has_sep, sep_x, sep_p, margin = self._pressure_criterion(pc, pa)
+        if len(self.geometric_warnings) > 0:
+            margin[:] = -1.0
+            has_sep[:] = True
+        n = len(pa)
+        return SeparationSweep(ambient_pressure=np.array(pa), has_separation=has_sep, separation_x=sep_x,
+                               separation_pressure=sep_p, safety_margin=margin,
+                               geometry_ok=np.full(n, len(self.geometric_warnings) == 0))
+
+    def envelope(self, chamber_pressures: np.ndarray, ambient_pressures: np.ndarray) -> "OperatingEnvelope":
+        """
+        Mapa (pc x pa) do critério de evaluate para esta geometria e gamma.
+
+        Na parede p = pc·(p/p0)(x) e o limite é pa·r(x), então tudo depende só de
+        t = pa/pc: descola onde (p/p0)/r < t, o primeiro ponto vem de uma busca
+        no mínimo acumulado de (p/p0)/r e a margem mínima fica sempre no ponto de
+        maior r/(p/p0). A grade inteira sai de uma avaliação com broadcast, sem
+        matriz (pc, pa, pontos). Os avisos geométricos não são aplicados ao mapa
+        (seriam iguais em toda a grade); vão em geometric_warnings.
+        """
+        if self.chamber_pressure is None:
+            raise ValueError("PreparedFlow sem pressão de câmara: use FlowSimulation.prepare().")
+        pc = np.atleast_1d(np.asarray(chamber_pressures, dtype=float)).ravel()
+        pa = np.atleast_1d(np.asarray(ambient_pressures, dtype=float)).ravel()
+        if np.any(pc <= 0) or np.any(pa < 0):
+            raise ValueError("O mapa exige pc > 0 e pa >= 0.")
+        has_sep, sep_x, sep_p, margin = self._pressure_criterion(pc[:, None], pa[None, :])
+        return OperatingEnvelope(
+            chamber_pressure=pc,
+            ambient_pressure=pa,
+            safety_margin=margin,
+            has_separation=has_sep,
+            separation_x=sep_x,
+            separation_pressure=sep_p,
+            geometric_warnings=list(self.geometric_warnings),
+        )
+
+
+@register_type
+@dataclass
+class OperatingEnvelope:
+    """
+    Mapa de operação de uma geometria: linhas = pressões de câmara [Pa],
+    colunas = pressões ambiente [Pa]. separation_x na unidade do contorno;
+    NaN onde não há descolamento.
+    """
+    chamber_pressure: np.ndarray
+    ambient_pressure: np.ndarray
+    safety_margin: np.ndarray
+    has_separation: np.ndarray
+    separation_x: np.ndarray
+    separation_pressure: np.ndarray
+    geometric_warnings: List[str] = field(default_factory=list)
+
+    def save(self, path: str) -> None:
+        """.npz (matrizes) ou .csv (uma linha por par pc, pa)."""
+        if path.lower().endswith('.npz'):
+            np.savez_compressed(path, chamber_pressure=self.chamber_pressure,
+                                ambient_pressure=self.ambient_pressure, safety_margin=self.safety_margin,
+                                has_separation=self.has_separation, separation_x=self.separation_x,
+                                separation_pressure=self.separation_pressure)
+            return
+        pc, pa = np.meshgrid(self.chamber_pressure, self.ambient_pressure, indexing='ij')
+        table = np.column_stack([pc.ravel(), pa.ravel(), self.safety_margin.ravel(),
+                                 self.has_separation.ravel(), self.separation_x.ravel(),
+                                 self.separation_pressure.ravel()])
+        np.savetxt(path, table, delimiter=',', fmt='%.9g', comments='',
+                   header="pc_pa,pa_pa,safety_margin,has_separation,separation_x,separation_pressure_pa")
+
+
+def evaluate_contours(contour_x: np.ndarray, contour_y: np.ndarray, chamber_pressure: Union[float, np.ndarray],
+                      ambient_pressure: Union[float, np.ndarray],
+                      gamma: Union[float, np.ndarray], mach_table: bool = False) -> SeparationSweep:
+    """
+    Critério de FlowSimulation.run (contorno denso, sampling=None) para um lote
+    de contornos (B, M), um projeto por linha, sem laço em Python. pc [Pa], pa
+    [Pa] e gamma podem ser escalares ou vetores (B,). O Mach vem do inversor
+    exato de A/A* (gamma pode variar por linha), não da tabela por gamma.
+    mach_table=True usa a tabela de FlowSimulation (gamma escalar), bem mais
+    rápida quando o lote inteiro tem o mesmo gamma.
+    Linhas sem contorno (projetos inválidos) saem com margem NaN e geometry_ok=False.
+    """
+    if mach_table and np.ndim(gamma) != 0:
+        raise ValueError("mach_table exige um gamma escalar.")
+    cx = np.atleast_2d(np.asarray(contour_x, dtype=float))
+    cy = np.atleast_2d(np.asarray(contour_y, dtype=float))
+    b, m = cx.shape
+    pc, pa, k = (np.broadcast_to(np.asarray(v, dtype=float), (b,))
+                 for v in (chamber_pressure, ambient_pressure, gamma))
+    ok = np.isfinite(cy).any(axis=1) & (k > 1)
+
+    # Seção divergente de cada linha alinhada à esquerda (garganta na coluna 0, NaN no fim)
+    throat = np.argmin(np.where(np.isfinite(cy), cy, np.inf), axis=1)
+    cols = throat[:, None] + np.arange(m)
+    inside = (cols < m) & ok[:, None]
+    cols = np.minimum(cols, m - 1)
+    div_x = np.where(inside, np.take_along_axis(cx, cols, axis=1), np.nan)
+    div_y = np.where(inside, np.take_along_axis(cy, cols, axis=1), np.nan)
+    div_x = div_x - div_x[:, :1]
+
+    with np.errstate(invalid='ignore'):
+        area_ratios = np.pi * (div_y ** 2) / (np.pi * (div_y[:, :1] ** 2))
+        k_safe = np.where(ok, k, 2.0)[:, None]
+        if mach_table and ok.any():
+            mach = gasdynamics.isentropic_table(float(gamma)).mach_from_area_ratio(area_ratios)
+        else:
+            mach = gasdynamics.mach_from_area_ratio(np.maximum(area_ratios, 1.0), k_safe)
+        p_ratio, _, _ = gasdynamics.isentropic_ratios(mach, k_safe)
+        pressure = pc[:, None] * p_ratio
+        p_limit = pa[:, None] * FlowSimulation._schmucker_ratio(mach)
+
+        sep_mask = pressure < p_limit
+        has_sep = sep_mask.any(axis=1)
+        idx = np.argmax(sep_mask, axis=1)
+        rows = np.arange(b)
+        sep_x = np.where(has_sep, div_x[rows, idx], np.nan)
+        sep_p = np.where(has_sep, pressure[rows, idx], np.nan)
+        margin = np.nanmin(np.where(inside, (pressure - p_limit) / (pressure + 1e-9), np.inf), axis=1)
+    margin = np.where(ok, margin, np.nan)
+
+    geometry_ok = contour_quality(div_x, div_y).valid & ok
+    bad_geometry = ok & ~geometry_ok
+    margin = np.where(bad_geometry, -1.0, margin)
+    has_sep = has_sep | bad_geometry
+
+    return SeparationSweep(ambient_pressure=np.array(pa), has_separation=has_sep, separation_x=sep_x,
+                           separation_pressure=sep_p, safety_margin=margin, geometry_ok=geometry_ok)
+
+def run_cached(geometry: NozzleResult, inputs: SimulationInput,
+               sampling: Optional[AdaptiveSampling] = None,
+               disk: Optional[DiskCache] = None) -> SeparationResult:
+    """FlowSimulation.run com reaproveitamento em disco (chave: geometria + entradas + amostragem)."""
+    simulate = lambda: FlowSimulation(geometry, inputs, sampling).run()
+    if disk is None:
+        return simulate()
+    return disk.get_or_compute("FlowSimulation.run",
+                               {'geometry': geometry, 'inputs': inputs, 'sampling': sampling}, simulate)
@@ -0,0 +1,376 @@
+# src/simulation/static_fire.py
+"""
+Importação de logs de transdutor de pressão de câmara de testes estáticos
+(dezenas de milhões de amostras, CSV ou binário cru), lidos em blocos com
+memória limitada, opcionalmente filtrados e decimados, e avaliados amostra a
+amostra para o bocal atual.
+
+Para cada amostra, com o bocal fixo (ε fixo, logo pe/pc fixo): Cf de
+calculate_performance mais a parcela de pressão (pe - pa)/pc · ε, empuxo
+F = Cf·pc·At e o critério de Schmucker do FlowSimulation com pc variando
+(PreparedFlow.evaluate_pressures). Amostras com pc <= pa (antes da ignição e
+depois do fim da queima) ficam fora da avaliação: empuxo 0 e margem NaN.
+
+Uso (a partir da raiz do projeto):
+    python -m src.simulation.static_fire teste.csv -o saida.npz --project motor.nzl --pc-unit psi
+    python -m src.simulation.static_fire teste.bin --raw '<i2' --channels 4 --channel 1 --rate 50000 \\
+        --scale 0.0025 --pc-unit MPa --decimate 10 --window 20 --project motor.nzl -o saida.csv
+"""
+import argparse
+import math
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from src.cli import open_writer, read_designs
+from src.core.designs import DESIGN_KEYS, SOLVER_NAMES, parse_defaults, solver_for
+from src.core.geometry import AdaptiveSampling, SAMPLING_FLOW
+from src.core.models import NozzleResult
+from src.core.solvers.bell_nozzle import BellNozzleSolver
+from src.core.units import UnitManager
+from src.simulation.separation import FlowSimulation, SimulationInput
+from src.simulation.streaming import DEFAULT_CHUNK_ROWS, Downsampler, iter_binary_channel, iter_csv_columns
+
+# Cabeçalhos aceitos (sem unidade, minúsculos)
+STATIC_FIRE_COLUMNS = {
+    'time': ('time', 't', 'time_s'),
+    'pc': ('pc', 'chamber_pressure', 'pressure', 'p', 'p_c'),
+}
+
+
+@dataclass(frozen=True)
+class RawFormat:
+    """Layout de um binário cru de aquisição (ver iter_binary_channel); rate em Hz."""
+    rate: float
+    dtype: str = '<f4'
+    channels: int = 1
+    channel: int = 0
+    header_bytes: int = 0
+    scale: float = 1.0
+    offset: float = 0.0
+
+
+@dataclass
+class StaticFireSummary:
+    samples: int
+    # Amostras com pc > pa (motor queimando)
+    active_samples: int
+    start_time: float
+    end_time: float
+    burn_start: Optional[float]
+    burn_end: Optional[float]
+    peak_pc: float
+    peak_time: float
+    impulse_ideal: float
+    impulse_est: float
+    separated_samples: int
+    min_margin: float
+    min_margin_time: float
+    geometric_warnings: List[str] = field(default_factory=list)
+
+    def report(self) -> str:
+        lines = [f"Amostras: {self.samples} ({self.start_time:.4f} s a {self.end_time:.4f} s)"]
+        if self.active_samples == 0:
+            lines.append("Nenhuma amostra com pc acima da pressão ambiente.")
+        else:
+            lines.append(f"Queima: {self.burn_start:.4f} s a {self.burn_end:.4f} s "
+                         f"({self.active_samples} amostras)")
+            lines.append(f"Pico de pc: {self.peak_pc / 1e6:.3f} MPa em t = {self.peak_time:.4f} s")
+            lines.append(f"Impulso total: {self.impulse_ideal:.1f} N·s (ideal) | {self.impulse_est:.1f} N·s (estimado)")
+            lines.append(f"Amostras com descolamento: {self.separated_samples}")
+            lines.append(f"Menor margem: {self.min_margin * 100:.1f}% em t = {self.min_margin_time:.4f} s")
+        lines.extend(f"Aviso geométrico: {w}" for w in self.geometric_warnings)
+        return "\n".join(lines)
+
+
+class TraceConditioner:
+    """
+    Condicionamento em fluxo do sinal de pc: média móvel causal de `window`
+    amostras e depois decimação por média de blocos de `decimate` amostras
+    (a média do bloco também serve de anti-aliasing). O estado entre blocos
+    (cauda da média móvel, resto da decimação) é guardado, então o resultado
+    não depende do tamanho dos blocos de leitura.
+    """
+
+    def __init__(self, window: int = 1, decimate: int = 1):
+        if window < 1 or decimate < 1:
+            raise ValueError("window e decimate devem ser >= 1.")
+        self.window = window
+        self.decimate = decimate
+        self._tail = np.empty(0)
+        self._rest: Dict[str, np.ndarray] = {}
+
+    def _smooth(self, pc: np.ndarray) -> np.ndarray:
+        if self.window == 1:
+            return pc
+        x = np.concatenate([self._tail, pc])
+        c = np.concatenate([[0.0], np.cumsum(x)])
+        k = np.arange(len(self._tail), len(x))
+        lo = np.maximum(k - self.window + 1, 0)
+        self._tail = x[-(self.window - 1):]
+        return (c[k + 1] - c[lo]) / (k + 1 - lo)
+
+    def _blocks(self, columns: Dict[str, np.ndarray], flush: bool) -> Optional[Dict[str, np.ndarray]]:
+        if self._rest:
+            columns = {k: np.concatenate([self._rest[k], v]) for k, v in columns.items()}
+        n = len(columns['pc'])
+        q = self.decimate
+        full = n // q * q
+        self._rest = {} if flush else {k: v[full:] for k, v in columns.items()}
+        out = {k: v[:full].reshape(-1, q).mean(axis=1) for k, v in columns.items()}
+        if flush and full < n:
+            out = {k: np.append(out[k], v[full:].mean()) for k, v in columns.items()}
+        return out if len(out['pc']) else None
+
+    def apply(self, chunk: Dict[str, np.ndarray]) -> Optional[Dict[str, np.ndarray]]:
+        columns = {'time': chunk['time'], 'pc': self._smooth(chunk['pc'])}
+        if self.decimate == 1:
+            return columns
+        return self._blocks(columns, flush=False)
+
+    def flush(self) -> Optional[Dict[str, np.ndarray]]:
+        """Bloco de decimação incompleto que sobrou no fim da série."""
+        if not self._rest:
+            return None
+        return self._blocks({k: v[:0] for k, v in self._rest.items()}, flush=True)
+
+    def stream(self, chunks: Iterable[Dict[str, np.ndarray]]) -> Iterator[Dict[str, np.ndarray]]:
+        for chunk in chunks:
+            out = self.apply(chunk)
+            if out is not None:
+                yield out
+        out = self.flush()
+        if out is not None:
+            yield out
+
+
+class StaticFireAnalysis:
+    """
+    Geometria fixa (NozzleResult de qualquer solver) com k, pc [MPa] e pe [atm]
+    de projeto e pressão ambiente do teste pa [Pa]. O escoamento na parede é
+    preparado uma vez; cada bloco de pc [Pa] medido é avaliado com broadcast.
+    """
+
+    def __init__(self, geometry: NozzleResult, k: float, pc: float, pe: float, pa: float = 101325.0,
+                 sampling: Optional[AdaptiveSampling] = SAMPLING_FLOW):
+        if pa < 0:
+            raise ValueError("A pressão ambiente deve ser >= 0.")
+        self.geometry = geometry
+        self.pa = pa
+        sim_input = SimulationInput(chamber_pressure=pc * 1e6, ambient_pressure=pa, gamma=k)
+        self.prepared = FlowSimulation(geometry, sim_input, sampling=sampling).prepare()
+        # ε fixo => pe/pc fixo: a parcela de momento do Cf não varia com pc(t)
+        _, self.cf_ideal, self.cf_est = BellNozzleSolver().calculate_performance(
+            k, pc, pe, geometry.angles['theta_e'], geometry.epsilon)
+        self.pe_ratio = pe / pc  # atm por MPa de câmara
+        self.throat_area_m2 = geometry.throat_area * 1e-6
+
+    def evaluate(self, time_s: np.ndarray, pc: np.ndarray) -> Dict[str, np.ndarray]:
+        """Colunas por amostra: pc [Pa], margem, descolamento, Cf e empuxo [N] ideal e estimado."""
+        pc = np.asarray(pc, dtype=float)
+        n = len(pc)
+        active = pc > self.pa
+        margin = np.full(n, np.nan)
+        has_sep = np.zeros(n, dtype=bool)
+        sep_x = np.full(n, np.nan)
+        cf_ideal = np.full(n, np.nan)
+        cf_est = np.full(n, np.nan)
+        thrust_ideal = np.zeros(n)
+        thrust_est = np.zeros(n)
+
+        if active.any():
+            pc_on = pc[active]
+            pc_mpa = pc_on * 1e-6
+            sweep = self.prepared.evaluate_pressures(pc_on, self.pa)
+            cf_pressure = BellNozzleSolver.pressure_thrust_coefficient(
+                pc_mpa, self.pe_ratio * pc_mpa, self.pa, self.geometry.epsilon)
+            margin[active] = sweep.safety_margin
+            has_sep[active] = sweep.has_separation
+            sep_x[active] = sweep.separation_x
+            cf_ideal[active] = self.cf_ideal + cf_pressure
+            cf_est[active] = self.cf_est + cf_pressure
+            thrust_ideal[active] = cf_ideal[active] * pc_on * self.throat_area_m2
+            thrust_est[active] = cf_est[active] * pc_on * self.throat_area_m2
+
+        return {
+            'time': np.asarray(time_s, dtype=float),
+            'pc': pc,
+            'safety_margin': margin,
+            'has_separation': has_sep,
+            'separation_x': sep_x,
+            'cf_ideal': cf_ideal,
+            'cf_est': cf_est,
+            'thrust_ideal': thrust_ideal,
+            'thrust_est': thrust_est,
+        }
+
+    def run(self, chunks: Iterable[Dict[str, np.ndarray]], writer=None,
+            downsampler: Optional[Downsampler] = None,
+            on_chunk: Optional[Callable[[int], None]] = None) -> StaticFireSummary:
+        """
+        chunks: blocos com 'time' [s] e 'pc' [Pa absoluta] (ver read_static_fire).
+        writer.write(colunas) recebe cada bloco avaliado; on_chunk(n) é chamado
+        após cada bloco (pode levantar exceção para interromper).
+        """
+        samples = active_samples = separated = 0
+        start_time = end_time = math.nan
+        burn_start = burn_end = None
+        peak_pc, peak_time = -math.inf, math.nan
+        min_margin, min_margin_time = math.inf, math.nan
+        impulse = np.zeros(2)
+        last = None  # (t, empuxo ideal, empuxo estimado) da última amostra do bloco anterior
+
+        for chunk in chunks:
+            t, pc = chunk['time'], chunk['pc']
+            if samples == 0:
+                start_time = float(t[0])
+            out = self.evaluate(t, pc)
+
+            i = int(np.argmax(pc))
+            if pc[i] > peak_pc:
+                peak_pc, peak_time = float(pc[i]), float(t[i])
+            on = np.flatnonzero(pc > self.pa)
+            if on.size:
+                if burn_start is None:
+                    burn_start = float(t[on[0]])
+                burn_end = float(t[on[-1]])
+                margin = out['safety_margin']
+                j = int(np.nanargmin(margin))
+                if margin[j] < min_margin:
+                    min_margin, min_margin_time = float(margin[j]), float(t[j])
+                active_samples += on.size
+
+            # Trapézios, incluindo o que liga o bloco anterior a este
+            tt = t if last is None else np.concatenate([[last[0]], t])
+            for c, name in enumerate(('thrust_ideal', 'thrust_est')):
+                f = out[name] if last is None else np.concatenate([[last[c + 1]], out[name]])
+                impulse[c] += float(np.sum((f[1:] + f[:-1]) * np.diff(tt))) / 2
+            last = (float(t[-1]), float(out['thrust_ideal'][-1]), float(out['thrust_est'][-1]))
+
+            samples += len(t)
+            separated += int(np.count_nonzero(out['has_separation']))
+            end_time = float(t[-1])
+
+            if writer is not None:
+                writer.write(out)
+            if downsampler is not None:
+                downsampler.add(out)
+            if on_chunk is not None:
+                on_chunk(len(t))
+
+        if samples == 0:
+            raise ValueError("Log de teste estático sem amostras.")
+        return StaticFireSummary(
+            samples=samples, active_samples=active_samples, start_time=start_time, end_time=end_time,
+            burn_start=burn_start, burn_end=burn_end, peak_pc=peak_pc, peak_time=peak_time,
+            impulse_ideal=float(impulse[0]), impulse_est=float(impulse[1]),
+            separated_samples=separated, min_margin=min_margin, min_margin_time=min_margin_time,
+            geometric_warnings=list(self.prepared.geometric_warnings),
+        )
+
+
+def read_static_fire(path: str, pc_unit: str = 'Pa', gauge_pa: float = 0.0, rate: Optional[float] = None,
+                     raw: Optional[RawFormat] = None,
+                     chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    Blocos {'time' [s], 'pc' [Pa absoluta]} de um log de teste estático.
+    CSV: colunas pc e time; sem a coluna time, o tempo sai de rate [Hz].
+    raw: binário cru (o tempo sai de raw.rate). pc_unit: Pa, atm, psi, MPa...;
+    gauge_pa é somada a cada amostra (transdutor manométrico -> absoluta).
+    """
+    if pc_unit not in UnitManager.CONVERTERS['pressure_to_mpa']:
+        raise ValueError(f"Unidade de pressão desconhecida: {pc_unit}.")
+    if rate is not None and rate <= 0:
+        raise ValueError("A taxa de amostragem deve ser > 0.")
+    factor = UnitManager.convert(1.0, pc_unit, 'pressure_to_mpa') * 1e6
+
+    if raw is not None:
+        if raw.rate <= 0:
+            raise ValueError("A taxa de amostragem deve ser > 0.")
+        source = ({'pc': values} for values in iter_binary_channel(
+            path, raw.dtype, raw.channels, raw.channel, raw.header_bytes, raw.scale, raw.offset, chunk_rows))
+        rate = raw.rate
+    else:
+        source = iter_csv_columns(path, STATIC_FIRE_COLUMNS, required=('pc',), chunk_rows=chunk_rows)
+
+    seen = 0
+    for chunk in source:
+        n = len(chunk['pc'])
+        if 'time' not in chunk:
+            if rate is None:
+                raise ValueError("Log sem coluna time: informe a taxa de amostragem.")
+            chunk['time'] = np.arange(seen, seen + n) / rate
+        chunk['pc'] = chunk['pc'] * factor + gauge_pa
+        seen += n
+        yield chunk
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.simulation.static_fire",
+                                     description="Cf, empuxo e descolamento ao longo de um teste estático.")
+    parser.add_argument("log", help="CSV com colunas pc e (opcional) time, ou binário cru com --raw")
+    parser.add_argument("-o", "--output", help="Resultado por amostra (.csv ou .npz)")
+    parser.add_argument("--project", help="Projeto .nzl/.json/.csv com o bocal (o primeiro projeto)")
+    parser.add_argument("--set", action='append', default=[], metavar="CHAVE=VALOR",
+                        help="Entrada do projeto (completa o --project)")
+    parser.add_argument("--solver", choices=sorted(SOLVER_NAMES), default='rao')
+    parser.add_argument("--pa", type=float, default=101325.0, help="Pressão ambiente do teste [Pa]")
+    parser.add_argument("--pc-unit", default='Pa', help="Unidade do sinal de pc (Pa, atm, psi, MPa)")
+    parser.add_argument("--gauge", action='store_true', help="Sinal manométrico: soma --pa a cada amostra")
+    parser.add_argument("--rate", type=float, help="Taxa de amostragem [Hz] (binário ou CSV sem time)")
+    parser.add_argument("--raw", metavar="DTYPE", help="Binário cru com amostras DTYPE (ex.: '<f4', '<i2')")
+    parser.add_argument("--channels", type=int, default=1, help="Canais intercalados no binário")
+    parser.add_argument("--channel", type=int, default=0, help="Canal de pc no binário (a partir de 0)")
+    parser.add_argument("--header-bytes", type=int, default=0, help="Bytes de cabeçalho do binário")
+    parser.add_argument("--scale", type=float, default=1.0, help="Escala do valor bruto do binário")
+    parser.add_argument("--offset", type=float, default=0.0, help="Offset do valor bruto do binário")
+    parser.add_argument("--window", type=int, default=1, help="Média móvel causal de N amostras")
+    parser.add_argument("--decimate", type=int, default=1, help="Média de blocos de N amostras")
+    parser.add_argument("--chunk", type=int, default=DEFAULT_CHUNK_ROWS, help="Amostras lidas por bloco")
+    args = parser.parse_args(argv)
+
+    try:
+        overrides = parse_defaults(args.set)
+        if args.project:
+            design = read_designs([args.project], overrides)[0]
+        else:
+            design = overrides
+            missing = [k for k in DESIGN_KEYS if k not in design]
+            if missing:
+                raise ValueError(f"faltam {', '.join(missing)} (use --project ou --set).")
+        solver = solver_for(design.get('solver', args.solver), 60)
+        geometry = solver.compute(**{k: design[k] for k in DESIGN_KEYS})
+        analysis = StaticFireAnalysis(geometry, design['k'], design['pc'], design['pe'], pa=args.pa)
+        conditioner = TraceConditioner(args.window, args.decimate)
+        if args.raw and args.rate is None:
+            raise ValueError("--raw exige --rate.")
+        raw = RawFormat(args.rate, args.raw, args.channels, args.channel, args.header_bytes,
+                        args.scale, args.offset) if args.raw else None
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Erro no projeto: {e}", file=sys.stderr)
+        return 2
+
+    writer = open_writer(args.output) if args.output else None
+    started = time.perf_counter()
+    try:
+        chunks = read_static_fire(args.log, args.pc_unit, args.pa if args.gauge else 0.0,
+                                  args.rate, raw, args.chunk)
+        summary = analysis.run(conditioner.stream(chunks), writer=writer)
+    except (OSError, ValueError) as e:
+        print(f"Erro no log: {e}", file=sys.stderr)
+        return 2
+    finally:
+        if writer is not None:
+            writer.close()
+    elapsed = time.perf_counter() - started
+    print(summary.report())
+    print(f"{summary.samples} amostras em {elapsed:.2f} s ({summary.samples / max(elapsed, 1e-9):.0f} amostras/s)",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+# src/simulation/streaming.py
+"""
+Séries temporais longas (milhões de linhas) lidas em blocos, com memória limitada.
+
+iter_csv_columns lê só as colunas pedidas de um CSV, um bloco de linhas por
+vez; iter_binary_channel faz o mesmo com um canal de um arquivo binário cru
+(amostras intercaladas de um sistema de aquisição); Downsampler guarda uma versão reduzida da série para plotagem, com
+tamanho máximo fixo, sem saber de antemão quantas amostras virão.
+"""
+import os
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+DEFAULT_CHUNK_ROWS = 1 << 18
+_DELIMITERS = (',', ';', '\t')
+
+
+def _normalize_name(name: str) -> str:
+    """'Time [s]' -> 'time'; 'pa (Pa)' -> 'pa'."""
+    name = name.strip().strip('"').lower()
+    for mark in ('[', '('):
+        name = name.split(mark)[0]
+    return name.strip()
+
+
+def _find_columns(header: List[str], columns: Dict[str, Sequence[str]],
+                  required: Sequence[str]) -> Dict[str, int]:
+    names = [_normalize_name(h) for h in header]
+    found = {}
+    for key, aliases in columns.items():
+        for alias in aliases:
+            if alias in names:
+                found[key] = names.index(alias)
+                break
+    missing = [k for k in required if k not in found]
+    if missing:
+        raise ValueError(f"Colunas não encontradas: {', '.join(missing)} "
+                         f"(aceitas: {'; '.join('/'.join(columns[k]) for k in missing)}).")
+    return found
+
+
+def iter_csv_columns(path: str, columns: Dict[str, Sequence[str]], required: Sequence[str] = (),
+                     chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    Percorre o CSV em blocos de até chunk_rows linhas. columns mapeia cada
+    chave de saída para os nomes de cabeçalho aceitos (sem unidade, minúsculos);
+    colunas opcionais ausentes simplesmente não aparecem nos blocos. O separador
+    (',', ';' ou tab) vem do cabeçalho; linhas começadas por '#' são ignoradas.
+    """
+    if chunk_rows < 1:
+        raise ValueError("chunk_rows deve ser >= 1.")
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        header = ''
+        while not header.strip() or header.lstrip().startswith('#'):
+            header = f.readline()
+            if not header:
+                raise ValueError(f"{os.path.basename(path)}: arquivo vazio.")
+        delimiter = max(_DELIMITERS, key=header.count)
+        found = _find_columns(header.rstrip('\r\n').split(delimiter), columns, required)
+        keys = list(found)
+        usecols = [found[k] for k in keys]
+
+        while True:
+            lines = list(islice(f, chunk_rows))
+            if not lines:
+                break
+            data = np.loadtxt(lines, delimiter=delimiter, usecols=usecols, comments='#', ndmin=2, dtype=float)
+            if len(data):
+                yield {k: data[:, j] for j, k in enumerate(keys)}
+
+
+def iter_binary_channel(path: str, dtype: str = '<f4', channels: int = 1, channel: int = 0,
+                        header_bytes: int = 0, scale: float = 1.0, offset: float = 0.0,
+                        chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[np.ndarray]:
+    """
+    Percorre um binário cru com `channels` canais intercalados do tipo dtype
+    (ex.: '<f4', '<i2', '>u2'), depois de header_bytes de cabeçalho, e devolve
+    o canal pedido em blocos de até chunk_rows amostras já convertido para
+    float: valor = bruto·scale + offset. Um quadro incompleto no fim é ignorado.
+    """
+    if chunk_rows < 1:
+        raise ValueError("chunk_rows deve ser >= 1.")
+    if channels < 1 or not 0 <= channel < channels:
+        raise ValueError(f"Canal {channel} fora de 0..{channels - 1}.")
+    if header_bytes < 0:
+        raise ValueError("header_bytes deve ser >= 0.")
+    try:
+        item = np.dtype(dtype)
+    except TypeError:
+        raise ValueError(f"Tipo binário desconhecido: {dtype}.")
+    frame = item.itemsize * channels
+    with open(path, 'rb') as f:
+        f.seek(header_bytes)
+        while True:
+            raw = f.read(frame * chunk_rows)
+            rows = len(raw) // frame
+            if rows == 0:
+                break
+            data = np.frombuffer(raw, dtype=item, count=rows * channels).reshape(rows, channels)
+            values = data[:, channel].astype(float)
+            if scale != 1.0:
+                values *= scale
+            if offset != 0.0:
+                values += offset
+            yield values
+
+
+class Downsampler:
+    """
+    Versão reduzida de uma série para plotagem: guarda uma amostra a cada
+    `stride` e dobra o stride (descartando metade) quando passa de max_points.
+    Memória limitada a ~max_points por coluna, qualquer que seja o tamanho da série.
+    """
+
+    def __init__(self, max_points: int = 20000):
+        if max_points < 2:
+            raise ValueError("max_points deve ser >= 2.")
+        self.max_points = max_points
+        self.stride = 1
+        self.seen = 0
+        self._index = np.empty(0, dtype=np.int64)
+        self._columns: Dict[str, np.ndarray] = {}
+
+    def add(self, columns: Dict[str, np.ndarray]) -> None:
+        n = len(next(iter(columns.values())))
+        index = np.arange(self.seen, self.seen + n, dtype=np.int64)
+        keep = index % self.stride == 0
+        self._index = np.concatenate([self._index, index[keep]])
+        for name, values in columns.items():
+            kept = np.asarray(values)[keep]
+            self._columns[name] = np.concatenate([self._columns[name], kept]) if name in self._columns else kept
+        self.seen += n
+        while len(self._index) > self.max_points:
+            self.stride *= 2
+            keep = self._index % self.stride == 0
+            self._index = self._index[keep]
+            self._columns = {k: v[keep] for k, v in self._columns.items()}
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return dict(self._columns)
+
+    def column(self, name: str) -> Optional[np.ndarray]:
+        return self._columns.get(name)
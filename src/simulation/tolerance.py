@@ -0,0 +1,322 @@
+# src/simulation/tolerance.py
+"""
+Monte Carlo de tolerâncias de fabricação: raio de garganta (tr), fator de
+arredondamento (rounding_factor) e raio de saída (re) do bocal usinado,
+cada um com perturbação normal ou uniforme em torno do nominal.
+
+Cada amostra vira um projeto do solver: o raio de saída usinado fixa
+ε = (re/tr)², e pe é a pressão de saída isentrópica desse ε (mesmos pc e k).
+Os lotes rodam no pool de explore() (solver vetorizado + evaluate_contours com
+a tabela Mach x A/A* do FlowSimulation), e o resumo traz percentis e
+histogramas de ε, raio de saída, comprimento, λ, Cf e margem de segurança,
+além da probabilidade de falhar o critério de Schmucker (intervalo de Wilson).
+
+As perturbações saem de geradores por bloco de BLOCK_SIZE amostras, semeados
+com (seed, bloco): o resultado não depende do tamanho dos lotes nem do número
+de processos.
+
+Uso (a partir da raiz do projeto):
+    python -m src.simulation.tolerance --project motor.nzl -n 100000 --seed 1 \\
+        --tol tr=normal:0.01 --tol rounding_factor=uniform:0.05 --tol re=normal:0.02 -o amostras.npz
+"""
+import argparse
+import math
+import os
+import sys
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.cli import Progress, open_writer, read_designs
+from src.core import gasdynamics
+from src.core.designs import ALIASES, CF_SOLVERS, DEFAULT_PA, SOLVER_NAMES, parse_defaults
+from src.core.models import SweepResult
+from src.core.solvers.bell_nozzle import BellNozzleSolver
+from src.simulation.explorer import PARAM_KEYS, evaluate_points, explore
+
+TOLERANCE_KEYS = ('tr', 'rounding_factor', 're')
+TOLERANCE_ALIASES = dict(ALIASES, exit_radius='re', exhaust_radius='re')
+DISTRIBUTIONS = ('normal', 'uniform')
+
+# Grandezas resumidas: coluna do SweepResult (ou de checks) -> rótulo
+METRICS = {
+    'epsilon': 'Epsilon',
+    'exhaust_radius': 'Raio de saída',
+    'length': 'Comprimento',
+    'lambda_eff': 'Lambda',
+    'cf_est': 'Cf estimado',
+    'safety_margin': 'Margem de segurança',
+}
+PERCENTILES = (1, 5, 25, 50, 75, 95, 99)
+HISTOGRAM_BINS = 50
+BLOCK_SIZE = 4096
+_WILSON_Z = 1.96
+
+
+@dataclass(frozen=True)
+class Tolerance:
+    """Perturbação aditiva de uma entrada: normal (scale = desvio padrão) ou uniform (±scale)."""
+    distribution: str
+    scale: float
+
+    def __post_init__(self):
+        if self.distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Distribuição desconhecida: {self.distribution} (use {', '.join(DISTRIBUTIONS)}).")
+        if not self.scale >= 0:
+            raise ValueError("A escala da tolerância deve ser >= 0.")
+
+    def sample(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        if self.distribution == 'normal':
+            return rng.normal(0.0, self.scale, n)
+        return rng.uniform(-self.scale, self.scale, n)
+
+
+def exit_pressure(pc: np.ndarray, k: np.ndarray, eps: np.ndarray) -> np.ndarray:
+    """pe [atm] isentrópica para a razão de áreas eps (inversa de calculate_epsilon); eps <= 1 vira NaN."""
+    eps = np.asarray(eps, dtype=float)
+    with np.errstate(invalid='ignore'):
+        ok = eps > 1.0
+        mach = gasdynamics.mach_from_area_ratio(np.where(ok, eps, 2.0), k)
+        p_ratio, _, _ = gasdynamics.isentropic_ratios(mach, k)
+    return np.where(ok, pc * p_ratio * 9.86923, np.nan)
+
+
+class ToleranceSpace:
+    """
+    Amostras de Monte Carlo em torno de um projeto nominal (DESIGN_KEYS e pa
+    opcional, unidades do solver: mm, MPa, atm). tolerances mapeia chaves de
+    TOLERANCE_KEYS para Tolerance; re é o raio de saída [mm], cujo nominal vem
+    de tr·√ε do projeto (o raio de saída dos solvers Rao e MOC, conferido por
+    run_tolerance contra o nominal resolvido). Sem seed, uma é sorteada e guardada em meta().
+    Mesma interface que explore() usa de DesignSpace (len, points, meta).
+    """
+
+    def __init__(self, nominal: Dict[str, float], tolerances: Dict[str, Tolerance],
+                 samples: int, seed: Optional[int] = None):
+        design = {'pa': DEFAULT_PA}
+        design.update({ALIASES.get(k, k): float(v) for k, v in nominal.items()})
+        missing = [k for k in PARAM_KEYS if k not in design]
+        if missing:
+            raise ValueError(f"Faltam entradas: {', '.join(missing)}.")
+        tols = {}
+        for key, tol in tolerances.items():
+            key = TOLERANCE_ALIASES.get(key, key)
+            if key not in TOLERANCE_KEYS:
+                raise ValueError(f"Tolerância desconhecida: {key} (use {', '.join(TOLERANCE_KEYS)}).")
+            tols[key] = tol
+        if samples < 1:
+            raise ValueError("samples deve ser >= 1.")
+
+        self.nominal = {k: design[k] for k in PARAM_KEYS}
+        self.exit_radius = self.nominal['tr'] * math.sqrt(BellNozzleSolver.calculate_epsilon(
+            self.nominal['pc'], self.nominal['pe'], self.nominal['k']))
+        # Ordem fixa (TOLERANCE_KEYS) para os sorteios não dependerem da ordem do dict
+        self.tolerances = {k: tols[k] for k in TOLERANCE_KEYS if k in tols}
+        self.varying = list(self.tolerances)
+        self.size = int(samples)
+        self.seed = int(np.random.SeedSequence().entropy % (1 << 32)) if seed is None else int(seed)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def deviations(self, start: int, stop: int) -> Dict[str, np.ndarray]:
+        """Perturbações das amostras [start, stop), uma coluna por chave de TOLERANCE_KEYS."""
+        if not 0 <= start <= stop <= self.size:
+            raise ValueError(f"Intervalo [{start}, {stop}) fora do espaço (0 a {self.size}).")
+        out = {k: np.zeros(stop - start) for k in TOLERANCE_KEYS}
+        if stop == start:
+            return out
+        for block in range(start // BLOCK_SIZE, (stop - 1) // BLOCK_SIZE + 1):
+            rng = np.random.default_rng([self.seed, block])
+            first = block * BLOCK_SIZE
+            lo, hi = max(start, first) - first, min(stop, first + BLOCK_SIZE) - first
+            for key, tol in self.tolerances.items():
+                out[key][first + lo - start:first + hi - start] = tol.sample(rng, BLOCK_SIZE)[lo:hi]
+        return out
+
+    def points(self, start: int, stop: int) -> Dict[str, np.ndarray]:
+        """Entradas do solver das amostras [start, stop) (pe ajustada ao ε usinado)."""
+        dev = self.deviations(start, stop)
+        n = stop - start
+        out = {k: np.full(n, v) for k, v in self.nominal.items()}
+        out['tr'] = out['tr'] + dev['tr']
+        out['rounding_factor'] = out['rounding_factor'] + dev['rounding_factor']
+        with np.errstate(invalid='ignore', divide='ignore'):
+            eps = ((self.exit_radius + dev['re']) / out['tr']) ** 2
+        out['pe'] = exit_pressure(out['pc'], out['k'], np.where(out['tr'] > 0, eps, np.nan))
+        return out
+
+    def meta(self) -> Dict[str, Any]:
+        """Descrição serializável (JSON) das amostras, para o SweepStore."""
+        return {'sampling': 'tolerance', 'size': self.size, 'seed': self.seed, 'nominal': self.nominal,
+                'tolerances': {k: [t.distribution, t.scale] for k, t in self.tolerances.items()}}
+
+
+@dataclass
+class MetricStats:
+    nominal: float
+    mean: float
+    std: float
+    percentiles: Dict[int, float]
+    counts: np.ndarray
+    edges: np.ndarray
+
+
+@dataclass
+class ToleranceReport:
+    samples: int
+    seed: int
+    # Amostras válidas e convergidas (base das estatísticas)
+    evaluated: int
+    separated: int
+    p_fail: float
+    p_fail_low: float
+    p_fail_high: float
+    nominal_separated: bool
+    metrics: Dict[str, MetricStats] = field(default_factory=dict)
+    tolerances: Dict[str, Tolerance] = field(default_factory=dict)
+
+    def report(self) -> str:
+        tol_text = ", ".join(f"{k} {t.distribution} {t.scale:g}" for k, t in self.tolerances.items()) or "nenhuma"
+        lines = [f"Amostras: {self.samples} (seed {self.seed}) | tolerâncias: {tol_text}",
+                 f"Avaliadas: {self.evaluated} | inválidas: {self.samples - self.evaluated}",
+                 f"P(falha Schmucker): {self.p_fail * 100:.3f}% "
+                 f"(95%: {self.p_fail_low * 100:.3f}% a {self.p_fail_high * 100:.3f}%) | "
+                 f"nominal {'descola' if self.nominal_separated else 'colado'}"]
+        head = "".join(f" {f'P{p}':>10}" for p in PERCENTILES)
+        lines.append(f"{'':<20} {'nominal':>10} {'média':>10} {'desvio':>10}{head}")
+        for key, st in self.metrics.items():
+            values = [st.nominal, st.mean, st.std] + [st.percentiles[p] for p in PERCENTILES]
+            lines.append(f"{METRICS[key]:<20}" + "".join(f" {v:>10.5g}" for v in values))
+        return "\n".join(lines)
+
+
+def wilson_interval(hits: int, n: int, z: float = _WILSON_Z) -> Tuple[float, float]:
+    """Intervalo de Wilson para uma proporção (não colapsa em 0 quando não há falhas)."""
+    if n == 0:
+        return 0.0, 1.0
+    p = hits / n
+    den = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / den
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / den
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+def metric_keys(solver: str = 'rao') -> Tuple[str, ...]:
+    """Grandezas de METRICS que o solver calcula (o MOC não estima Cf)."""
+    return tuple(k for k in METRICS if k != 'cf_est' or solver in CF_SOLVERS)
+
+
+def summarize(space: ToleranceSpace, sweep: SweepResult, nominal: SweepResult, solver: str = 'rao',
+              bins: int = HISTOGRAM_BINS) -> ToleranceReport:
+    """Percentis, histogramas e P(falha) das amostras válidas e convergidas."""
+    ok = sweep.valid & sweep.is_converged()
+    n = int(ok.sum())
+    separated = int(np.count_nonzero(sweep.checks['has_separation'][ok]))
+    low, high = wilson_interval(separated, n)
+    metrics = {}
+    for key in metric_keys(solver):
+        values = np.asarray(sweep.column(key)[ok], dtype=float)
+        values = values[np.isfinite(values)]
+        if values.size == 0:
+            continue
+        # Grandeza que só varia por arredondamento (ex.: raio de saída com só tr perturbado):
+        # np.histogram falharia com "Too many bins", então um intervalo unitário em torno do valor
+        center = float(values.mean())
+        degenerate = np.ptp(values) <= 1e-9 * max(1.0, float(np.abs(values).max()))
+        hist_range = (center - 0.5, center + 0.5) if degenerate else None
+        counts, edges = np.histogram(values, bins=bins, range=hist_range)
+        metrics[key] = MetricStats(
+            nominal=float(nominal.column(key)[0]), mean=float(values.mean()), std=float(values.std()),
+            percentiles=dict(zip(PERCENTILES, np.percentile(values, PERCENTILES).tolist())),
+            counts=counts, edges=edges)
+    return ToleranceReport(samples=len(sweep), seed=space.seed, evaluated=n, separated=separated,
+                           p_fail=separated / n if n else math.nan, p_fail_low=low, p_fail_high=high,
+                           nominal_separated=bool(nominal.checks['has_separation'][0]),
+                           metrics=metrics, tolerances=dict(space.tolerances))
+
+
+def run_tolerance(space: ToleranceSpace, solver: str = 'rao', workers: Optional[int] = None,
+                  moc_n: int = 60, progress: Optional[Callable[[int], None]] = None,
+                  store_dir: Optional[str] = None) -> Tuple[ToleranceReport, SweepResult]:
+    """Avalia as amostras no pool de explore() e devolve o resumo e o SweepResult por amostra."""
+    options = {'solver': solver, 'moc_n': moc_n, 'flow': True, 'dtype': np.dtype(np.float64), 'mach_table': True}
+    nominal, _ = evaluate_points({k: np.array([v]) for k, v in space.nominal.items()}, options)
+    if not (nominal.valid[0] and nominal.is_converged()[0]):
+        raise ValueError("O projeto nominal não tem solução válida.")
+    # As amostras de re partem de tr·√ε: o solver tem de produzir o mesmo raio de saída
+    solved = float(nominal.exhaust_radius[0])
+    if abs(solved / space.exit_radius - 1) > 1e-6:
+        raise ValueError(f"Raio de saída do solver {solver} ({solved:.4f} mm) difere do nominal "
+                         f"tr·√ε ({space.exit_radius:.4f} mm).")
+    sweep = explore(space, solver=solver, workers=workers, store_dir=store_dir, moc_n=moc_n,
+                    progress=progress, mach_table=True)
+    return summarize(space, sweep, nominal, solver), sweep
+
+
+def sample_columns(sweep: SweepResult, solver: str = 'rao') -> Dict[str, np.ndarray]:
+    """Colunas por amostra para open_writer: entradas perturbadas e grandezas resumidas."""
+    columns = {k: sweep.inputs[k] for k in ('tr', 'rounding_factor', 'pe')}
+    columns.update({k: sweep.column(k) for k in metric_keys(solver)})
+    columns['has_separation'] = sweep.checks['has_separation']
+    columns['valid'] = sweep.valid & sweep.is_converged()
+    return columns
+
+
+def parse_tolerance(text: str) -> Tuple[str, Tolerance]:
+    """'tr=normal:0.01' -> ('tr', Tolerance('normal', 0.01))."""
+    key, sep, spec = text.partition('=')
+    dist, sep2, scale = spec.partition(':')
+    if not sep or not sep2:
+        raise ValueError(f"--tol espera chave=distribuição:escala, recebeu '{text}'.")
+    return key.strip(), Tolerance(dist.strip(), float(scale))
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.simulation.tolerance",
+                                     description="Monte Carlo de tolerâncias de fabricação do bocal.")
+    parser.add_argument("--project", help="Projeto .nzl/.json/.csv com o bocal nominal (o primeiro projeto)")
+    parser.add_argument("--set", action='append', default=[], metavar="CHAVE=VALOR",
+                        help="Entrada do projeto (completa o --project; pa=... muda o ambiente)")
+    parser.add_argument("--tol", action='append', default=[], metavar="CHAVE=DIST:ESCALA",
+                        help="Tolerância (tr, rounding_factor, re): normal:desvio ou uniform:meia-largura")
+    parser.add_argument("-n", "--samples", type=int, default=100000, help="Número de amostras")
+    parser.add_argument("--seed", type=int, help="Semente (sem ela, uma é sorteada e mostrada)")
+    parser.add_argument("--solver", choices=sorted(SOLVER_NAMES), default='rao')
+    parser.add_argument("--moc-n", type=int, default=60, help="Número de características do MOC")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processos do pool")
+    parser.add_argument("-o", "--output", help="Resultado por amostra (.csv ou .npz)")
+    args = parser.parse_args(argv)
+
+    try:
+        overrides = parse_defaults(args.set)
+        design = read_designs([args.project], overrides)[0] if args.project else overrides
+        tolerances = dict(parse_tolerance(t) for t in args.tol)
+        space = ToleranceSpace({k: design[k] for k in PARAM_KEYS if k in design}, tolerances,
+                               args.samples, args.seed)
+        solver = design.get('solver', args.solver)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Erro no projeto: {e}", file=sys.stderr)
+        return 2
+
+    print(f"{len(space)} amostras (seed {space.seed}) | {args.workers} processo(s)", file=sys.stderr)
+    progress = Progress(len(space))
+    try:
+        summary, sweep = run_tolerance(space, solver, args.workers, args.moc_n, progress.update)
+    except ValueError as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 2
+    if args.output:
+        writer = open_writer(args.output)
+        try:
+            writer.write(sample_columns(sweep, solver))
+        finally:
+            writer.close()
+    print(summary.report())
+    print(f"Concluído em {progress.elapsed:.2f} s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
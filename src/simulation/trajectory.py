@@ -0,0 +1,246 @@
+# src/simulation/trajectory.py
+"""
+Análise de um perfil de voo inteiro: série de pressão ambiente (tempo,
+altitude opcional, pa), possivelmente com milhões de linhas vindas de uma
+simulação 6-DOF, avaliada em blocos com memória limitada.
+
+Para cada amostra: critério de Schmucker (PreparedFlow.evaluate_many, o mesmo
+da análise pontual) e Cf com a parcela de pressão (pe - pa)/pc · ε somada ao
+Cf de calculate_performance. O resumo traz o instante a partir do qual a
+subida fica sem descolamento até o apogeu.
+
+Uso (a partir da raiz do projeto):
+    python -m src.simulation.trajectory voo.csv -o saida.npz --project motor.nzl
+    python -m src.simulation.trajectory voo.csv -o saida.csv --set tr=13.5 --set k=1.2 ... --pa-unit atm
+"""
+import argparse
+import math
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from src.cli import open_writer, read_designs
+from src.core.designs import DESIGN_KEYS, SOLVER_NAMES, parse_defaults, solver_for
+from src.core.geometry import AdaptiveSampling, SAMPLING_FLOW
+from src.core.models import NozzleResult
+from src.core.solvers.bell_nozzle import BellNozzleSolver
+from src.core.units import UnitManager
+from src.simulation.separation import FlowSimulation, SimulationInput
+from src.simulation.streaming import DEFAULT_CHUNK_ROWS, Downsampler, iter_csv_columns
+
+# Cabeçalhos aceitos (sem unidade, minúsculos)
+TRAJECTORY_COLUMNS = {
+    'time': ('time', 't', 'time_s'),
+    'altitude': ('altitude', 'alt', 'h', 'altitude_m'),
+    'pa': ('pa', 'ambient_pressure', 'pressure', 'p', 'p_amb'),
+}
+
+
+@dataclass
+class TrajectorySummary:
+    samples: int
+    start_time: float
+    end_time: float
+    apogee_time: float
+    apogee_altitude: Optional[float]
+    # Início do trecho final da subida (até o apogeu) sem descolamento; None = não fica seguro
+    safe_time: Optional[float]
+    separated_samples: int
+    min_margin: float
+    min_margin_time: float
+    geometric_warnings: List[str] = field(default_factory=list)
+
+    def report(self) -> str:
+        lines = [f"Amostras: {self.samples} ({self.start_time:.3f} s a {self.end_time:.3f} s)"]
+        if self.apogee_altitude is not None:
+            lines.append(f"Apogeu: {self.apogee_altitude:.1f} em t = {self.apogee_time:.3f} s")
+        if self.safe_time is None:
+            lines.append("Descolamento até o apogeu: a subida não fica segura.")
+        elif self.safe_time <= self.start_time:
+            lines.append("Sem descolamento em toda a subida.")
+        else:
+            lines.append(f"Escoamento colado a partir de t = {self.safe_time:.3f} s")
+        lines.append(f"Amostras com descolamento: {self.separated_samples}")
+        lines.append(f"Menor margem: {self.min_margin * 100:.1f}% em t = {self.min_margin_time:.3f} s")
+        lines.extend(f"Aviso geométrico: {w}" for w in self.geometric_warnings)
+        return "\n".join(lines)
+
+
+class _SafeTimeTracker:
+    """
+    Acompanha, bloco a bloco, o início do trecho seguro corrente e o valor dele
+    no maior apogeu visto até agora (estado O(1), sem guardar a série).
+    """
+    _NEXT = object()  # o trecho seguro começa na primeira amostra do próximo bloco
+
+    def __init__(self):
+        self.safe_start = self._NEXT
+        self.apogee_altitude = -math.inf
+        self.apogee_time = math.nan
+        self.safe_at_apogee: Optional[float] = None
+
+    def _start_after(self, t: np.ndarray, unsafe: np.ndarray, stop: int, current):
+        """Início do trecho seguro considerando as amostras [0, stop) do bloco."""
+        idx = np.flatnonzero(unsafe[:stop])
+        if idx.size == 0:
+            return t[0] if current is self._NEXT else current
+        last = idx[-1] + 1
+        return t[last] if last < stop else self._NEXT
+
+    def update(self, t: np.ndarray, altitude: np.ndarray, unsafe: np.ndarray) -> None:
+        peak = int(np.argmax(altitude))
+        if altitude[peak] > self.apogee_altitude:
+            self.apogee_altitude = float(altitude[peak])
+            self.apogee_time = float(t[peak])
+            start = self._start_after(t, unsafe, peak + 1, self.safe_start)
+            self.safe_at_apogee = None if start is self._NEXT else float(start)
+        self.safe_start = self._start_after(t, unsafe, len(t), self.safe_start)
+
+
+class TrajectoryAnalysis:
+    """
+    Geometria fixa (NozzleResult de qualquer solver) com k, pc [MPa] e pe [atm]
+    do projeto. O escoamento na parede é preparado uma vez; cada bloco de
+    pressões ambiente [Pa] é avaliado com broadcast.
+    """
+
+    def __init__(self, geometry: NozzleResult, k: float, pc: float, pe: float,
+                 sampling: Optional[AdaptiveSampling] = SAMPLING_FLOW):
+        self.geometry = geometry
+        self.pc = pc
+        self.pe = pe
+        sim_input = SimulationInput(chamber_pressure=pc * 1e6, ambient_pressure=101325.0, gamma=k)
+        self.prepared = FlowSimulation(geometry, sim_input, sampling=sampling).prepare()
+        _, self.cf_ideal, self.cf_est = BellNozzleSolver().calculate_performance(
+            k, pc, pe, geometry.angles['theta_e'], geometry.epsilon)
+
+    def evaluate(self, time_s: np.ndarray, pa: np.ndarray) -> Dict[str, np.ndarray]:
+        """Colunas por amostra: margem, descolamento, ponto de descolamento e Cf com a parcela de pressão."""
+        sweep = self.prepared.evaluate_many(pa)
+        cf_pressure = BellNozzleSolver.pressure_thrust_coefficient(self.pc, self.pe, pa, self.geometry.epsilon)
+        return {
+            'time': np.asarray(time_s, dtype=float),
+            'pa': sweep.ambient_pressure,
+            'safety_margin': sweep.safety_margin,
+            'has_separation': sweep.has_separation,
+            'separation_x': sweep.separation_x,
+            'cf_ideal': self.cf_ideal + cf_pressure,
+            'cf_est': self.cf_est + cf_pressure,
+        }
+
+    def run(self, chunks: Iterable[Dict[str, np.ndarray]], writer=None,
+            downsampler: Optional[Downsampler] = None,
+            on_chunk: Optional[Callable[[int], None]] = None) -> TrajectorySummary:
+        """
+        chunks: blocos com 'time', 'pa' [Pa] e opcionalmente 'altitude' (ver
+        iter_csv_columns). Sem altitude, a série inteira é tratada como subida.
+        writer.write(colunas) recebe cada bloco avaliado; on_chunk(n) é chamado
+        após cada bloco (pode levantar exceção para interromper).
+        """
+        tracker = _SafeTimeTracker()
+        has_altitude = None
+        samples = separated = 0
+        start_time = end_time = math.nan
+        min_margin, min_margin_time = math.inf, math.nan
+
+        for chunk in chunks:
+            t, pa = chunk['time'], chunk['pa']
+            if has_altitude is None:
+                has_altitude = 'altitude' in chunk
+                start_time = float(t[0])
+            out = self.evaluate(t, pa)
+            if has_altitude:
+                out['altitude'] = chunk['altitude']
+            # Sem altitude: o "apogeu" é a última amostra (índice crescente faz o papel da altitude)
+            altitude = chunk['altitude'] if has_altitude else np.arange(samples, samples + len(t), dtype=float)
+            tracker.update(t, altitude, out['has_separation'])
+
+            i = int(np.argmin(out['safety_margin']))
+            if out['safety_margin'][i] < min_margin:
+                min_margin, min_margin_time = float(out['safety_margin'][i]), float(t[i])
+            samples += len(t)
+            separated += int(np.count_nonzero(out['has_separation']))
+            end_time = float(t[-1])
+
+            if writer is not None:
+                writer.write(out)
+            if downsampler is not None:
+                downsampler.add(out)
+            if on_chunk is not None:
+                on_chunk(len(t))
+
+        if samples == 0:
+            raise ValueError("Trajetória sem amostras.")
+        return TrajectorySummary(
+            samples=samples, start_time=start_time, end_time=end_time,
+            apogee_time=tracker.apogee_time if has_altitude else end_time,
+            apogee_altitude=tracker.apogee_altitude if has_altitude else None,
+            safe_time=tracker.safe_at_apogee, separated_samples=separated,
+            min_margin=min_margin, min_margin_time=min_margin_time,
+            geometric_warnings=list(self.prepared.geometric_warnings),
+        )
+
+
+def read_trajectory(path: str, pa_unit: str = 'Pa',
+                    chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterable[Dict[str, np.ndarray]]:
+    """Blocos do CSV de trajetória com pa convertida para Pa (pa_unit: Pa, atm, psi, MPa...)."""
+    if pa_unit not in UnitManager.CONVERTERS['pressure_to_mpa']:
+        raise ValueError(f"Unidade de pressão desconhecida: {pa_unit}.")
+    factor = UnitManager.convert(1.0, pa_unit, 'pressure_to_mpa') * 1e6
+    for chunk in iter_csv_columns(path, TRAJECTORY_COLUMNS, required=('time', 'pa'), chunk_rows=chunk_rows):
+        if factor != 1.0:
+            chunk['pa'] = chunk['pa'] * factor
+        yield chunk
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.simulation.trajectory",
+                                     description="Descolamento e Cf ao longo de um perfil de voo.")
+    parser.add_argument("trajectory", help="CSV com colunas time, pa e (opcional) altitude")
+    parser.add_argument("-o", "--output", help="Resultado por amostra (.csv ou .npz)")
+    parser.add_argument("--project", help="Projeto .nzl/.json/.csv com o bocal (o primeiro projeto)")
+    parser.add_argument("--set", action='append', default=[], metavar="CHAVE=VALOR",
+                        help="Entrada do projeto (completa o --project)")
+    parser.add_argument("--solver", choices=sorted(SOLVER_NAMES), default='rao')
+    parser.add_argument("--pa-unit", default='Pa', help="Unidade da coluna pa (Pa, atm, psi, MPa)")
+    parser.add_argument("--chunk", type=int, default=DEFAULT_CHUNK_ROWS, help="Linhas lidas por bloco")
+    args = parser.parse_args(argv)
+
+    try:
+        overrides = parse_defaults(args.set)
+        if args.project:
+            design = read_designs([args.project], overrides)[0]
+        else:
+            design = overrides
+            missing = [k for k in DESIGN_KEYS if k not in design]
+            if missing:
+                raise ValueError(f"faltam {', '.join(missing)} (use --project ou --set).")
+        solver = solver_for(design.get('solver', args.solver), 60)
+        geometry = solver.compute(**{k: design[k] for k in DESIGN_KEYS})
+        analysis = TrajectoryAnalysis(geometry, design['k'], design['pc'], design['pe'])
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Erro no projeto: {e}", file=sys.stderr)
+        return 2
+
+    writer = open_writer(args.output) if args.output else None
+    started = time.perf_counter()
+    try:
+        summary = analysis.run(read_trajectory(args.trajectory, args.pa_unit, args.chunk), writer=writer)
+    except (OSError, ValueError) as e:
+        print(f"Erro na trajetória: {e}", file=sys.stderr)
+        return 2
+    finally:
+        if writer is not None:
+            writer.close()
+    elapsed = time.perf_counter() - started
+    print(summary.report())
+    print(f"{summary.samples} amostras em {elapsed:.2f} s ({summary.samples / max(elapsed, 1e-9):.0f} amostras/s)",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
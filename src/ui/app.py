@@ -5,6 +5,7 @@ import sys
 import os
 import math
 import json
+import time
 import requests
 import random
 from packaging import version
@@ -25,6 +26,10 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from mpl_toolkits.mplot3d import Axes3D
 
 from src.simulation.separation import FlowSimulation, SimulationInput
+from src.simulation.streaming import Downsampler
+from src.simulation.static_fire import RawFormat, StaticFireAnalysis, TraceConditioner, read_static_fire
+from src.simulation.tolerance import METRICS, Tolerance, ToleranceSpace, metric_keys, run_tolerance, sample_columns
+from src.simulation.trajectory import TrajectoryAnalysis, read_trajectory
 
 # IMPORTAÇÕES LOCAIS
 from src.config import CURRENT_VERSION, PROPELLANTS, resource_path
@@ -33,46 +38,15 @@ from src.core.solvers.bell_nozzle import BellNozzleSolver
 from src.core.solvers.moc_solver import MOCSolver
 
 from src.core.models import NozzleResult
-
-class UnitManager:
-    """Gerencia conversões e fatores de escala."""
-    
-    # Fatores para converter DA unidade X PARA a unidade base do Solver
-    # Base Length: mm
-    # Base Pressure (Chamber): MPa
-    # Base Pressure (Exhaust): atm
-    
-    CONVERTERS = {
-        'length_to_mm': {
-            'mm': 1.0, 
-            'cm': 10.0, 
-            'm': 1000.0,
-            'in': 25.4,
-            'ft': 304.8  
-        },
-        'pressure_to_mpa': {
-            'MPa': 1.0, 'Pa': 1e-6, 'psi': 0.00689476, 'ksi': 6.89476, 'atm': 0.101325
-        },
-        'pressure_to_atm': {
-            'atm': 1.0, 'Pa': 9.86923e-6, 'MPa': 9.86923, 'psi': 0.068046, 'ksi': 68.046
-        }
-    }
-
-    @staticmethod
-    def convert(value: float, from_unit: str, category: str, reverse: bool = False) -> float:
-        """
-        category: 'length_to_mm', 'pressure_to_mpa', etc.
-        reverse: Se True, converte DA base PARA a unidade de exibição (usado na UI).
-        """
-        # Proteção contra unidade vazia ou inválida
-        if not from_unit or from_unit not in UnitManager.CONVERTERS.get(category, {}):
-            return value
-
-        factor = UnitManager.CONVERTERS[category].get(from_unit, 1.0)
-        
-        if reverse:
-            return value / factor
-        return value * factor
+from src.core import gasdynamics
+from src.core.units import UnitManager
+from src.core.geometry import SAMPLING_PLOT, SAMPLING_MESH_3D, SAMPLING_DXF, SAMPLING_FLOW
+from src.core.cache import ResultCache, CachedSolver, quantize
+from src.core.disk_cache import DiskCache
+from src.ui.pipeline import Pipeline
+from src.ui.worker import BackgroundWorker, Cancelled
+from src.cli import open_writer
+from src.core.designs import SOLVER_NAMES
 
 class ToolTip:
     """
@@ -136,6 +110,20 @@ class App(ctk.CTk):
     COLOR_NORMAL_BORDER = "#565B5E"
     COLOR_NORMAL_TEXT = "white"
 
+    # Espera após o último Enter/Ctrl+R antes de disparar o cálculo
+    SIMULATION_DEBOUNCE_MS = 120
+    # Curva de sensibilidade: versão grossa imediata, refinada em segundo plano
+    SENS_COARSE_POINTS = 41
+    SENS_FINE_POINTS = 401
+    # Mapa de operação (aba de separação): resolução e faixas relativas ao ponto atual
+    ENVELOPE_POINTS = 500
+    ENVELOPE_PC_RANGE = (0.05, 1.25)     # x pc do projeto
+    ENVELOPE_PA_MAX = 1.25               # x max(pa informada, 1 atm)
+    # Pontos mantidos para plotar séries longas (trajetória)
+    TRAJECTORY_PLOT_POINTS = 20000
+    STATIC_FIRE_PLOT_POINTS = 20000
+    TOLERANCE_SAMPLES = 100000
+
     def __init__(self):
         super().__init__()
         
@@ -146,10 +134,33 @@ class App(ctk.CTk):
         } #easyfind
         
         self.current_solver_name = "Adapted Rao Method Solver (Rao)"
+        # Cache compartilhado entre os solvers (a chave inclui a classe do solver):
+        # recálculos do mesmo projeto (Enter, Ctrl+R, troca de unidade) viram consultas
+        self.result_cache = ResultCache(max_entries=512, max_bytes=64 * 1024 ** 2)
+        # Segundo nível em disco: resultados sobrevivem ao reinício do programa
+        try:
+            self.disk_cache = DiskCache()
+        except OSError as e:
+            print(f"Cache em disco desativado: {e}")
+            self.disk_cache = None
         # Instancia o padrão
-        self.calculator = self.available_solvers[self.current_solver_name]()
+        self.calculator = CachedSolver(self.available_solvers[self.current_solver_name](), self.result_cache,
+                                       disk=self.disk_cache)
         self.last_result = None
         self.last_input_ang_cov = -135
+        # (resultado, (pc, gamma), PreparedFlow) da última análise de separação
+        self._flow_cache = None
+        # Aba de separação: 'profile' (perfil na parede) ou 'envelope' (mapa pc x pa)
+        self.sep_view = 'profile'
+        self.last_envelope = None
+        # Pipeline incremental do run_simulation (só refaz o que mudou)
+        self.pipeline = self._build_pipeline()
+        # Cálculos rodam em segundo plano; o desenho volta para a thread da UI via after()
+        self.worker = BackgroundWorker(self)
+        # Ferramentas longas (trajetória, teste estático, tolerâncias): executor próprio,
+        # uma thread por ferramenta, para não bloquear a simulação nem a sensibilidade
+        self.tool_worker = BackgroundWorker(self, max_workers=3, name="nozzlecalc-tools")
+        self._tool_windows = {}  # canal -> close() da janela de progresso aberta
         self.current_file_path = None
         
         self.base_xlim = None
@@ -212,6 +223,11 @@ class App(ctk.CTk):
         self.snap_points = {}
 
         self.sens_data = None
+        # Curvas por projeto (sem length_pct): mudar só o comprimento move apenas o marcador
+        self.sens_curves = ResultCache(max_entries=32, max_bytes=None)
+        self.sens_line = None
+        self.sens_marker = None
+        self.sens_marker_label = None
         self.cursor_sens_v = None
         self.cursor_sens_h = None
         self.cursor_sens_text = None
@@ -318,6 +334,9 @@ class App(ctk.CTk):
         menu = tk.Menu(self, tearoff=0, bg="#2b2b2b", fg="white", activebackground="#404040", activeforeground="white", borderwidth=0)
         
         menu.add_command(label="    Flow Properties Table", command=self.open_flow_properties)
+        menu.add_command(label="    Trajectory Analysis...", command=self.open_trajectory_analysis)
+        menu.add_command(label="    Static-Fire Log...", command=self.open_static_fire)
+        menu.add_command(label="    Tolerance Analysis (Monte Carlo)...", command=self.open_tolerance_analysis)
         # Futuramente: menu.add_command(label="    Unit Converter", command=...)
         
         try:
@@ -425,7 +444,7 @@ class App(ctk.CTk):
         
         if solver_class:
             try:
-                self.calculator = solver_class()
+                self.calculator = CachedSolver(solver_class(), self.result_cache, disk=self.disk_cache)
                 self.current_solver_name = choice
                 
                 # --- LÓGICA DE UI DINÂMICA ---
@@ -736,6 +755,18 @@ class App(ctk.CTk):
         ctk.CTkButton(self.sep_controls, text="🔄 Update Plot", width=100, 
                       command=self.refresh_separation_only, 
                       fg_color="#8E44AD", hover_color="#9B59B6").pack(side="left", padx=10)
+
+        # Alterna entre o perfil na parede e o mapa de operação (pc x pa)
+        self.sep_view_selector = ctk.CTkSegmentedButton(
+            self.sep_controls, values=["Wall Profile", "Operating Envelope"],
+            command=self._set_separation_view
+        )
+        self.sep_view_selector.set("Wall Profile")
+        self.sep_view_selector.pack(side="left", padx=10)
+
+        self.btn_export_envelope = ctk.CTkButton(self.sep_controls, text="💾 Export Map", width=100,
+                                                 command=self.export_envelope_map, state="disabled")
+        self.btn_export_envelope.pack(side="left", padx=5)
         
         self.sep_disclaimer = ctk.CTkLabel(
             self.tab_sep, 
@@ -787,10 +818,7 @@ class App(ctk.CTk):
         mach_exit = self.calculator.solve_mach_from_area(res.epsilon, k)
         
         def get_ratios(mach, k):
-            if mach == 0: return 1.0, 1.0
-            term = 1 + (k - 1) / 2 * mach**2
-            t_ratio = 1 / term
-            p_ratio = term ** (-k / (k - 1))
+            p_ratio, t_ratio, _ = gasdynamics.isentropic_ratios(mach, k)
             return p_ratio, t_ratio
 
         p_thr, t_thr = get_ratios(1.0, k)
@@ -987,36 +1015,13 @@ class App(ctk.CTk):
         doc.layers.new(name='NOZZLE_PROFILE', dxfattribs={'color': 4}) # Ciano
 
         # --- 2. OTIMIZAÇÃO DE PONTOS (CRÍTICO PARA FUSION 360) ---
-        # Fusion odeia milhares de pontos. Vamos filtrar pontos muito próximos (< 0.05mm)
-        raw_x = res.contour_x
-        raw_y = res.contour_y
-        
-        optimized_points = []
-        last_x, last_y = -999, -999
-        min_dist_sq = 0.05 ** 2  # 0.05mm de resolução mínima (suficiente para usinagem)
-
-        for x, y in zip(raw_x, raw_y):
-            # Sempre inclui o primeiro ponto
-            if len(optimized_points) == 0:
-                optimized_points.append((x, y))
-                last_x, last_y = x, y
-                continue
-            
-            # Distância Euclidiana ao quadrado (mais rápido que sqrt)
-            dist_sq = (x - last_x)**2 + (y - last_y)**2
-            
-            # Só adiciona se o ponto estiver longe o suficiente do anterior
-            # OU se for o último ponto absoluto da lista
-            if dist_sq > min_dist_sq:
-                optimized_points.append((x, y))
-                last_x, last_y = x, y
-
-        # Garante que o último ponto exato da simulação esteja lá
-        final_pt = (raw_x[-1], raw_y[-1])
-        if optimized_points[-1] != final_pt:
-            optimized_points.append(final_pt)
+        # Fusion odeia milhares de pontos. A amostragem adaptativa concentra pontos
+        # onde a parede curva (garganta) e usa poucos nos trechos quase retos,
+        # com erro de corda de 0.005mm (suficiente para usinagem).
+        raw_x, raw_y = res.sample_wall(SAMPLING_DXF)
+        optimized_points = [(float(x), float(y)) for x, y in zip(raw_x, raw_y)]
 
-        print(f"DXF Optimization: Reduced {len(raw_x)} points to {len(optimized_points)} points.")
+        print(f"DXF Optimization: {len(res.contour_x)} dense points -> {len(optimized_points)} adaptive points.")
 
         # --- 3. FECHAMENTO DO POLÍGONO (CLOSED LOOP) ---
         # Para o Fusion reconhecer como "Profile" (azul claro), precisamos fechar a área.
@@ -1125,47 +1130,155 @@ class App(ctk.CTk):
         except Exception as e:
             tk.messagebox.showerror("Error", f"Could not open:\n{e}")
 
+    def _build_pipeline(self) -> Pipeline:
+        """
+        Estágios do run_simulation e suas dependências. ang_cov só muda o arco
+        convergente (contorno e plots); a pressão ambiente só afeta a separação.
+        A parte `compute` de cada estágio roda no worker; a de desenho, na thread da UI.
+        """
+        design = ('solver', 'tr', 'k', 'pc', 'pe', 'ang_div', 'ang_cov', 'length_pct', 'rounding_factor')
+        metrics = tuple(d for d in design if d != 'ang_cov')
+        # A curva de sensibilidade varre o length_pct: ele só move o marcador
+        curve = tuple(d for d in metrics if d != 'length_pct')
+
+        def current(results):
+            # Resultado desta passada, ou o último aplicado se o solve foi pulado
+            return results.get('solve', self.last_result)
+
+        def solve(state, results):
+            # O Python vai usar automaticamente o método .compute() da classe que estiver em self.calculator
+            return self.calculator.compute(**state['params'])
+
+        def apply_solve(state, res):
+            self.last_result = res
+            self.last_input_ang_cov = state['ang_cov']
+
+        def plot_2d(state, _):
+            self._update_plot(self.last_result, state['ang_cov'])
+            self._flash_refit_button()
+
+        def sensitivity(state, results):
+            if not state['sens_tab']:
+                return None
+            # Se a curva refinada deste projeto já existe, usa direto; senão mostra a grossa
+            fine = self.sens_curves.get((self._sensitivity_key(state['params']), self.SENS_FINE_POINTS))
+            if fine is not None:
+                return fine, True
+            return self._compute_sensitivity_curve(state['params'], self.SENS_COARSE_POINTS), False
+
+        def draw_sensitivity(state, data):
+            if data is None:
+                self.worker.cancel('sensitivity')
+                return
+            (x_vals, y_vals), refined = data
+            self._draw_sensitivity(x_vals, y_vals)
+            if not refined:
+                self._refine_sensitivity(state['params'])
+
+        def sensitivity_marker(state, _):
+            if state['sens_tab']:
+                self._update_sensitivity_marker(state['length_pct'])
+
+        def separation(state, results):
+            inputs = state['separation_inputs']
+            if isinstance(inputs, Exception):
+                return inputs
+            sim_input, _ = inputs
+            try:
+                res = current(results)
+                envelope = self._compute_envelope(res, sim_input) if state['sep_view'] == 'envelope' else None
+                return self._compute_separation(res, sim_input), sim_input, envelope
+            except Exception as e:
+                return e
+
+        def draw_separation(state, data):
+            if isinstance(data, Exception):
+                # Mesmo tratamento do refresh_separation_only: não derruba os outros estágios
+                tk.messagebox.showerror("Simulation Error", f"Failed to update separation plot:\n{data}")
+            else:
+                self._show_separation(*data)
+
+        pipeline = Pipeline()
+        pipeline.add('solve', design, apply_solve, solve)
+        pipeline.add('report', metrics, lambda state, _: self._update_text_output(self.last_result))
+        pipeline.add('plot_2d', ('solve', 'unit_len'), plot_2d)
+        pipeline.add('plot_3d', ('solve',), lambda state, _: self._update_3d_plot(self.last_result))
+        pipeline.add('sensitivity', curve + ('sens_tab',), draw_sensitivity, sensitivity)
+        pipeline.add('sensitivity_marker', ('solve', 'sensitivity', 'sens_tab'), sensitivity_marker)
+        pipeline.add('separation', metrics + ('pa', 'unit_pa', 'unit_len', 'unit_pe', 'unit_pc', 'sep_view'),
+                     draw_separation, separation)
+        return pipeline
+
+    def _design_params(self) -> dict:
+        """Entradas do solver lidas dos campos, nas unidades base (mm, MPa, atm). Só na thread da UI."""
+        return {
+            'tr': self._get_converted_value('tr'),           # Retorna sempre mm
+            'k': float(self.inputs['k'].get()),
+            'pc': self._get_converted_value('pc'),           # Retorna sempre MPa
+            'pe': self._get_converted_value('pe'),           # Retorna sempre atm
+            'ang_div': float(self.inputs['ang_div'].get()),
+            'ang_cov': float(self.inputs['ang_cov'].get()),
+            'length_pct': float(self.inputs['len_pct'].get()),
+            'rounding_factor': float(self.inputs['rounding'].get()),
+        }
+
     def run_simulation(self):
+        # Enter/Ctrl+R repetidos em sequência viram um único cálculo
+        self.worker.debounce('simulate', self.SIMULATION_DEBOUNCE_MS, self._start_simulation)
+
+    def _start_simulation(self):
         print(">>> INICIANDO SIMULAÇÃO...")
-        
+
+        # Coleta inputs usando o método centralizado (widgets só podem ser lidos na thread da UI)
         try:
-            # Coleta inputs usando o método centralizado
+            params = self._design_params()
+        except ValueError:
+            tk.messagebox.showerror("Input Error", "Please check your numbers.")
+            return
+
+        # Estado de entrada do pipeline: só os estágios cujas dependências mudaram rodam
+        state = dict(params)
+        state.update({
+            'params': params,
+            'solver': self.current_solver_name,
+            'unit_len': self.unit_prefs.get('tr'),
+            'unit_pe': self.unit_prefs.get('pe'),
+            'unit_pa': self.unit_prefs.get('pa'),
+            'unit_pc': self.unit_prefs.get('pc'),
+            'pa': self.entry_pa.get(),
+            'sep_view': self.sep_view,
+            # A aba de sensibilidade só existe para o solver Rao (removida no MOC)
+            'sens_tab': "Sensitivity Analysis" in self.tabview._name_list,
+        })
+        try:
+            state['separation_inputs'] = self._separation_inputs()
+        except ValueError as e:
+            state['separation_inputs'] = e
+
+        plan = self.pipeline.plan(state)
+        started = time.perf_counter()
+
+        def on_done(results):
             try:
-                params = {
-                    'tr': self._get_converted_value('tr'),           # Retorna sempre mm
-                    'k': float(self.inputs['k'].get()),
-                    'pc': self._get_converted_value('pc'),           # Retorna sempre MPa
-                    'pe': self._get_converted_value('pe'),           # Retorna sempre atm
-                    'ang_div': float(self.inputs['ang_div'].get()),
-                    'ang_cov': float(self.inputs['ang_cov'].get()),
-                    'length_pct': float(self.inputs['len_pct'].get()),
-                    'rounding_factor': float(self.inputs['rounding'].get()),
-                }
-            except ValueError:
-                tk.messagebox.showerror("Input Error", "Please check your numbers.")
+                self.pipeline.apply(plan, state, results)
+            except Exception as e:
+                on_error(e)
                 return
+            print(f"Cálculo finalizado em {(time.perf_counter() - started) * 1000:.0f} ms. "
+                  f"(cache: {self.result_cache.info()})")
 
-            # CHAMA O SOLVER ATUAL
-            # O Python vai usar automaticamente o método .compute() da classe que estiver em self.calculator
-            res = self.calculator.compute(**params)
-            
-            print("Cálculo finalizado. Atualizando UI...")
-            self.last_result = res 
-            self.last_input_ang_cov = params['ang_cov']
-            
-            self._update_text_output(res)
-            self._update_plot(res, params['ang_cov'])
-            self._update_3d_plot(res)
-            self._update_sensitivity_analysis(params)
-            self.refresh_separation_only()
-            self._flash_refit_button()
-            
-        except Exception as e:
+        def on_error(e):
             import traceback
-            traceback.print_exc() # Imprime o erro completo no terminal
+            traceback.print_exception(type(e), e, e.__traceback__)  # Imprime o erro completo no terminal
+            # O relatório foi sobrescrito pela mensagem de erro: precisa ser refeito na próxima rodada
+            self.pipeline.invalidate('report')
             self.txt_output.delete("1.0", "end")
             self.txt_output.insert("end", f"CRITICAL ERROR:\n{str(e)}")
             tk.messagebox.showerror("Simulation Error", str(e))
+
+        # Um pedido novo substitui o anterior (que é cancelado entre estágios e descartado)
+        self.worker.submit('simulate', lambda cancel: self.pipeline.compute(plan, state, cancel),
+                           on_done, on_error)
     
     def _flash_refit_button(self):
         """
@@ -1215,7 +1328,40 @@ class App(ctk.CTk):
         )
         self.txt_output.insert("end", report)
 
-    def _update_sensitivity_analysis(self, current_params):
+    def _sensitivity_key(self, params):
+        # A curva não depende do length_pct (varrido) nem do ang_cov (só muda o arco convergente)
+        return (type(self.calculator.solver).__qualname__,) + tuple(
+            (k, quantize(v, 10)) for k, v in sorted(params.items()) if k not in ('length_pct', 'ang_cov'))
+
+    def _compute_sensitivity_curve(self, current_params, n_points: int):
+        """Eficiência total x comprimento (%). Só cálculo: pode rodar fora da thread da UI."""
+        def compute():
+            test_percents = np.linspace(0.60, 1.00, n_points)
+
+            # Varredura vetorizada: um único compute_batch no lugar de n_points chamadas.
+            # A curva só usa Cf e pontos de controle, então o contorno não é gerado.
+            sim_params = current_params.copy()
+            sim_params['length_pct'] = test_percents
+            batch = self.calculator.compute_batch(**sim_params, with_contour=False)
+
+            ok = batch.is_converged() & (batch.cf_ideal > 0)
+            return test_percents[ok] * 100, batch.cf_est[ok] / batch.cf_ideal[ok] * 100
+
+        return self.sens_curves.get_or_compute((self._sensitivity_key(current_params), n_points), compute)
+
+    def _refine_sensitivity(self, current_params):
+        """Recalcula a curva com SENS_FINE_POINTS em segundo plano e troca só os dados da linha."""
+        params = dict(current_params)
+
+        def done(curve):
+            self._set_sensitivity_curve(*curve)
+            self.canvas_sens.draw_idle()
+
+        self.worker.submit('sensitivity',
+                           lambda cancel: self._compute_sensitivity_curve(params, self.SENS_FINE_POINTS),
+                           done, lambda e: print(f"Falha ao refinar a curva de sensibilidade: {e}"))
+
+    def _draw_sensitivity(self, x_vals, y_vals):
         t_title = "Efficiency vs Nozzle Length"
         t_xlabel = "Length Percentage (%)"
         t_ylabel = "Total Efficiency (%)"
@@ -1231,55 +1377,16 @@ class App(ctk.CTk):
         self.ax_sens.set_xlabel(t_xlabel, color='white')
         self.ax_sens.set_ylabel(t_ylabel, color='white')
 
-        x_vals = []
-        y_vals = []
-        test_percents = np.linspace(0.60, 1.00, 41) 
-        
-        for pct in test_percents:
-            sim_params = current_params.copy()
-            sim_params['length_pct'] = pct
-            res = self.calculator.compute(**sim_params)
-            
-            tr = res.throat_radius
-            nx, ny = res.control_points['N']
-            qx, qy = res.control_points['Q']
-            ex, ey = res.control_points['E']
-            g_x, g_y = 0, tr
-            
-            cond1 = (nx >= g_x) and (ny >= g_y)
-            cond2 = (ex >= qx) and (ey >= qy)
-            cond3 = (qy >= ny)
-            if (ex - nx) != 0:
-                slope_ne = (ey - ny) / (ex - nx)
-                y_ref_at_q = ny + slope_ne * (qx - nx)
-                cond4 = qy >= y_ref_at_q
-            else:
-                cond4 = False
-            
-            is_converged = cond1 and cond2 and cond3 and cond4
-            
-            if is_converged and res.cf_ideal > 0:
-                eff = (res.cf_est / res.cf_ideal) * 100
-                x_vals.append(pct * 100) 
-                y_vals.append(eff)
-        
-        self.sens_data = (np.array(x_vals), np.array(y_vals))
-
-        if x_vals:
-            self.ax_sens.plot(x_vals, y_vals, color='#2ECC71', linewidth=2, label=t_legend_curve)
-            current_pct = current_params['length_pct'] * 100
-            if self.last_result and self.last_result.cf_ideal > 0:
-                curr_eff = (self.last_result.cf_est / self.last_result.cf_ideal) * 100
-                self.ax_sens.scatter([current_pct], [curr_eff], color='#E74C3C', s=100, zorder=5, label=t_legend_curr)
-                self.ax_sens.annotate(f"L: {current_pct:.1f}%\nEff: {curr_eff:.2f}%", 
-                                      (current_pct, curr_eff),
+        self.sens_line, = self.ax_sens.plot([], [], color='#2ECC71', linewidth=2, label=t_legend_curve)
+        # Marcador criado vazio: _update_sensitivity_marker só reposiciona (sem redesenhar o eixo)
+        self.sens_marker = self.ax_sens.scatter([np.nan], [np.nan], color='#E74C3C', s=100, zorder=5,
+                                                label=t_legend_curr, visible=False)
+        self.sens_marker_label = self.ax_sens.annotate("", (0, 0),
                                       textcoords="offset points", xytext=(0,10), ha='center',
-                                      color='white', fontweight='bold', fontsize=9,
+                                      color='white', fontweight='bold', fontsize=9, visible=False,
                                       bbox=dict(boxstyle="round,pad=0.3", fc="black", ec="none", alpha=0.7))
-
-            self.ax_sens.set_xlim(55, 105)
-            min_y = min(y_vals)
-            self.ax_sens.set_ylim(min_y - 1.0, 100.5)
+        self.ax_sens.set_xlim(55, 105)
+        self._set_sensitivity_curve(x_vals, y_vals)
 
         self.ax_sens.legend(loc='lower right', facecolor='#333333', labelcolor='white')
         
@@ -1288,7 +1395,29 @@ class App(ctk.CTk):
         self.cursor_sens_text = self.ax_sens.text(0, 0, "", visible=False, color="#FFFF00", fontweight="bold",
                                                   bbox=dict(boxstyle="round", fc="black", alpha=0.8))
 
-        self.canvas_sens.draw()
+        self.canvas_sens.draw_idle()
+
+    def _set_sensitivity_curve(self, x_vals, y_vals):
+        self.sens_data = (np.asarray(x_vals), np.asarray(y_vals))
+        self.sens_line.set_data(x_vals, y_vals)
+        if len(y_vals):
+            self.ax_sens.set_ylim(min(y_vals) - 1.0, 100.5)
+
+    def _update_sensitivity_marker(self, length_pct: float):
+        """Move o marcador do projeto atual sobre a curva já desenhada."""
+        if self.sens_marker is None:
+            return
+        res = self.last_result
+        visible = bool(len(self.sens_data[0])) and res is not None and res.cf_ideal > 0
+        if visible:
+            current_pct = length_pct * 100
+            curr_eff = (res.cf_est / res.cf_ideal) * 100
+            self.sens_marker.set_offsets([[current_pct, curr_eff]])
+            self.sens_marker_label.xy = (current_pct, curr_eff)
+            self.sens_marker_label.set_text(f"L: {current_pct:.1f}%\nEff: {curr_eff:.2f}%")
+        self.sens_marker.set_visible(visible)
+        self.sens_marker_label.set_visible(visible)
+        self.canvas_sens.draw_idle()
 
     def _update_3d_plot(self, res: NozzleResult):
         # --- VERSÃO OTIMIZADA E CORRIGIDA ---
@@ -1296,9 +1425,7 @@ class App(ctk.CTk):
         self.ax_3d.set_axis_off()
         self.ax_3d.set_facecolor('#2B2B2B')
 
-        resolution_step = 5 
-        x_subset = res.contour_x[::resolution_step]
-        y_subset = res.contour_y[::resolution_step]
+        x_subset, y_subset = res.sample_wall(SAMPLING_MESH_3D)
         radial_segments = 30 
         theta = np.linspace(0, 2 * np.pi, radial_segments)
         
@@ -1338,9 +1465,10 @@ class App(ctk.CTk):
         def to_user(val_mm):
             return UnitManager.convert(val_mm, len_unit, 'length_to_mm', reverse=True)
 
-        # Prepara vetores convertidos para plotagem
-        x_conv = [to_user(x) for x in res.contour_x]
-        y_conv = [to_user(y) for y in res.contour_y]
+        # Prepara vetores convertidos para plotagem (amostragem adaptativa do contorno)
+        wall_x, wall_y = res.sample_wall(SAMPLING_PLOT)
+        x_conv = [to_user(x) for x in wall_x]
+        y_conv = [to_user(y) for y in wall_y]
         tr_conv = to_user(res.throat_radius)
 
         # --- 3. PLOTAGEM ---
@@ -1356,7 +1484,7 @@ class App(ctk.CTk):
         self.ax.set_ylabel(f"Radius ({len_unit})", color='gray')
 
         # Geometria
-        mask = res.contour_x >= 0
+        mask = wall_x >= 0
         div_x = np.array(x_conv)[mask]
         div_y = np.array(y_conv)[mask]
         
@@ -1364,6 +1492,14 @@ class App(ctk.CTk):
         self.ax.plot(div_x, -div_y, color='#00BCD4', linewidth=2.0)
         self.ax.fill_between(div_x, div_y, -div_y, color='#00BCD4', alpha=0.05)
 
+        # Malha de características (apenas solver MOC): C- nas linhas, C+ nas colunas
+        net = res.characteristic_net
+        if net is not None:
+            f = to_user(1.0)
+            net_x, net_y = net.x * f, net.y * f
+            self.ax.plot(net_x.T, net_y.T, color='#FFC107', linewidth=0.4, alpha=0.25)
+            self.ax.plot(net_x, net_y, color='#FFC107', linewidth=0.4, alpha=0.25)
+
         # Garganta e Convergente
         theta_conv = np.linspace(np.radians(ang_cov), np.radians(-90), 50)
         xc_conv = 0 + (1.5 * tr_conv) * np.cos(theta_conv)
@@ -1668,9 +1804,8 @@ class App(ctk.CTk):
                 gamma=gamma
             )
             
-            # Instancia e roda
-            sim = FlowSimulation(self.last_result, sim_input)
-            result = sim.run()
+            # Reaproveita o escoamento já resolvido se só a pressão ambiente mudou
+            result = self._compute_separation(self.last_result, sim_input)
 
             # 4. Exibição dos Resultados
             self._show_separation_window(result, pa_pascal)
@@ -1724,99 +1859,689 @@ class App(ctk.CTk):
         toolbar = NavigationToolbar2Tk(canvas, plot_frame)
         toolbar.update()
 
+    def open_trajectory_analysis(self):
+        """
+        Tools > Trajectory Analysis: passa um perfil de voo (CSV com time, pa e
+        altitude opcional; pa na unidade da aba de separação) pelo critério de
+        Schmucker e pelo Cf com a parcela de pressão, em segundo plano.
+        """
+        if not self.last_result:
+            tk.messagebox.showwarning("Analysis Error", "Please compute the nozzle geometry first (Green Button).")
+            return
+
+        path = filedialog.askopenfilename(title="Open Trajectory (time, altitude, pa)",
+                                          filetypes=[("CSV File", "*.csv"), ("Text File", "*.txt")])
+        if not path:
+            return
+        # Resultado por amostra é opcional (Cancelar = só o resumo e o gráfico)
+        out_path = filedialog.asksaveasfilename(title="Save Per-Sample Results (Cancel to skip)",
+                                                defaultextension=".csv",
+                                                filetypes=[("CSV File", "*.csv"), ("NumPy Archive", "*.npz")])
+        pa_unit = self.unit_prefs.get('pa', 'Pa')
+        try:
+            analysis = TrajectoryAnalysis(self.last_result, float(self.inputs['k'].get()),
+                                          self._get_converted_value('pc'), self._get_converted_value('pe'))
+        except Exception as e:
+            tk.messagebox.showerror("Simulation Failed", f"An error occurred:\n{e}")
+            return
+
+        def work(cancel):
+            downsampler = Downsampler(self.TRAJECTORY_PLOT_POINTS)
+            writer = open_writer(out_path) if out_path else None
+
+            def on_chunk(n):
+                if cancel.is_set():
+                    raise Cancelled()
+
+            try:
+                summary = analysis.run(read_trajectory(path, pa_unit), writer, downsampler, on_chunk)
+            finally:
+                if writer is not None:
+                    writer.close()
+            return summary, downsampler.arrays()
+
+        def on_done(data):
+            summary, series = data
+            print(f"[Trajetória] {summary.samples} amostras | seguro a partir de t = {summary.safe_time}")
+            self._show_trajectory_window(summary, series)
+
+        def on_error(e):
+            tk.messagebox.showerror("Trajectory Error", f"Failed to analyze trajectory:\n{e}")
+
+        print(f">>> TRAJETÓRIA: {path}")
+        self.tool_worker.submit('trajectory', work, on_done, on_error)
+
+    def _show_trajectory_window(self, summary, series):
+        """Resumo e gráfico (série reduzida) de margem e Cf ao longo do voo."""
+        win = ctk.CTkToplevel(self)
+        win.title("Trajectory Analysis (Schmucker Criterion + Cf)")
+        win.geometry("900x700")
+        win.attributes('-topmost', True)
+        self.after(100, lambda: win.attributes('-topmost', False))
+
+        header = ctk.CTkFrame(win, fg_color="#2B2B2B")
+        header.pack(fill="x", padx=10, pady=10)
+        if summary.safe_time is None:
+            status_text, status_color = "⚠️ SEPARATION UNTIL APOGEE", "#E74C3C"
+        elif summary.safe_time <= summary.start_time:
+            status_text, status_color = "✅ ATTACHED DURING THE WHOLE ASCENT", "#2ECC71"
+        else:
+            status_text, status_color = f"✅ FLOW ATTACHED FROM t = {summary.safe_time:.3f} s", "#F1C40F"
+        ctk.CTkLabel(header, text=status_text, font=("Arial", 16, "bold"), text_color=status_color).pack(side="left", padx=20)
+        ctk.CTkLabel(header, text=f"{summary.samples} samples | min margin {summary.min_margin * 100:.1f}%",
+                     font=("Arial", 14), text_color="white").pack(side="right", padx=20)
+
+        fig, (ax_m, ax_cf) = plt.subplots(2, 1, figsize=(6, 5), dpi=100, sharex=True)
+        fig.patch.set_facecolor('#2B2B2B')
+        t = series['time']
+        for ax, key, label, color in ((ax_m, 'safety_margin', "Safety Margin", '#3498DB'),
+                                      (ax_cf, 'cf_est', "Cf (with pressure term)", '#2ECC71')):
+            ax.set_facecolor('#2B2B2B')
+            ax.tick_params(colors='white')
+            ax.grid(True, linestyle='--', alpha=0.3, color='white')
+            ax.plot(t, series[key], color=color, linewidth=1.5)
+            ax.set_ylabel(label, color='white')
+            if summary.safe_time is not None and summary.safe_time > summary.start_time:
+                ax.axvline(summary.safe_time, color='#F1C40F', linestyle=':')
+        ax_m.axhline(0.0, color='#E74C3C', linestyle='--', linewidth=1)
+        ax_cf.set_xlabel("Time (s)", color='white')
+        fig.tight_layout()
+
+        canvas = FigureCanvasTkAgg(fig, master=win)
+        canvas.draw()
+        canvas.get_tk_widget().pack(fill="both", expand=True, padx=10, pady=(0, 10))
+
+    def open_static_fire(self):
+        """
+        Tools > Static-Fire Log: escolhe o log do transdutor de pc (CSV ou
+        binário cru) e abre o formulário de leitura/filtragem antes de rodar.
+        """
+        if not self.last_result:
+            tk.messagebox.showwarning("Analysis Error", "Please compute the nozzle geometry first (Green Button).")
+            return
+
+        path = filedialog.askopenfilename(title="Open Static-Fire Log (time, pc)",
+                                          filetypes=[("CSV File", "*.csv"), ("Text File", "*.txt"),
+                                                     ("Raw Binary", "*.bin *.dat *.raw"), ("All Files", "*.*")])
+        if not path:
+            return
+        binary = not path.lower().endswith(('.csv', '.txt'))
+
+        win = ctk.CTkToplevel(self)
+        win.title("Static-Fire Log")
+        win.geometry("420x560" if binary else "420x380")
+        win.attributes('-topmost', True)
+
+        ctk.CTkLabel(win, text=os.path.basename(path), font=("Arial", 16, "bold")).pack(pady=15)
+        form = ctk.CTkFrame(win, fg_color="transparent")
+        form.pack(fill="both", expand=True, padx=20)
+        fields = {}
+
+        def add_row(label, key, widget_factory):
+            row = ctk.CTkFrame(form, fg_color="transparent")
+            row.pack(fill="x", pady=4)
+            ctk.CTkLabel(row, text=label, anchor="w").pack(side="left")
+            fields[key] = widget_factory(row)
+
+        def add_entry(label, key, default):
+            def factory(row):
+                entry = ctk.CTkEntry(row, width=100)
+                entry.insert(0, default)
+                entry.pack(side="right")
+                return entry
+            add_row(label, key, factory)
+
+        def add_combo(label, key, options, default):
+            def factory(row):
+                var = ctk.StringVar(value=default)
+                ctk.CTkOptionMenu(row, variable=var, values=options, width=100).pack(side="right")
+                return var
+            add_row(label, key, factory)
+
+        add_combo("Pressure Unit:", 'pc_unit', ["MPa", "Pa", "psi", "ksi", "atm"], self.unit_prefs.get('pc', 'MPa'))
+        add_combo("Transducer Reading:", 'gauge', ["Absolute", "Gauge"], "Absolute")
+        add_entry("Sample Rate (Hz, no time column):", 'rate', "")
+        add_entry("Moving Average (samples):", 'window', "1")
+        add_entry("Decimate (block mean):", 'decimate', "1")
+        if binary:
+            add_combo("Sample Type:", 'dtype', ["<f4", "<f8", "<i2", "<u2", "<i4", ">f4", ">i2", ">u2"], "<f4")
+            add_entry("Channels:", 'channels', "1")
+            add_entry("Pc Channel (from 0):", 'channel', "0")
+            add_entry("Header Bytes:", 'header_bytes', "0")
+            add_entry("Scale:", 'scale', "1")
+            add_entry("Offset:", 'offset', "0")
+
+        def run():
+            try:
+                rate = float(fields['rate'].get()) if fields['rate'].get().strip() else None
+                conditioner = TraceConditioner(int(fields['window'].get()), int(fields['decimate'].get()))
+                raw = None
+                if binary:
+                    if rate is None:
+                        raise ValueError("Raw binary logs need the sample rate.")
+                    raw = RawFormat(rate, fields['dtype'].get(), int(fields['channels'].get()),
+                                    int(fields['channel'].get()), int(fields['header_bytes'].get()),
+                                    float(fields['scale'].get()), float(fields['offset'].get()))
+                _, pa = self._separation_inputs()
+                analysis = StaticFireAnalysis(self.last_result, float(self.inputs['k'].get()),
+                                              self._get_converted_value('pc'), self._get_converted_value('pe'),
+                                              pa=pa)
+            except Exception as e:
+                tk.messagebox.showerror("Static-Fire Error", f"Invalid settings:\n{e}", parent=win)
+                return
+            gauge_pa = pa if fields['gauge'].get() == "Gauge" else 0.0
+            pc_unit = fields['pc_unit'].get()
+            win.destroy()
+            self._run_static_fire(path, analysis, conditioner, pc_unit, gauge_pa, rate, raw)
+
+        ctk.CTkButton(win, text="Analyze", command=run, fg_color="#27AE60").pack(pady=20)
+
+    def _tool_progress(self, channel, title, total, unit):
+        """
+        Janela de progresso com cancelamento para um trabalho do tool_worker.
+        Devolve (advance, close): advance(n) soma n itens concluídos (pode ser
+        chamada da thread do trabalho) e close() fecha a janela. Sem `total` a
+        barra fica indeterminada e só a contagem é mostrada. Um novo pedido no
+        mesmo canal substitui o anterior, então a janela antiga é fechada.
+        """
+        previous = self._tool_windows.pop(channel, None)
+        if previous is not None:
+            previous()
+        win = ctk.CTkToplevel(self)
+        win.title(title)
+        win.geometry("420x150")
+        win.attributes('-topmost', True)
+        lbl = ctk.CTkLabel(win, text=f"0 {unit}", font=("Arial", 14))
+        lbl.pack(pady=(20, 10))
+        bar = ctk.CTkProgressBar(win, width=360, mode="determinate" if total else "indeterminate")
+        bar.pack()
+        if total:
+            bar.set(0.0)
+        else:
+            bar.start()
+        done = [0]
+
+        def advance(n):
+            done[0] += n
+
+        def poll():
+            if not win.winfo_exists():
+                return
+            if total:
+                bar.set(min(done[0] / total, 1.0))
+                lbl.configure(text=f"{done[0]} / {total} {unit}")
+            else:
+                lbl.configure(text=f"{done[0]} {unit}")
+            win.after(200, poll)
+
+        def stop():
+            self.tool_worker.cancel(channel)
+            win.destroy()
+
+        def close():
+            if win.winfo_exists():
+                win.destroy()
+
+        ctk.CTkButton(win, text="Cancel", command=stop, fg_color="#C0392B").pack(pady=15)
+        win.protocol("WM_DELETE_WINDOW", stop)
+        self._tool_windows[channel] = close
+        poll()
+        return advance, close
+
+    def _run_static_fire(self, path, analysis, conditioner, pc_unit, gauge_pa, rate, raw):
+        """Avalia o log em segundo plano (ambiente do teste = pa da aba de separação), com progresso e cancelamento."""
+        # Resultado por amostra é opcional (Cancelar = só o resumo e o gráfico)
+        out_path = filedialog.asksaveasfilename(title="Save Per-Sample Results (Cancel to skip)",
+                                                defaultextension=".npz",
+                                                filetypes=[("NumPy Archive", "*.npz"), ("CSV File", "*.csv")])
+        # Binário cru: total de amostras conhecido pelo tamanho do arquivo; CSV só mostra a contagem
+        total = None
+        if raw is not None:
+            frame = np.dtype(raw.dtype).itemsize * raw.channels
+            total = max(0, (os.path.getsize(path) - raw.header_bytes) // frame)
+        advance, close = self._tool_progress('static_fire', "Static-Fire Analysis", total, "samples")
+
+        def work(cancel):
+            downsampler = Downsampler(self.STATIC_FIRE_PLOT_POINTS)
+            writer = open_writer(out_path) if out_path else None
+
+            def counted(chunks):
+                for chunk in chunks:
+                    advance(len(chunk['pc']))
+                    yield chunk
+
+            def on_chunk(n):
+                if cancel.is_set():
+                    raise Cancelled()
+
+            try:
+                chunks = counted(read_static_fire(path, pc_unit, gauge_pa, rate, raw))
+                summary = analysis.run(conditioner.stream(chunks), writer, downsampler, on_chunk)
+            finally:
+                if writer is not None:
+                    writer.close()
+            return summary, downsampler.arrays()
+
+        def on_done(data):
+            close()
+            summary, series = data
+            print(f"[Teste estático] {summary.samples} amostras | impulso {summary.impulse_est:.1f} N·s")
+            self._show_static_fire_window(summary, series)
+
+        def on_error(e):
+            close()
+            tk.messagebox.showerror("Static-Fire Error", f"Failed to analyze the log:\n{e}")
+
+        print(f">>> TESTE ESTÁTICO: {path}")
+        self.tool_worker.submit('static_fire', work, on_done, on_error)
+
+    def _show_static_fire_window(self, summary, series):
+        """Resumo e gráfico (série reduzida) de pc, empuxo e margem ao longo do teste."""
+        win = ctk.CTkToplevel(self)
+        win.title("Static-Fire Analysis (Thrust + Schmucker Criterion)")
+        win.geometry("900x800")
+        win.attributes('-topmost', True)
+        self.after(100, lambda: win.attributes('-topmost', False))
+
+        header = ctk.CTkFrame(win, fg_color="#2B2B2B")
+        header.pack(fill="x", padx=10, pady=10)
+        if summary.active_samples == 0:
+            status_text, status_color = "⚠️ NO SAMPLE ABOVE AMBIENT PRESSURE", "#E74C3C"
+        elif summary.separated_samples == 0:
+            status_text, status_color = "✅ ATTACHED DURING THE WHOLE BURN", "#2ECC71"
+        else:
+            status_text, status_color = f"⚠️ SEPARATION IN {summary.separated_samples} SAMPLES", "#F1C40F"
+        ctk.CTkLabel(header, text=status_text, font=("Arial", 16, "bold"), text_color=status_color).pack(side="left", padx=20)
+        ctk.CTkLabel(header, text=f"{summary.samples} samples | impulse {summary.impulse_est:.1f} N·s (est.)",
+                     font=("Arial", 14), text_color="white").pack(side="right", padx=20)
+
+        fig, axes = plt.subplots(3, 1, figsize=(6, 6), dpi=100, sharex=True)
+        fig.patch.set_facecolor('#2B2B2B')
+        t = series['time']
+        separated = series['has_separation'].astype(bool)
+        for ax, key, label, color, scale in ((axes[0], 'pc', "Pc (MPa)", '#E67E22', 1e-6),
+                                             (axes[1], 'thrust_est', "Thrust (N)", '#2ECC71', 1.0),
+                                             (axes[2], 'safety_margin', "Safety Margin", '#3498DB', 1.0)):
+            ax.set_facecolor('#2B2B2B')
+            ax.tick_params(colors='white')
+            ax.grid(True, linestyle='--', alpha=0.3, color='white')
+            ax.plot(t, series[key] * scale, color=color, linewidth=1.2)
+            ax.set_ylabel(label, color='white')
+        axes[1].plot(t, series['thrust_ideal'], color='#2ECC71', linewidth=0.8, linestyle=':', alpha=0.7)
+        if separated.any():
+            axes[2].plot(t[separated], series['safety_margin'][separated], '.', color='#E74C3C', markersize=2)
+        axes[2].axhline(0.0, color='#E74C3C', linestyle='--', linewidth=1)
+        # Margens muito negativas (ignição e cauda) achatariam o patamar
+        axes[2].set_ylim(-1.0, 1.0)
+        axes[2].set_xlabel("Time (s)", color='white')
+        fig.tight_layout()
+
+        canvas = FigureCanvasTkAgg(fig, master=win)
+        canvas.draw()
+        canvas.get_tk_widget().pack(fill="both", expand=True, padx=10, pady=(0, 10))
+
+    def open_tolerance_analysis(self):
+        """
+        Tools > Tolerance Analysis: Monte Carlo das tolerâncias de usinagem
+        (raio de garganta, fator de arredondamento e raio de saída) em torno
+        do projeto atual, no pool de processos.
+        """
+        if not self.last_result:
+            tk.messagebox.showwarning("Analysis Error", "Please compute the nozzle geometry first (Green Button).")
+            return
+
+        win = ctk.CTkToplevel(self)
+        win.title("Tolerance Analysis")
+        win.geometry("460x420")
+        win.attributes('-topmost', True)
+
+        ctk.CTkLabel(win, text="Manufacturing Tolerances", font=("Arial", 16, "bold")).pack(pady=15)
+        form = ctk.CTkFrame(win, fg_color="transparent")
+        form.pack(fill="both", expand=True, padx=20)
+        len_unit = self.unit_prefs.get('tr', 'mm')
+        rows = {}
+
+        def add_tolerance(label, key, default_dist, default_scale):
+            row = ctk.CTkFrame(form, fg_color="transparent")
+            row.pack(fill="x", pady=5)
+            ctk.CTkLabel(row, text=label, anchor="w").pack(side="left")
+            scale = ctk.CTkEntry(row, width=80)
+            scale.insert(0, default_scale)
+            scale.pack(side="right")
+            dist = ctk.StringVar(value=default_dist)
+            ctk.CTkOptionMenu(row, variable=dist, values=["Off", "Normal", "Uniform"], width=100).pack(side="right", padx=5)
+            rows[key] = (dist, scale)
+
+        def add_entry(label, default):
+            row = ctk.CTkFrame(form, fg_color="transparent")
+            row.pack(fill="x", pady=5)
+            ctk.CTkLabel(row, text=label, anchor="w").pack(side="left")
+            entry = ctk.CTkEntry(row, width=100)
+            entry.insert(0, default)
+            entry.pack(side="right")
+            return entry
+
+        # Normal: desvio padrão | Uniform: meia largura (±)
+        add_tolerance(f"Throat Radius ({len_unit}):", 'tr', "Normal", "0.01")
+        add_tolerance("Rounding Factor:", 'rounding_factor', "Uniform", "0.05")
+        add_tolerance(f"Exit Radius ({len_unit}):", 're', "Normal", "0.02")
+        entry_samples = add_entry("Samples:", str(self.TOLERANCE_SAMPLES))
+        entry_seed = add_entry("Seed (blank = random):", "")
+        entry_workers = add_entry("Worker Processes:", str(os.cpu_count() or 1))
+        ctk.CTkLabel(form, text="Normal: standard deviation | Uniform: ± half-width",
+                     text_color="gray", font=("Arial", 11)).pack(pady=(10, 0))
+
+        def run():
+            try:
+                tolerances = {}
+                for key, (dist, scale) in rows.items():
+                    if dist.get() == "Off":
+                        continue
+                    value = float(scale.get())
+                    if key != 'rounding_factor':
+                        value = UnitManager.convert(value, len_unit, 'length_to_mm')
+                    tolerances[key] = Tolerance(dist.get().lower(), value)
+                _, pa = self._separation_inputs()
+                nominal = dict(self._design_params(), pa=pa)
+                seed = int(entry_seed.get()) if entry_seed.get().strip() else None
+                space = ToleranceSpace(nominal, tolerances, int(entry_samples.get()), seed)
+                workers = max(1, int(entry_workers.get()))
+            except Exception as e:
+                tk.messagebox.showerror("Tolerance Error", f"Invalid settings:\n{e}", parent=win)
+                return
+            win.destroy()
+            solver = next(k for k, v in SOLVER_NAMES.items() if v == self.current_solver_name)
+            self._run_tolerance(space, solver, workers)
+
+        ctk.CTkButton(win, text="Run Monte Carlo", command=run, fg_color="#27AE60").pack(pady=20)
+
+    def _run_tolerance(self, space, solver, workers):
+        """Roda o Monte Carlo em segundo plano, com barra de progresso e cancelamento."""
+        advance, close = self._tool_progress('tolerance', "Tolerance Analysis", len(space), "samples")
+
+        def work(cancel):
+            def progress(n):
+                advance(n)
+                if cancel.is_set():
+                    raise Cancelled()
+
+            return run_tolerance(space, solver, workers, progress=progress)
+
+        def on_done(data):
+            close()
+            report, sweep = data
+            print(f"[Tolerâncias] {report.samples} amostras | P(falha) = {report.p_fail * 100:.3f}%")
+            self._show_tolerance_window(report, sweep, solver)
+
+        def on_error(e):
+            close()
+            tk.messagebox.showerror("Tolerance Error", f"Monte Carlo failed:\n{e}")
+
+        print(f">>> MONTE CARLO: {len(space)} amostras, seed {space.seed}, {workers} processo(s)")
+        self.tool_worker.submit('tolerance', work, on_done, on_error)
+
+    def _show_tolerance_window(self, report, sweep, solver):
+        """Resumo (percentis, P(falha)) e histogramas das grandezas do Monte Carlo."""
+        win = ctk.CTkToplevel(self)
+        win.title("Tolerance Analysis (Monte Carlo)")
+        win.geometry("1100x850")
+        win.attributes('-topmost', True)
+        self.after(100, lambda: win.attributes('-topmost', False))
+
+        header = ctk.CTkFrame(win, fg_color="#2B2B2B")
+        header.pack(fill="x", padx=10, pady=10)
+        if report.separated == 0:
+            status_color = "#2ECC71"
+        elif report.p_fail < 0.01:
+            status_color = "#F1C40F"
+        else:
+            status_color = "#E74C3C"
+        status_text = (f"P(fail Schmucker) = {report.p_fail * 100:.3f}% "
+                       f"[95%: {report.p_fail_low * 100:.3f}% - {report.p_fail_high * 100:.3f}%]")
+        ctk.CTkLabel(header, text=status_text, font=("Arial", 16, "bold"), text_color=status_color).pack(side="left", padx=20)
+
+        def export():
+            path = filedialog.asksaveasfilename(title="Save Samples", defaultextension=".npz",
+                                                filetypes=[("NumPy Archive", "*.npz"), ("CSV File", "*.csv")],
+                                                parent=win)
+            if not path:
+                return
+            writer = open_writer(path)
+            try:
+                writer.write(sample_columns(sweep, solver))
+            finally:
+                writer.close()
+
+        ctk.CTkButton(header, text="Export Samples", command=export, width=140).pack(side="right", padx=20)
+
+        txt = ctk.CTkTextbox(win, font=("Consolas", 12), height=170)
+        txt.pack(fill="x", padx=10)
+        txt.insert("1.0", report.report())
+        txt.configure(state="disabled")
+
+        fig, axes = plt.subplots(2, 3, figsize=(9, 5.5), dpi=100)
+        fig.patch.set_facecolor('#2B2B2B')
+        keys = metric_keys(solver)  # sem Cf no MOC
+        for ax in axes.ravel()[len(keys):]:
+            ax.set_visible(False)
+        for ax, key in zip(axes.ravel(), keys):
+            ax.set_facecolor('#2B2B2B')
+            ax.tick_params(colors='white', labelsize=8)
+            ax.set_title(METRICS[key], color='white', fontsize=10)
+            st = report.metrics.get(key)
+            if st is None:
+                continue
+            ax.stairs(st.counts, st.edges, fill=True, color='#3498DB', alpha=0.8)
+            ax.axvline(st.nominal, color='white', linewidth=1.2)
+            for p in (5, 95):
+                ax.axvline(st.percentiles[p], color='#F1C40F', linestyle=':', linewidth=1)
+            if key == 'safety_margin':
+                ax.axvline(0.0, color='#E74C3C', linestyle='--', linewidth=1.2)
+        fig.tight_layout()
+
+        canvas = FigureCanvasTkAgg(fig, master=win)
+        canvas.draw()
+        canvas.get_tk_widget().pack(fill="both", expand=True, padx=10, pady=10)
+
+    def _separation_inputs(self):
+        """Lê os campos da UI e monta a entrada da simulação (tudo em SI). Só na thread da UI."""
+        # A. Pressão Ambiente: Input do Usuário -> Pascal
+        pa_raw = float(self.entry_pa.get())
+        pa_unit_user = self.unit_prefs.get('pa', 'Pa')
+        # Usa pressure_to_mpa para ir até MPa, depois * 1e6 para Pa
+        # Se o usuário escolheu 'atm', convert -> converte para MPa -> converte para Pa
+        pa_mpa = UnitManager.convert(pa_raw, pa_unit_user, 'pressure_to_mpa', reverse=False)
+        pa_val_si = pa_mpa * 1e6 # Pascal
+        
+        # B. Pressão da Câmara: Unidade Salva -> Pascal
+        pc_mpa = self._get_converted_value('pc') 
+        pc_val_si = pc_mpa * 1e6 
+        
+        gamma = float(self.inputs['k'].get())
+        return SimulationInput(chamber_pressure=pc_val_si, ambient_pressure=pa_val_si, gamma=gamma), pa_val_si
+
+    def _prepared_flow(self, res, sim_input):
+        """Escoamento na parede para (geometria, pc, gamma); reaproveitado quando só a pressão ambiente muda."""
+        cached = self._flow_cache
+        if cached is not None and cached[0] is res and cached[1] == (sim_input.chamber_pressure, sim_input.gamma):
+            return cached[2]
+        prepared = FlowSimulation(res, sim_input, sampling=SAMPLING_FLOW).prepare()
+        self._flow_cache = (res, (sim_input.chamber_pressure, sim_input.gamma), prepared)
+        return prepared
+
+    def _compute_separation(self, res, sim_input):
+        """Só cálculo (sempre em SI): pode rodar fora da thread da UI."""
+        return self._prepared_flow(res, sim_input).evaluate(sim_input.ambient_pressure)
+
+    def _compute_envelope(self, res, sim_input):
+        """Mapa pc x pa em torno do ponto atual (SI), com a mesma preparação da análise pontual."""
+        pc_lo, pc_hi = self.ENVELOPE_PC_RANGE
+        pa_max = self.ENVELOPE_PA_MAX * max(sim_input.ambient_pressure, 101325.0)
+        pcs = np.linspace(pc_lo, pc_hi, self.ENVELOPE_POINTS) * sim_input.chamber_pressure
+        pas = np.linspace(0.0, pa_max, self.ENVELOPE_POINTS)
+        return self._prepared_flow(res, sim_input).envelope(pcs, pas)
+
+    def _show_separation(self, result, sim_input, envelope=None):
+        """Desenha a vista ativa da aba de separação (perfil ou mapa de operação)."""
+        if envelope is None:
+            self._draw_separation(result, sim_input.ambient_pressure)
+        else:
+            self._draw_envelope(envelope, result, sim_input)
+
+    def _set_separation_view(self, choice: str):
+        self.sep_view = 'envelope' if choice == "Operating Envelope" else 'profile'
+        self.refresh_separation_only()
+
     def refresh_separation_only(self):
         if not self.last_result: return
 
         try:
-            # --- 1. PREPARAÇÃO DO INPUT (Convertendo TUDO para SI/Base) ---
-            
-            # A. Pressão Ambiente: Input do Usuário -> Pascal
-            pa_raw = float(self.entry_pa.get())
-            pa_unit_user = self.unit_prefs.get('pa', 'Pa')
-            # Usa pressure_to_mpa para ir até MPa, depois * 1e6 para Pa
-            # Se o usuário escolheu 'atm', convert -> converte para MPa -> converte para Pa
-            pa_mpa = UnitManager.convert(pa_raw, pa_unit_user, 'pressure_to_mpa', reverse=False)
-            pa_val_si = pa_mpa * 1e6 # Pascal
-            
-            # B. Pressão da Câmara: Unidade Salva -> Pascal
-            pc_mpa = self._get_converted_value('pc') 
-            pc_val_si = pc_mpa * 1e6 
-            
-            gamma = float(self.inputs['k'].get())
-            
-            # --- 2. CÁLCULO FÍSICO (Sempre em SI) ---
-            sim_input = SimulationInput(chamber_pressure=pc_val_si, ambient_pressure=pa_val_si, gamma=gamma)
-            sim = FlowSimulation(self.last_result, sim_input)
-            result = sim.run()
-            
-            # --- 3. PREPARAÇÃO DO PLOT (Convertendo SI -> Unidade do Usuário) ---
-            
-            # Identifica unidades de destino
-            len_unit = self.unit_prefs.get('tr', 'mm')  # Comprimento (ex: in)
-            press_unit = self.unit_prefs.get('pe', 'atm') # Pressão Y (ex: psi) - Usamos a de Exhaust como referência visual
-            
-            # Helpers de Conversão de Saída
-            def conv_len(val_m): 
-                # Metro -> mm (*1000) -> Unidade Usuário (reverse=True)
-                val_mm = val_m * 1000
-                return UnitManager.convert(val_mm, len_unit, 'length_to_mm', reverse=True)
-            
-            def conv_press(val_pa):
-                # Pascal -> MPa (/1e6) -> Unidade Usuário (reverse=True)
-                val_mpa = val_pa / 1e6
-                return UnitManager.convert(val_mpa, press_unit, 'pressure_to_mpa', reverse=True)
-
-            # Vetores Convertidos
-            x_plot = [conv_len(x) for x in result.axis_x]
-            p_wall_plot = [conv_press(p) for p in result.wall_pressure]
-            p_limit_plot = [conv_press(p) for p in result.schmucker_limit]
-            pa_line_val = conv_press(pa_val_si)
-
-            # --- 4. PLOTAGEM ---
-            self.ax_sep.clear()
-            self.ax_sep.grid(True, linestyle='--', alpha=0.3, color='white')
-            self.ax_sep.tick_params(colors='white')
-            
-            # Labels com Unidades
-            self.ax_sep.set_title("Flow Separation Check", color='white', weight='bold')
-            self.ax_sep.set_xlabel(f"Axial Length ({len_unit})", color='white')
-            self.ax_sep.set_ylabel(f"Pressure ({press_unit})", color='white')
-
-            self.ax_sep.plot(x_plot, p_wall_plot, label='Wall Pressure', color='#3498DB', linewidth=2)
-            self.ax_sep.plot(x_plot, p_limit_plot, label='Separation Limit', color='#E74C3C', linestyle='--', linewidth=2)
-            self.ax_sep.axhline(y=pa_line_val, color='gray', linestyle=':', label=f'Ambient ({pa_unit_user})')
-
-            # Log Scale se necessário (Baseado no valor visual plotado)
-            # Se estivermos plotando em atm/bar/MPa, valores < 0.01 podem pedir log
-            if pa_line_val < 0.01 and press_unit in ['MPa', 'atm', 'bar']: 
-                 self.ax_sep.set_yscale('log')
-            elif pa_line_val < 1000 and press_unit == 'Pa':
-                 self.ax_sep.set_yscale('log')
-
-            # Marcador de Separação (Se houver)
-            if result.has_separation and result.separation_x is not None:
-                sx_conv = conv_len(result.separation_x)
-                sp_conv = conv_press(result.separation_pressure)
-                
-                self.ax_sep.scatter([sx_conv], [sp_conv], color='#E74C3C', s=100, zorder=10, marker='X')
-                self.ax_sep.annotate(f'SEPARATION\nX={sx_conv:.3f}{len_unit}', (sx_conv, sp_conv), 
-                                     xytext=(0, 20), textcoords='offset points', ha='center',
-                                     color='#E74C3C', weight='bold',
-                                     bbox=dict(boxstyle="round,pad=0.2", fc="#2B2B2B", ec="#E74C3C"))
-            
-            # Legenda e Redraw
-            self.ax_sep.legend(facecolor='#2B2B2B', labelcolor='white')
-            self.canvas_sep.draw()
-            
-            # Atualiza Status Bar (A mesma lógica de antes, não muda pois depende do objeto `result` físico)
-            self._update_separation_status_ui(result)
+            sim_input, _ = self._separation_inputs()
+            result = self._compute_separation(self.last_result, sim_input)
+            envelope = self._compute_envelope(self.last_result, sim_input) if self.sep_view == 'envelope' else None
+            self._show_separation(result, sim_input, envelope)
 
         except Exception as e:
             import traceback
             traceback.print_exc()
             tk.messagebox.showerror("Simulation Error", f"Failed to update separation plot:\n{e}")
 
+    def _draw_separation(self, result, pa_val_si):
+        pa_unit_user = self.unit_prefs.get('pa', 'Pa')
+
+        # --- PREPARAÇÃO DO PLOT (Convertendo SI -> Unidade do Usuário) ---
+
+        # Identifica unidades de destino
+        len_unit = self.unit_prefs.get('tr', 'mm')  # Comprimento (ex: in)
+        press_unit = self.unit_prefs.get('pe', 'atm') # Pressão Y (ex: psi) - Usamos a de Exhaust como referência visual
+
+        # Helpers de Conversão de Saída
+        def conv_len(val_m): 
+            # Metro -> mm (*1000) -> Unidade Usuário (reverse=True)
+            val_mm = val_m * 1000
+            return UnitManager.convert(val_mm, len_unit, 'length_to_mm', reverse=True)
+
+        def conv_press(val_pa):
+            # Pascal -> MPa (/1e6) -> Unidade Usuário (reverse=True)
+            val_mpa = val_pa / 1e6
+            return UnitManager.convert(val_mpa, press_unit, 'pressure_to_mpa', reverse=True)
+
+        # Vetores Convertidos
+        x_plot = [conv_len(x) for x in result.axis_x]
+        p_wall_plot = [conv_press(p) for p in result.wall_pressure]
+        p_limit_plot = [conv_press(p) for p in result.schmucker_limit]
+        pa_line_val = conv_press(pa_val_si)
+
+        # --- PLOTAGEM ---
+        self._reset_separation_axes()
+        self.ax_sep.grid(True, linestyle='--', alpha=0.3, color='white')
+        self.ax_sep.tick_params(colors='white')
+
+        # Labels com Unidades
+        self.ax_sep.set_title("Flow Separation Check", color='white', weight='bold')
+        self.ax_sep.set_xlabel(f"Axial Length ({len_unit})", color='white')
+        self.ax_sep.set_ylabel(f"Pressure ({press_unit})", color='white')
+
+        self.ax_sep.plot(x_plot, p_wall_plot, label='Wall Pressure', color='#3498DB', linewidth=2)
+        self.ax_sep.plot(x_plot, p_limit_plot, label='Separation Limit', color='#E74C3C', linestyle='--', linewidth=2)
+        self.ax_sep.axhline(y=pa_line_val, color='gray', linestyle=':', label=f'Ambient ({pa_unit_user})')
+
+        # Log Scale se necessário (Baseado no valor visual plotado)
+        # Se estivermos plotando em atm/bar/MPa, valores < 0.01 podem pedir log
+        if pa_line_val < 0.01 and press_unit in ['MPa', 'atm', 'bar']: 
+             self.ax_sep.set_yscale('log')
+        elif pa_line_val < 1000 and press_unit == 'Pa':
+             self.ax_sep.set_yscale('log')
+
+        # Marcador de Separação (Se houver)
+        if result.has_separation and result.separation_x is not None:
+            sx_conv = conv_len(result.separation_x)
+            sp_conv = conv_press(result.separation_pressure)
+
+            self.ax_sep.scatter([sx_conv], [sp_conv], color='#E74C3C', s=100, zorder=10, marker='X')
+            self.ax_sep.annotate(f'SEPARATION\nX={sx_conv:.3f}{len_unit}', (sx_conv, sp_conv), 
+                                 xytext=(0, 20), textcoords='offset points', ha='center',
+                                 color='#E74C3C', weight='bold',
+                                 bbox=dict(boxstyle="round,pad=0.2", fc="#2B2B2B", ec="#E74C3C"))
+
+        # Legenda e Redraw
+        self.ax_sep.legend(facecolor='#2B2B2B', labelcolor='white')
+        self.canvas_sep.draw()
+
+        # Atualiza Status Bar (A mesma lógica de antes, não muda pois depende do objeto `result` físico)
+        self._update_separation_status_ui(result)
+
+    def _reset_separation_axes(self):
+        """Figura da aba de separação com um único eixo limpo (o mapa acrescenta a colorbar)."""
+        self.fig_sep.clear()
+        self.ax_sep = self.fig_sep.add_subplot(111)
+        self.ax_sep.set_facecolor('#2B2B2B')
+
+    def _draw_envelope(self, envelope, result, sim_input):
+        """Heatmap da margem de segurança sobre (pc, pa), com a fronteira de descolamento e o ponto atual."""
+        pc_unit = self.unit_prefs.get('pc', 'MPa')
+        pa_unit = self.unit_prefs.get('pa', 'Pa')
+
+        def conv(val_pa, unit):
+            # Pascal -> MPa -> Unidade do Usuário
+            return UnitManager.convert(np.asarray(val_pa) / 1e6, unit, 'pressure_to_mpa', reverse=True)
+
+        pcs = conv(envelope.chamber_pressure, pc_unit)
+        pas = conv(envelope.ambient_pressure, pa_unit)
+
+        self._reset_separation_axes()
+        ax = self.ax_sep
+        ax.tick_params(colors='white')
+        ax.set_title("Operating Envelope (Schmucker Criterion)", color='white', weight='bold')
+        ax.set_xlabel(f"Ambient Pressure ({pa_unit})", color='white')
+        ax.set_ylabel(f"Chamber Pressure ({pc_unit})", color='white')
+
+        # Margem recortada em [-1, 1]: abaixo de -1 é descolamento franco de qualquer forma
+        image = ax.imshow(np.clip(envelope.safety_margin, -1, 1), origin='lower', aspect='auto',
+                          extent=(pas[0], pas[-1], pcs[0], pcs[-1]), cmap='RdYlGn', vmin=-1, vmax=1,
+                          interpolation='nearest')
+        cbar = self.fig_sep.colorbar(image, ax=ax)
+        cbar.set_label("Safety Margin", color='white')
+        cbar.ax.tick_params(colors='white')
+
+        # Fronteira de descolamento (margem 0) e limite de estabilidade baixa (20%, como na barra de status)
+        ax.contour(pas, pcs, envelope.safety_margin, levels=[0.0, 0.2], colors=['white', 'white'],
+                   linestyles=['solid', 'dashed'], linewidths=1.2)
+
+        ax.scatter([conv(sim_input.ambient_pressure, pa_unit)], [conv(sim_input.chamber_pressure, pc_unit)],
+                   color='#3498DB', edgecolors='white',
+                   s=80, zorder=10, label='Current Design')
+        ax.legend(facecolor='#2B2B2B', labelcolor='white', loc='upper right')
+
+        if envelope.geometric_warnings:
+            ax.text(0.01, 0.01, "⚠ Geometry warnings: see Wall Profile", transform=ax.transAxes,
+                    color='#F1C40F', fontsize=9, va='bottom')
+
+        self.canvas_sep.draw()
+        self.last_envelope = envelope
+        self.btn_export_envelope.configure(state="normal")
+        self._update_separation_status_ui(result)
+
+    def export_envelope_map(self):
+        """Grava o último mapa de operação (.csv, uma linha por ponto, ou .npz com as matrizes; tudo em SI)."""
+        if self.last_envelope is None:
+            return
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=[("CSV File", "*.csv"), ("NumPy Archive", "*.npz")],
+            title="Export Operating Envelope"
+        )
+        if not file_path:
+            return
+        try:
+            self.last_envelope.save(file_path)
+            tk.messagebox.showinfo("Export Success", "Operating envelope exported successfully!")
+        except Exception as e:
+            tk.messagebox.showerror("Export Error", f"Failed to export file:\n{e}")
+
     def on_closing(self):
+        self.worker.shutdown()
+        self.tool_worker.shutdown()
         plt.close('all')
         self.quit()
         self.destroy()
@@ -0,0 +1,94 @@
+# src/ui/pipeline.py
+"""
+Avaliação incremental do pipeline da UI.
+
+Cada estágio declara do que depende: chaves do estado de entrada (ex.: 'tr',
+'ang_cov', 'unit_len') e/ou nomes de estágios anteriores. Um estágio só roda
+quando algum valor de que depende mudou desde a última execução bem-sucedida,
+ou quando um estágio do qual depende roda na mesma passada. Os estágios são
+executados na ordem em que foram registrados (a ordem já é topológica).
+
+Cada estágio tem duas partes: `compute` (numérica, pode rodar numa thread de
+trabalho, não toca na UI) e `action` (desenho, sempre na thread principal).
+plan() e apply() rodam na thread principal; compute() pode rodar em qualquer uma.
+"""
+import threading
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from src.ui.worker import Cancelled
+
+_MISSING = object()
+
+
+class Stage(NamedTuple):
+    name: str
+    deps: Tuple[str, ...]
+    action: Callable[[Dict[str, Any], Any], None]
+    compute: Optional[Callable[[Dict[str, Any], Dict[str, Any]], Any]]
+
+
+class Pipeline:
+    def __init__(self, log: Optional[Callable[[str], None]] = print):
+        self.stages: List[Stage] = []
+        self._snapshots: Dict[str, Optional[Tuple[Any, ...]]] = {}
+        self.log = log
+
+    def add(self, name: str, deps: Iterable[str], action: Callable[[Dict[str, Any], Any], None],
+            compute: Optional[Callable[[Dict[str, Any], Dict[str, Any]], Any]] = None) -> None:
+        """
+        compute(state, results) -> dado do estágio (results traz o dado dos estágios
+        anteriores desta passada); action(state, dado) desenha/aplica o resultado.
+        """
+        if name in self._snapshots:
+            raise ValueError(f"Estágio duplicado: {name}")
+        self.stages.append(Stage(name, tuple(deps), action, compute))
+        self._snapshots[name] = None
+
+    def invalidate(self, *names: str) -> None:
+        """Força a reexecução dos estágios indicados (todos, se nenhum for passado)."""
+        for name in names or self._snapshots.keys():
+            self._snapshots[name] = None
+
+    def _snapshot(self, stage: Stage, state: Dict[str, Any]) -> Tuple[Any, ...]:
+        return tuple(state.get(d, _MISSING) for d in stage.deps if d not in self._snapshots)
+
+    def plan(self, state: Dict[str, Any]) -> List[str]:
+        """Estágios que precisam rodar para este estado (propaga pelas dependências entre estágios)."""
+        dirty: List[str] = []
+        for stage in self.stages:
+            upstream = any(d in dirty for d in stage.deps)
+            if upstream or self._snapshots[stage.name] != self._snapshot(stage, state):
+                dirty.append(stage.name)
+        return dirty
+
+    def compute(self, plan: List[str], state: Dict[str, Any],
+                cancel: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """Parte numérica dos estágios planejados. Para cedo (Cancelled) se `cancel` for sinalizado."""
+        results: Dict[str, Any] = {}
+        for stage in self.stages:
+            if stage.name not in plan:
+                continue
+            if cancel is not None and cancel.is_set():
+                raise Cancelled()
+            results[stage.name] = stage.compute(state, results) if stage.compute else None
+        return results
+
+    def apply(self, plan: List[str], state: Dict[str, Any], results: Dict[str, Any]) -> None:
+        """Parte de UI dos estágios planejados; marca cada um como atualizado ao terminar."""
+        for stage in self.stages:
+            if stage.name not in plan:
+                continue
+            # Se o estágio falhar, fica sujo e roda de novo na próxima vez
+            self._snapshots[stage.name] = None
+            stage.action(state, results.get(stage.name))
+            self._snapshots[stage.name] = self._snapshot(stage, state)
+
+        if self.log is not None:
+            skipped = [s.name for s in self.stages if s.name not in plan]
+            self.log(f"[Pipeline] executados: {', '.join(plan) or '-'} | pulados: {', '.join(skipped) or '-'}")
+
+    def run(self, state: Dict[str, Any]) -> List[str]:
+        """Execução síncrona completa (plan + compute + apply) na thread atual."""
+        plan = self.plan(state)
+        self.apply(plan, state, self.compute(plan, state))
+        return plan
@@ -0,0 +1,109 @@
+# src/ui/worker.py
+"""
+Execução em segundo plano para a UI (Tkinter não é thread-safe).
+
+O trabalho numérico roda numa thread própria; o resultado volta para a thread
+principal por uma fila lida com `after()`, e só então os callbacks (que podem
+desenhar) são chamados. Cada novo pedido substitui o anterior: o antigo recebe
+o sinal de cancelamento (cooperativo, via threading.Event) e, se terminar
+mesmo assim, o resultado é descartado.
+
+Cada instância tem o próprio executor: trabalhos longos (ferramentas) usam uma
+instância separada, com uma thread por canal, para não travar a simulação.
+"""
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class Cancelled(Exception):
+    """Levantada pelo trabalho quando percebe que foi substituído por um pedido mais novo."""
+
+
+class BackgroundWorker:
+    def __init__(self, root, poll_ms: int = 25, max_workers: int = 1, name: str = "nozzlecalc-worker"):
+        self.root = root
+        self.poll_ms = poll_ms
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._results: "queue.Queue[tuple]" = queue.Queue()
+        self._generation: Dict[str, int] = {}
+        self._cancel: Dict[str, threading.Event] = {}
+        self._debounce_ids: Dict[str, str] = {}
+        self._pending = 0
+        self._polling = False
+
+    def debounce(self, channel: str, delay_ms: int, callback: Callable[[], None]) -> None:
+        """Agenda callback na thread principal; chamadas repetidas dentro de delay_ms reiniciam o prazo."""
+        after_id = self._debounce_ids.pop(channel, None)
+        if after_id is not None:
+            self.root.after_cancel(after_id)
+
+        def fire():
+            self._debounce_ids.pop(channel, None)
+            callback()
+
+        self._debounce_ids[channel] = self.root.after(delay_ms, fire)
+
+    def submit(self, channel: str, work: Callable[[threading.Event], Any],
+               on_done: Callable[[Any], None], on_error: Optional[Callable[[BaseException], None]] = None) -> None:
+        """
+        Roda work(cancel_event) em segundo plano. on_done/on_error são chamados na
+        thread principal, e apenas se este ainda for o pedido mais recente do canal.
+        """
+        previous = self._cancel.get(channel)
+        if previous is not None:
+            previous.set()
+        cancel = threading.Event()
+        generation = self._generation.get(channel, 0) + 1
+        self._generation[channel] = generation
+        self._cancel[channel] = cancel
+
+        def task():
+            try:
+                if cancel.is_set():
+                    raise Cancelled()
+                self._results.put((channel, generation, True, work(cancel), on_done, on_error))
+            except BaseException as e:
+                self._results.put((channel, generation, False, e, on_done, on_error))
+
+        self._pending += 1
+        self._executor.submit(task)
+        self._ensure_polling()
+
+    def cancel(self, channel: str) -> None:
+        event = self._cancel.get(channel)
+        if event is not None:
+            event.set()
+        # Invalida qualquer resultado que ainda chegue
+        self._generation[channel] = self._generation.get(channel, 0) + 1
+
+    def _ensure_polling(self) -> None:
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._poll)
+
+    def _poll(self) -> None:
+        while True:
+            try:
+                channel, generation, ok, payload, on_done, on_error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            if generation != self._generation.get(channel):
+                continue  # pedido substituído: resultado descartado
+            self._cancel.pop(channel, None)
+            if ok:
+                on_done(payload)
+            elif not isinstance(payload, Cancelled) and on_error is not None:
+                on_error(payload)
+
+        if self._pending > 0:
+            self.root.after(self.poll_ms, self._poll)
+        else:
+            self._polling = False
+
+    def shutdown(self) -> None:
+        for event in self._cancel.values():
+            event.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)